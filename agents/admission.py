@@ -0,0 +1,140 @@
+"""
+Admission Control - bounded concurrency for debates
+At most `max_active` debates run at once; up to `max_queued` more wait in
+FIFO order (and are told their position), and anything beyond that is
+rejected straight away so the caller can retry later. Under a spike, debates
+queue with a predictable wait instead of all sharing the provider quota and
+worker threads until nothing finishes.
+"""
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+from collections import deque
+from contextlib import asynccontextmanager
+import asyncio
+import itertools
+import time
+
+
+class AdmissionRejected(Exception):
+    """The wait queue is full; retry after `retry_after` seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Too many debates in progress; retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """A debate's place in line, from enqueue until release."""
+    __slots__ = ("id", "state", "enqueued", "admitted_at", "changed")
+
+    def __init__(self, ticket_id: int):
+        self.id = ticket_id
+        self.state = "queued"  # queued -> active -> released
+        self.enqueued = time.monotonic()
+        self.admitted_at: Optional[float] = None
+        self.changed = asyncio.Event()
+
+
+class AdmissionController:
+    """FIFO admission of debates to a fixed number of concurrent slots (event-loop only)."""
+
+    def __init__(self, max_active: int, max_queued: int):
+        self.max_active = max(1, max_active)
+        self.max_queued = max(0, max_queued)
+        self._active = 0
+        self._waiting: Deque[Ticket] = deque()
+        self._ids = itertools.count(1)
+        self._admitted = 0
+        self._rejected = 0
+        self._queue_wait_total = 0.0
+        # Smoothed debate duration, for Retry-After estimates
+        self._avg_run_seconds = 60.0
+
+    def enqueue(self) -> Ticket:
+        """Take a slot or a place in line; raises AdmissionRejected when the line is full."""
+        ticket = Ticket(next(self._ids))
+        if self._active < self.max_active and not self._waiting:
+            self._activate(ticket)
+            return ticket
+        if len(self._waiting) >= self.max_queued:
+            self._rejected += 1
+            raise AdmissionRejected(self.retry_after())
+        self._waiting.append(ticket)
+        return ticket
+
+    def position(self, ticket: Ticket) -> int:
+        """1-based place in line, or 0 once admitted."""
+        if ticket.state != "queued":
+            return 0
+        return self._waiting.index(ticket) + 1
+
+    async def wait(self, ticket: Ticket, on_position: Optional[Callable[[int], Awaitable]] = None) -> None:
+        """Wait until `ticket` is admitted, awaiting `on_position(n)` whenever its place changes."""
+        last = None
+        try:
+            while ticket.state == "queued":
+                position = self.position(ticket)
+                if on_position is not None and position != last:
+                    last = position
+                    await on_position(position)
+                ticket.changed.clear()
+                if ticket.state == "queued":
+                    await ticket.changed.wait()
+        except BaseException:
+            # Cancelled (or the callback failed) while in line: give the place up.
+            self.release(ticket)
+            raise
+
+    def release(self, ticket: Ticket) -> None:
+        """Free the ticket's slot or place in line; safe to call more than once."""
+        if ticket.state == "active":
+            self._active -= 1
+            run_seconds = time.monotonic() - ticket.admitted_at
+            self._avg_run_seconds = 0.8 * self._avg_run_seconds + 0.2 * run_seconds
+        elif ticket.state == "queued":
+            self._waiting.remove(ticket)
+        else:
+            return
+        ticket.state = "released"
+        self._promote()
+
+    @asynccontextmanager
+    async def admitted(self, ticket: Ticket, on_position: Optional[Callable[[int], Awaitable]] = None):
+        """Hold a debate slot for the duration of the block."""
+        await self.wait(ticket, on_position)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def retry_after(self) -> int:
+        """Rough seconds until a place in line frees up."""
+        backlog = len(self._waiting) + 1
+        return max(1, round(self._avg_run_seconds * backlog / self.max_active))
+
+    def _activate(self, ticket: Ticket) -> None:
+        ticket.state = "active"
+        ticket.admitted_at = time.monotonic()
+        self._active += 1
+        self._admitted += 1
+        self._queue_wait_total += ticket.admitted_at - ticket.enqueued
+
+    def _promote(self) -> None:
+        while self._waiting and self._active < self.max_active:
+            ticket = self._waiting.popleft()
+            self._activate(ticket)
+            ticket.changed.set()
+        # Everyone still in line moved up
+        for ticket in self._waiting:
+            ticket.changed.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self._active,
+            "queued": len(self._waiting),
+            "max_active": self.max_active,
+            "max_queued": self.max_queued,
+            "admitted": self._admitted,
+            "rejected": self._rejected,
+            "avg_queue_wait_seconds": round(self._queue_wait_total / self._admitted, 3) if self._admitted else 0.0,
+            "avg_run_seconds": round(self._avg_run_seconds, 1),
+        }
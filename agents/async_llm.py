@@ -0,0 +1,192 @@
+"""Asyncio-native chat completions for the debate agents.
+
+Talks to the same OpenAI-compatible endpoints (Gemini/Groq) as AutoGen, but
+with an async HTTP client, the async rate gate and async retries, so a debate
+waiting on the provider costs an awaiting coroutine instead of a worker thread.
+Walks the config_list in order on 429 / timeout / outage and can hedge a slow
+call by racing the next provider. Used when DEBATE_EXECUTION_MODE=async.
+"""
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+try:
+    from gemini_rate_limiter import is_failover_error, run_with_rate_limit_async
+    from http_pool import get_async_client
+    from completion_cache import get_completion_cache, response_content, text_response
+    from provider_health import latency_tracker
+    from llm_scheduler import abandoned_error, call_time_left
+except ModuleNotFoundError:
+    from agents.gemini_rate_limiter import is_failover_error, run_with_rate_limit_async
+    from agents.http_pool import get_async_client
+    from agents.completion_cache import get_completion_cache, response_content, text_response
+    from agents.provider_health import latency_tracker
+    from agents.llm_scheduler import abandoned_error, call_time_left
+
+
+async def _post_completion(
+    entry: Dict[str, Any],
+    payload: Dict[str, Any],
+    timeout: float,
+    on_delta: Optional[Callable[[str], Awaitable]],
+    api_key: Optional[str] = None,
+) -> Dict[str, Any]:
+    """POST one chat completion and return the response payload (rebuilt from chunks when streaming)."""
+    client = get_async_client(entry["base_url"])
+    headers = {"Authorization": f"Bearer {api_key or entry['api_key']}"}
+
+    if on_delta is None:
+        resp = await client.post("chat/completions", json=payload, headers=headers, timeout=timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    parts: List[str] = []
+    async with client.stream(
+        "POST", "chat/completions", json={**payload, "stream": True}, headers=headers, timeout=timeout
+    ) as resp:
+        if resp.status_code >= 400:
+            await resp.aread()
+            resp.raise_for_status()
+        async for line in resp.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            chunk = json.loads(data)
+            for choice in chunk.get("choices") or []:
+                text = (choice.get("delta") or {}).get("content")
+                if text:
+                    parts.append(text)
+                    await on_delta(text)
+    return text_response(payload["model"], "".join(parts))
+
+
+async def _call_provider(
+    entry: Dict[str, Any],
+    payload: Dict[str, Any],
+    timeout: float,
+    on_delta: Optional[Callable[[str], Awaitable]],
+) -> Dict[str, Any]:
+    """One provider, with its rate limiter, retries and circuit breaker."""
+    tracker = latency_tracker(entry["base_url"])
+
+    async def _call(api_key: Optional[str]) -> Dict[str, Any]:
+        started = time.monotonic()
+        response = await _post_completion(entry, payload, timeout, on_delta, api_key)
+        tracker.record(time.monotonic() - started)
+        return response
+
+    return await run_with_rate_limit_async(_call, payload, base_url=entry["base_url"])
+
+
+async def _call_with_failover(
+    entries: List[Dict[str, Any]],
+    payloads: List[Dict[str, Any]],
+    timeout: float,
+    on_delta: Optional[Callable[[str], Awaitable]],
+) -> tuple:
+    """Try providers in order; return (index, response) of the first that answers."""
+    for i, (entry, payload) in enumerate(zip(entries, payloads)):
+        try:
+            return i, await _call_provider(entry, payload, timeout, on_delta)
+        except Exception as e:
+            if i == len(entries) - 1 or not is_failover_error(e):
+                raise
+            print(f"↪️ LLM provider {entry['base_url']} failed ({type(e).__name__}); failing over")
+
+
+async def _call_hedged(
+    entries: List[Dict[str, Any]],
+    payloads: List[Dict[str, Any]],
+    timeout: float,
+    hedge_delay: float,
+) -> tuple:
+    """Start the primary; if it is still running after its p95 latency, race the fallbacks."""
+    delay = latency_tracker(entries[0]["base_url"]).percentile(0.95)
+    if delay is None:
+        delay = hedge_delay
+
+    # Both racers answer (config_list index, response), whichever of them wins.
+    async def _primary() -> tuple:
+        return 0, await _call_provider(entries[0], payloads[0], timeout, None)
+
+    primary = asyncio.ensure_future(_primary())
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done and primary.exception() is None:
+        return primary.result()
+    if done and not is_failover_error(primary.exception()):
+        raise primary.exception()
+
+    async def _fallbacks() -> tuple:
+        i, response = await _call_with_failover(entries[1:], payloads[1:], timeout, None)
+        return i + 1, response
+
+    backup = asyncio.ensure_future(_fallbacks())
+    pending = {backup} if done else {primary, backup}
+    errors: List[BaseException] = [primary.exception()] if done else []
+    while pending:
+        finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in finished:
+            if task.exception() is None:
+                for other in pending:
+                    other.cancel()
+                return task.result()
+            errors.append(task.exception())
+    raise errors[0]
+
+
+async def chat_completion(
+    llm_config: Dict[str, Any],
+    messages: List[Dict[str, Any]],
+    on_delta: Optional[Callable[[str], Awaitable]] = None,
+    hedge: bool = False,
+    hedge_delay: float = 20.0,
+) -> str:
+    """Return the assistant reply for `messages` using an AutoGen-style `llm_config`.
+
+    Args:
+        llm_config: Agent config (``config_list``, ``temperature``, ``timeout``);
+                    config_list entries are tried in order
+        messages: OpenAI chat messages, system prompt included
+        on_delta: Optional async callback awaited with each streamed content delta
+        hedge: Race the next provider when the first is slower than its p95
+               latency (non-streaming calls only, so deltas never interleave)
+        hedge_delay: Hedge threshold until enough latencies were observed
+    """
+    entries = llm_config["config_list"]
+    payloads: List[Dict[str, Any]] = []
+    for entry in entries:
+        payload: Dict[str, Any] = {"model": entry["model"], "messages": messages}
+        if llm_config.get("temperature") is not None:
+            payload["temperature"] = llm_config["temperature"]
+        payloads.append(payload)
+    timeout = float(llm_config.get("timeout") or 120)
+
+    cache = get_completion_cache()
+    cacheable = cache is not None and cache.cacheable(payloads[0])
+    if cacheable:
+        hit = cache.get(cache.key_for(payloads[0]))
+        if hit is not None:
+            content = response_content(hit)
+            if on_delta is not None and content:
+                await on_delta(content)
+            return content
+
+    error = abandoned_error()
+    if error is not None:
+        raise error
+    time_left = call_time_left()
+    if time_left is not None:
+        # The round/debate deadline bounds the whole call, failover included.
+        timeout = min(timeout, time_left)
+
+    if hedge and on_delta is None and len(entries) > 1:
+        index, response = await _call_hedged(entries, payloads, timeout, hedge_delay)
+    else:
+        index, response = await _call_with_failover(entries, payloads, timeout, on_delta)
+    if cacheable:
+        # Stored under the request that was actually answered (its model may differ).
+        cache.put(cache.key_for(payloads[index]), response)
+    return response_content(response)
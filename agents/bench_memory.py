@@ -0,0 +1,170 @@
+"""
+Memory benchmark - footprint of retained debate sessions
+Loads the same synthetic sessions into the previous data model (dict-backed
+dataclasses, ISO string timestamps, one copy of every string) and into the
+current one (slots, interned names, float timestamps, shared SVG payloads),
+checks both serialize to the same JSON and reports traced memory.
+
+    python bench_memory.py [--sessions 500] [--messages 12] [--svg-kb 8]
+"""
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import argparse
+import gc
+import json
+import tracemalloc
+
+try:
+    from models import DebateSession
+except ModuleNotFoundError:
+    from agents.models import DebateSession
+
+
+# --- The data model as it was (to_dict/from_dict trimmed to what the benchmark needs) ---
+
+@dataclass
+class LegacyMessage:
+    agent_name: str
+    agent_role: str
+    content: str
+    timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
+    round_number: int = 0
+    message_type: str = "discussion"
+
+
+@dataclass
+class LegacyRound:
+    round_number: int
+    theme: str
+    messages: List[LegacyMessage] = field(default_factory=list)
+    votes: Dict[str, str] = field(default_factory=dict)
+    status: str = "pending"
+    summary: str = ""
+
+
+@dataclass
+class LegacySession:
+    session_id: str
+    design_prompt: str
+    project_id: Optional[str] = None
+    status: str = "pending"
+    rounds: List[LegacyRound] = field(default_factory=list)
+    consensus: Optional[Dict] = None
+    final_score: float = 0.0
+    created_at: str = ""
+    completed_at: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LegacySession":
+        rounds = [
+            LegacyRound(
+                round_number=r["round_number"],
+                theme=r["theme"],
+                messages=[LegacyMessage(**m) for m in r["messages"]],
+                votes=r["votes"],
+                status=r["status"],
+                summary=r["summary"]
+            )
+            for r in data["rounds"]
+        ]
+        return cls(**{**data, "rounds": rounds})
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+AGENTS = [
+    ("DesignCritic", "Design Critic"),
+    ("DesignArtist", "Visual Designer"),
+    ("UXResearcher", "UX Researcher"),
+    ("BrandStrategist", "Brand Strategist"),
+    ("Orchestrator", "Debate Moderator"),
+]
+
+
+def make_session_dicts(sessions: int, messages: int, svg_kb: int, distinct_svgs: int) -> List[str]:
+    """
+    JSON documents as the stores hold them. SVG prototypes recur across sessions
+    (cached replays); with distinct_svgs=0 every message's SVG is unique.
+    """
+    svgs = [
+        '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 800 600">'
+        + "".join(f'<rect x="{(i * 7 + k) % 400}" y="{i % 300}" width="40" height="24" fill="#3b82f6"/>'
+                  for i in range(svg_kb * 1024 // 70))
+        + "</svg>"
+        for k in range(max(1, distinct_svgs))
+    ]
+    start = datetime(2026, 3, 1, 9, 30)
+    docs = []
+    for s in range(sessions):
+        rounds = []
+        for n in range(1, 4):
+            msgs = []
+            for i in range(messages):
+                name, role = AGENTS[i % len(AGENTS)]
+                content = f"Round {n} point {i} for brief {s}: tighten spacing, raise contrast. " * 4
+                if name == "DesignArtist":
+                    content = svgs[(s * 3 + n) % len(svgs)]
+                    if not distinct_svgs:
+                        content = content.replace("<svg ", f"<svg id=\"s{s}-r{n}-m{i}\" ", 1)
+                msgs.append({
+                    "agent_name": name,
+                    "agent_role": role,
+                    "content": content,
+                    "timestamp": (start + timedelta(seconds=s * 600 + n * 60 + i, microseconds=s * 7 + i)).isoformat(),
+                    "round_number": n,
+                    "message_type": "discussion"
+                })
+            rounds.append({"round_number": n, "theme": f"Round {n}", "messages": msgs,
+                           "votes": {"DesignCritic": "approve"}, "status": "complete", "summary": "Agreed on layout."})
+        docs.append(json.dumps({
+            "session_id": f"session-{s}", "design_prompt": f"Landing page #{s}", "project_id": None,
+            "status": "completed", "rounds": rounds, "consensus": {"score": 0.8}, "final_score": 0.8,
+            "created_at": start.isoformat(), "completed_at": None
+        }))
+    return docs
+
+
+def measure(load, docs: List[str]):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [load(json.loads(doc)) for doc in docs]
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return sessions, used
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--messages", type=int, default=12)
+    parser.add_argument("--svg-kb", type=int, default=8)
+    parser.add_argument("--distinct-svgs", type=int, default=20)
+    args = parser.parse_args()
+
+    docs = make_session_dicts(args.sessions, args.messages, args.svg_kb, args.distinct_svgs)
+    legacy, legacy_bytes = measure(LegacySession.from_dict, docs)
+    current, current_bytes = measure(DebateSession.from_dict, docs)
+
+    for old, new in zip(legacy, current):
+        assert json.dumps(new.to_dict()) == json.dumps(old.to_dict()), old.session_id
+
+    count = args.sessions * 3 * args.messages
+    print(f"{args.sessions} sessions, {count} messages ({args.distinct_svgs} distinct {args.svg_kb} KiB SVGs)")
+    print(f"  before: {legacy_bytes / 2**20:8.1f} MiB  ({legacy_bytes / count:7.0f} B/message)")
+    print(f"  now:    {current_bytes / 2**20:8.1f} MiB  ({current_bytes / count:7.0f} B/message)")
+    print(f"  saved:  {(1 - current_bytes / legacy_bytes) * 100:.0f}%")
+
+    # Without repeated SVGs only the per-message savings remain
+    docs = make_session_dicts(args.sessions, args.messages, args.svg_kb, 0)
+    _, legacy_bytes = measure(LegacySession.from_dict, docs)
+    _, current_bytes = measure(DebateSession.from_dict, docs)
+    print(f"all SVGs distinct: before {legacy_bytes / 2**20:.1f} MiB, now {current_bytes / 2**20:.1f} MiB, "
+          f"saved {(1 - current_bytes / legacy_bytes) * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
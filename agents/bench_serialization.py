@@ -0,0 +1,120 @@
+"""
+Serialization benchmark - session/result and SSE event encoding
+Compares the previous path (dataclasses.asdict + json.dumps) with the current
+one (hand-written to_dict, cached finished rounds, serialization.dumps) on a
+synthetic SVG-heavy session.
+
+    python bench_serialization.py [--rounds 3] [--messages 12] [--svg-kb 24]
+"""
+from dataclasses import asdict
+import argparse
+import json
+import timeit
+
+try:
+    from models import AgentMessage, DebateRound, DebateSession, DebateStatus, format_timestamp
+    from serialization import BACKEND, dumps
+except ModuleNotFoundError:
+    from agents.models import AgentMessage, DebateRound, DebateSession, DebateStatus, format_timestamp
+    from agents.serialization import BACKEND, dumps
+
+
+def make_session(rounds: int, messages: int, svg_kb: int) -> DebateSession:
+    svg_body = "".join(
+        f'<rect x="{i % 400}" y="{i % 300}" width="40" height="24" fill="#3b82f6" rx="4"/>'
+        for i in range(svg_kb * 1024 // 70)
+    )
+    svg = f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 800 600">{svg_body}</svg>'
+    session = DebateSession(session_id="bench", design_prompt="A landing page for a coffee roaster")
+    for n in range(1, rounds + 1):
+        round_obj = DebateRound(round_number=n, theme=f"Round {n}", status="complete", summary="Summary " * 40)
+        for i in range(messages):
+            content = f"Critique {i}: spacing, contrast and hierarchy. " * 20
+            if i % 3 == 0:
+                content += "\n" + svg
+            round_obj.messages.append(AgentMessage(
+                agent_name="DesignArtist", agent_role="Visual Designer", content=content, round_number=n
+            ))
+        round_obj.votes = {"DesignCritic": "approve", "UXResearcher": "adjust"}
+        session.rounds.append(round_obj)
+    session.status = DebateStatus.COMPLETED
+    session.consensus = {"score": 0.8, "votes": {"DesignCritic": "approve"}}
+    return session
+
+
+def legacy_message_dict(message: AgentMessage) -> dict:
+    data = asdict(message)
+    data["timestamp"] = format_timestamp(data.pop("created"))
+    return data
+
+
+def legacy_to_dict(session: DebateSession) -> dict:
+    """The serialization this module replaced: asdict() per message, nothing cached."""
+    return {
+        "session_id": session.session_id,
+        "design_prompt": session.design_prompt,
+        "project_id": session.project_id,
+        "status": session.status.value,
+        "rounds": [
+            {
+                "round_number": r.round_number,
+                "theme": r.theme,
+                "messages": [legacy_message_dict(m) for m in r.messages],
+                "votes": r.votes,
+                "status": r.status,
+                "summary": r.summary
+            }
+            for r in session.rounds
+        ],
+        "consensus": session.consensus,
+        "final_score": session.final_score,
+        "created_at": session.created_at,
+        "completed_at": session.completed_at
+    }
+
+
+def uncached_to_dict(session: DebateSession) -> dict:
+    for round_obj in session.rounds:
+        round_obj._serialized = None
+    return session.to_dict()
+
+
+def bench(label: str, fn, number: int) -> float:
+    seconds = min(timeit.repeat(fn, number=number, repeat=5)) / number
+    print(f"  {label:<44} {seconds * 1000:9.3f} ms")
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--messages", type=int, default=12)
+    parser.add_argument("--svg-kb", type=int, default=24)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    session = make_session(args.rounds, args.messages, args.svg_kb)
+    payload = dumps(session.to_dict())
+    assert json.loads(payload) == json.loads(json.dumps(legacy_to_dict(session)))
+    event = {"type": "agent_message", "agent": "DesignArtist", "content": session.rounds[0].messages[0].content,
+             "round": 1, "timestamp": 0.0}
+
+    print(f"Session: {args.rounds} rounds x {args.messages} messages, {len(payload) / 1024:.0f} KiB JSON "
+          f"(backend: {BACKEND})")
+    print("to_dict")
+    old = bench("asdict (before)", lambda: legacy_to_dict(session), args.number)
+    bench("hand-written, uncached", lambda: uncached_to_dict(session), args.number)
+    new = bench("hand-written, finished rounds cached", session.to_dict, args.number)
+    print(f"  speedup: {old / new:.1f}x")
+    print("/debate/result (to_dict + encode)")
+    old = bench("asdict + json.dumps (before)", lambda: json.dumps(legacy_to_dict(session)), args.number)
+    new = bench("to_dict + serialization.dumps", lambda: dumps(session.to_dict()), args.number)
+    print(f"  speedup: {old / new:.1f}x")
+    print("SSE agent_message event")
+    old = bench("json.dumps (before)", lambda: json.dumps(event), args.number * 10)
+    new = bench("serialization.dumps", lambda: dumps(event), args.number * 10)
+    print(f"  speedup: {old / new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
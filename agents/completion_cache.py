@@ -0,0 +1,202 @@
+"""Per-call LLM completion cache.
+
+Debates re-send many identical low-temperature requests (the same brief, the
+same system prompts, the same mandatory-SVG fallback). Caching at the client
+call level lets those repeats be served from disk across sessions without
+spending provider quota. Enabled with LLM_COMPLETION_CACHE=1.
+"""
+import contextvars
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+try:
+    from llm_streaming import current_delta_sink
+except ModuleNotFoundError:
+    from agents.llm_streaming import current_delta_sink
+
+
+_PATCHED = False
+_CACHE: Optional["CompletionCache"] = None
+
+# Request fields that change the completion; transport options (timeout, headers, stream...) do not.
+_KEY_FIELDS = (
+    "model", "messages", "temperature", "top_p", "max_tokens", "max_completion_tokens", "stop",
+    "n", "seed", "response_format", "presence_penalty", "frequency_penalty",
+    "tools", "tool_choice", "functions",
+)
+
+_force_cache: contextvars.ContextVar[bool] = contextvars.ContextVar("completion_cache_force", default=False)
+
+
+@contextmanager
+def force_completion_cache() -> Iterator[None]:
+    """Cache calls made inside this block regardless of their temperature."""
+    token = _force_cache.set(True)
+    try:
+        yield
+    finally:
+        _force_cache.reset(token)
+
+
+class CompletionCache:
+    """On-disk (SQLite) cache of chat completion responses, keyed by a hash of the request.
+
+    Entries are evicted least-recently-used first once `max_entries` is exceeded.
+    Only deterministic-enough calls are cached: temperature <= `max_temperature`,
+    or calls made under `force_completion_cache`.
+    """
+
+    def __init__(self, path: str, max_entries: int = 5000, max_temperature: float = 0.3):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max(1, max_entries)
+        self.max_temperature = max_temperature
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._puts_since_evict = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS completions ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_last_used ON completions (last_used)")
+
+    def cacheable(self, params: dict[str, Any]) -> bool:
+        if "messages" not in params:
+            return False
+        if _force_cache.get():
+            return True
+        temperature = params.get("temperature")
+        return temperature is not None and float(temperature) <= self.max_temperature
+
+    @staticmethod
+    def key_for(params: dict[str, Any]) -> str:
+        material = {k: params[k] for k in _KEY_FIELDS if params.get(k) is not None}
+        payload = json.dumps(material, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE completions SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, response: dict[str, Any]) -> None:
+        data = json.dumps(response, ensure_ascii=False, default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, response, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, data, len(data), time.time()),
+            )
+            self._puts_since_evict += 1
+            # Counting rows on every put is wasteful; trim in small batches instead.
+            if self._puts_since_evict >= 50:
+                self._puts_since_evict = 0
+                self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM completions WHERE key IN "
+                "(SELECT key FROM completions ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            (entries, size) = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions"
+            ).fetchone()
+        total = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+def get_completion_cache() -> Optional[CompletionCache]:
+    """The process-wide completion cache, or None when disabled."""
+    return _CACHE
+
+
+def response_content(response: dict[str, Any]) -> str:
+    choices = response.get("choices") or [{}]
+    return (choices[0].get("message") or {}).get("content") or ""
+
+
+def text_response(model: str, content: str) -> dict[str, Any]:
+    """Minimal chat.completion payload for a reply that was only seen as text (e.g. streamed)."""
+    return {
+        "id": f"cached-{int(time.time())}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}
+        ],
+    }
+
+
+def configure_completion_cache(path: str, max_entries: int, max_temperature: float) -> CompletionCache:
+    """Create the process-wide cache and patch AutoGen's OpenAI client to use it.
+
+    Apply after the streaming and rate-limit patches: hits then return before
+    the rate limiter, so they cost neither quota nor waiting time.
+    """
+    global _CACHE, _PATCHED
+    if _CACHE is None:
+        _CACHE = CompletionCache(path, max_entries=max_entries, max_temperature=max_temperature)
+    cache = _CACHE
+    if _PATCHED:
+        return cache
+
+    try:
+        from autogen.oai.client import OpenAIClient  # type: ignore
+        from openai.types.chat import ChatCompletion  # type: ignore
+    except Exception:
+        # If autogen/openai are not available, only the async path uses the cache.
+        return cache
+
+    original_create: Callable[..., Any] = OpenAIClient.create
+
+    def patched_create(self: Any, params: dict[str, Any]):
+        if not cache.cacheable(params):
+            return original_create(self, params)
+
+        key = cache.key_for(params)
+        hit = cache.get(key)
+        if hit is not None:
+            sink = current_delta_sink()
+            if sink is not None:
+                # Keep token-streaming listeners informed with the whole reply as one delta.
+                sink(response_content(hit))
+            return ChatCompletion.model_validate(hit)
+
+        response = original_create(self, params)
+        try:
+            cache.put(key, response.model_dump(mode="json"))
+        except Exception:
+            # Caching is best-effort; never fail the call because of it.
+            pass
+        return response
+
+    OpenAIClient.create = patched_create  # type: ignore[assignment]
+    _PATCHED = True
+    return cache
@@ -9,27 +9,47 @@ from pathlib import Path
 
 try:
     # When running `python agents/main.py` (cwd=agents)
-    from gemini_rate_limiter import patch_autogen_for_gemini_free_tier
+    from gemini_rate_limiter import configure_rate_limiter, patch_autogen_for_rate_limits
+    from rate_limiter import api_key_pool
+    from rate_limit_backends import create_rate_limit_backend
+    from llm_streaming import patch_autogen_for_streaming
+    from http_pool import get_sync_client
+    from completion_cache import configure_completion_cache
+    from context_budget import set_tokenizer
 except ModuleNotFoundError:
     # When importing as a package: `import agents.config`
-    from agents.gemini_rate_limiter import patch_autogen_for_gemini_free_tier
+    from agents.gemini_rate_limiter import configure_rate_limiter, patch_autogen_for_rate_limits
+    from agents.rate_limiter import api_key_pool
+    from agents.rate_limit_backends import create_rate_limit_backend
+    from agents.llm_streaming import patch_autogen_for_streaming
+    from agents.http_pool import get_sync_client
+    from agents.completion_cache import configure_completion_cache
+    from agents.context_budget import set_tokenizer
 
 # Load environment variables from parent directory
 env_path = Path(__file__).parent.parent / '.env'
 load_dotenv(env_path)
 
-DEBATE_LLM_PROVIDER = os.getenv("DEBATE_LLM_PROVIDER", "gemini").strip().lower()
+# Ordered provider list: the first is the primary, the rest are failovers tried on
+# 429 / timeout / provider outage (e.g. DEBATE_LLM_PROVIDERS=groq,gemini).
+# DEBATE_LLM_PROVIDER alone still selects a single provider.
+DEBATE_LLM_PROVIDERS = [
+    p.strip().lower()
+    for p in os.getenv("DEBATE_LLM_PROVIDERS", os.getenv("DEBATE_LLM_PROVIDER", "gemini")).split(",")
+    if p.strip()
+]
+DEBATE_LLM_PROVIDER = DEBATE_LLM_PROVIDERS[0] if DEBATE_LLM_PROVIDERS else "gemini"
 
-# Model selection
+
+def _provider_model(provider: str) -> str:
+    default = "openai/gpt-oss-120b" if provider == "groq" else "gemini-2.5-flash"
+    return os.getenv("GROQ_MODEL" if provider == "groq" else "GEMINI_MODEL", default).strip()
+
+
+# Model selection (primary provider)
 # - DEBATE_MODEL overrides everything (single knob)
 # - Otherwise use provider-specific env vars
-_default_model = "openai/gpt-oss-120b" if DEBATE_LLM_PROVIDER == "groq" else "gemini-2.5-flash"
-if os.getenv("DEBATE_MODEL"):
-    DEBATE_MODEL = os.getenv("DEBATE_MODEL", _default_model).strip()
-elif DEBATE_LLM_PROVIDER == "groq":
-    DEBATE_MODEL = os.getenv("GROQ_MODEL", _default_model).strip()
-else:
-    DEBATE_MODEL = os.getenv("GEMINI_MODEL", _default_model).strip()
+DEBATE_MODEL = (os.getenv("DEBATE_MODEL") or _provider_model(DEBATE_LLM_PROVIDER)).strip()
 
 # Feature flag: safer defaults for the Gemini free tier.
 GEMINI_FREE_TIER_MODE = (
@@ -44,8 +64,7 @@ DEBATE_COMPACT_CONTEXT = os.getenv(
     "1" if (DEBATE_LLM_PROVIDER == "groq" or GEMINI_FREE_TIER_MODE) else "0",
 ).lower() in {"1", "true", "yes"}
 
-# Character budgets (cheap proxy for token limits).
-# These are used to trim user prompts and summaries to keep each request under provider limits.
+# Character budgets (legacy knobs; they seed the token budgets below).
 DEBATE_MAX_USER_PROMPT_CHARS = int(
     os.getenv("DEBATE_MAX_USER_PROMPT_CHARS", "1500" if DEBATE_COMPACT_CONTEXT else "6000")
 )
@@ -56,50 +75,148 @@ DEBATE_MAX_AGENT_MESSAGE_CHARS = int(
     os.getenv("DEBATE_MAX_AGENT_MESSAGE_CHARS", "1200" if DEBATE_COMPACT_CONTEXT else "4000")
 )
 
-if DEBATE_LLM_PROVIDER == "gemini":
-    GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-    if not GEMINI_API_KEY:
-        raise ValueError("GEMINI_API_KEY not found in environment variables")
+# Token budgets (see context_budget). DEBATE_TOKENIZER: "heuristic" (offline estimate)
+# or "tiktoken" (if installed). DEBATE_MAX_INPUT_TOKENS caps every request's prompt
+# (system + history); older turns and SVG markup are dropped or trimmed first.
+DEBATE_TOKENIZER = set_tokenizer(os.getenv("DEBATE_TOKENIZER", "heuristic").strip().lower())
+DEBATE_MAX_INPUT_TOKENS = int(
+    os.getenv("DEBATE_MAX_INPUT_TOKENS", "5000" if DEBATE_COMPACT_CONTEXT else "30000")
+)
+DEBATE_MAX_USER_PROMPT_TOKENS = int(
+    os.getenv("DEBATE_MAX_USER_PROMPT_TOKENS", str(DEBATE_MAX_USER_PROMPT_CHARS // 4))
+)
+DEBATE_MAX_SUMMARY_TOKENS = int(
+    os.getenv("DEBATE_MAX_SUMMARY_TOKENS", str(DEBATE_MAX_SUMMARY_CHARS // 4))
+)
+
+# Token streaming is opt-in per call (see llm_streaming.deltas_to); the patch must be
+# applied before the rate limiter so rate limiting wraps the streaming request.
+patch_autogen_for_streaming()
+
+
+def _provider_settings(provider: str, model: str) -> dict:
+    """Endpoint, key pool, rate limits and sampling defaults for one provider."""
+    if provider == "gemini":
+        # Optional pool of keys (comma-separated GEMINI_API_KEYS); calls are spread across all of them.
+        api_keys = api_key_pool("GEMINI_API_KEYS", "GEMINI_API_KEY")
+        api_key = os.getenv("GEMINI_API_KEY") or (api_keys[0] if api_keys else None)
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY not found in environment variables")
 
-    # Apply a global rate limiter to avoid Gemini free-tier 429 bursts.
-    # Safe to call multiple times.
-    patch_autogen_for_gemini_free_tier()
+        # Default Gemini free tier: 5 requests/minute => 12s interval.
+        requests_per_minute = float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "5"))
+        if os.getenv("GEMINI_MIN_INTERVAL_SECONDS"):
+            requests_per_minute = 60.0 / max(0.001, float(os.getenv("GEMINI_MIN_INTERVAL_SECONDS")))
 
-    LLM_CONFIG = {
-        "config_list": [
-            {
-                "model": DEBATE_MODEL,
-                "api_key": GEMINI_API_KEY,
+        return {
+            "entry": {
+                "model": model,
+                "api_key": api_key,
                 "base_url": "https://generativelanguage.googleapis.com/v1beta/openai/",
-            }
-        ],
-        "temperature": 0.7,
-        "timeout": 120,
-        "cache_seed": None,  # Disable caching for varied responses
-    }
-
-elif DEBATE_LLM_PROVIDER == "groq":
-    # Groq Cloud (OpenAI-compatible endpoint). Model example: openai/gpt-oss-120b
-    GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-    if not GROQ_API_KEY:
-        raise ValueError("GROQ_API_KEY not found in environment variables")
-
-    LLM_CONFIG = {
-        "config_list": [
-            {
-                "model": DEBATE_MODEL,
-                "api_key": GROQ_API_KEY,
+            },
+            "api_keys": api_keys,
+            "requests_per_minute": requests_per_minute,
+            "tokens_per_minute": float(os.getenv("GEMINI_TOKENS_PER_MINUTE", "250000")),
+            "temperature": 0.7,
+            "timeout": 120,
+        }
+
+    if provider == "groq":
+        # Groq Cloud (OpenAI-compatible endpoint). Model example: openai/gpt-oss-120b
+        # Optional pool of keys (comma-separated GROQ_API_KEYS); calls are spread across all of them.
+        api_keys = api_key_pool("GROQ_API_KEYS", "GROQ_API_KEY")
+        api_key = os.getenv("GROQ_API_KEY") or (api_keys[0] if api_keys else None)
+        if not api_key:
+            raise ValueError("GROQ_API_KEY not found in environment variables")
+
+        return {
+            "entry": {
+                "model": model,
+                "api_key": api_key,
                 "base_url": "https://api.groq.com/openai/v1",
-            }
-        ],
-        # Keep defaults close to your Groq snippet, but compatible with AutoGen/OpenAI-style params.
-        "temperature": float(os.getenv("DEBATE_TEMPERATURE", "1")),
-        "timeout": int(os.getenv("DEBATE_TIMEOUT", "120")),
-        "cache_seed": None,
-    }
+            },
+            "api_keys": api_keys,
+            # Groq limits are per key and mostly bind on tokens per minute.
+            "requests_per_minute": float(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30")),
+            "tokens_per_minute": float(os.getenv("GROQ_TOKENS_PER_MINUTE", "8000")),
+            # Keep defaults close to your Groq snippet, but compatible with AutoGen/OpenAI-style params.
+            "temperature": float(os.getenv("DEBATE_TEMPERATURE", "1")),
+            "timeout": int(os.getenv("DEBATE_TIMEOUT", "120")),
+        }
+
+    raise ValueError(f"Unsupported DEBATE_LLM_PROVIDER: {provider}. Use 'gemini' or 'groq'.")
+
+
+LLM_PROVIDER_SETTINGS = {
+    provider: _provider_settings(provider, DEBATE_MODEL if i == 0 else _provider_model(provider))
+    for i, provider in enumerate(dict.fromkeys(DEBATE_LLM_PROVIDERS or ["gemini"]))
+}
+_primary = LLM_PROVIDER_SETTINGS[DEBATE_LLM_PROVIDER]
+
+# AutoGen tries config_list entries in order and moves to the next one when a call
+# raises an API error (429, timeout, 5xx), so the provider order is the failover order.
+LLM_CONFIG = {
+    "config_list": [settings["entry"] for settings in LLM_PROVIDER_SETTINGS.values()],
+    "temperature": _primary["temperature"],
+    "timeout": _primary["timeout"],
+    "cache_seed": None,  # Disable caching for varied responses
+}
 
-else:
-    raise ValueError(f"Unsupported DEBATE_LLM_PROVIDER: {DEBATE_LLM_PROVIDER}. Use 'gemini' or 'groq'.")
+# Hedged requests (async execution path): if the first provider has not answered
+# within its observed p95 latency, race the next provider and keep the first reply.
+DEBATE_LLM_HEDGE = os.getenv("DEBATE_LLM_HEDGE", "0").lower() in {"1", "true", "yes"}
+# Hedge delay used until enough latencies have been observed to estimate the p95.
+DEBATE_LLM_HEDGE_DELAY_SECONDS = float(os.getenv("DEBATE_LLM_HEDGE_DELAY_SECONDS", "20"))
+
+# Where the limiter keeps its bucket state:
+# - "memory": this process only (single uvicorn worker)
+# - "file": a lock-guarded JSON file shared by every worker on this host
+# Defaults to "file" when WEB_CONCURRENCY asks uvicorn for several workers.
+DEBATE_RATE_LIMIT_BACKEND = os.getenv(
+    "DEBATE_RATE_LIMIT_BACKEND",
+    "file" if int(os.getenv("WEB_CONCURRENCY", "1")) > 1 else "memory",
+).strip().lower()
+DEBATE_RATE_LIMIT_STATE = os.getenv(
+    "DEBATE_RATE_LIMIT_STATE", str(Path(__file__).parent / "data" / "ratelimit.json")
+)
+
+# Per-key RPM/TPM token buckets in front of every LLM call (AutoGen and async paths).
+# Safe to call multiple times.
+# Each provider gets its own limiter (its own keys and quota); the backend is shared.
+_rate_limit_backend = create_rate_limit_backend(DEBATE_RATE_LIMIT_BACKEND, path=DEBATE_RATE_LIMIT_STATE)
+for _provider, _settings in LLM_PROVIDER_SETTINGS.items():
+    configure_rate_limiter(
+        _settings["api_keys"],
+        _settings["requests_per_minute"],
+        _settings["tokens_per_minute"],
+        backend=_rate_limit_backend,
+        name=_provider,
+        base_url=_settings["entry"]["base_url"],
+    )
+patch_autogen_for_rate_limits()
+
+# Share one keep-alive HTTP client per base_url across every agent's OpenAI client,
+# so new agents/debates reuse warm TLS connections instead of opening their own pool.
+DEBATE_SHARED_HTTP_CLIENT = os.getenv("DEBATE_SHARED_HTTP_CLIENT", "1").lower() in {"1", "true", "yes"}
+if DEBATE_SHARED_HTTP_CLIENT:
+    for _entry in LLM_CONFIG["config_list"]:
+        _entry["http_client"] = get_sync_client(_entry["base_url"])
+
+# Opt-in per-call completion cache (SQLite), shared by all agents and sessions.
+# Only low-temperature calls (<= LLM_COMPLETION_CACHE_MAX_TEMPERATURE) and the
+# mandatory-SVG fallback are cached. Hits skip the rate limiter entirely.
+LLM_COMPLETION_CACHE = os.getenv("LLM_COMPLETION_CACHE", "0").lower() in {"1", "true", "yes"}
+if LLM_COMPLETION_CACHE:
+    configure_completion_cache(
+        path=os.getenv(
+            "LLM_COMPLETION_CACHE_PATH", str(Path(__file__).parent / "data" / "completions.sqlite3")
+        ),
+        max_entries=int(os.getenv("LLM_COMPLETION_CACHE_MAX_ENTRIES", "5000")),
+        max_temperature=float(os.getenv("LLM_COMPLETION_CACHE_MAX_TEMPERATURE", "0.3")),
+    )
+
+# Number of pre-built design crews kept warm and reused across debates
+DEBATE_CREW_POOL_SIZE = int(os.getenv("DEBATE_CREW_POOL_SIZE", "2"))
 
 # Agent-specific configurations
 CRITIC_CONFIG = {
@@ -140,18 +257,97 @@ if GEMINI_FREE_TIER_MODE:
     # You can override these in env vars if desired.
     DEBATE_SETTINGS["max_messages_per_round"] = int(os.getenv("DEBATE_MAX_MESSAGES_PER_ROUND", "3"))
     DEBATE_SETTINGS["max_rounds"] = int(os.getenv("DEBATE_MAX_ROUNDS", "3"))
+    # At 12s per request a round's turns (plus speaker selection) need minutes, not one.
+    DEBATE_SETTINGS["timeout_per_round"] = 180
 
 if DEBATE_COMPACT_CONTEXT:
     # Groq/OpenAI-compatible providers may reject very large prompts under TPM limits.
     # This caps the number of turns per round to keep context small.
     DEBATE_SETTINGS["max_messages_per_round"] = int(os.getenv("DEBATE_MAX_MESSAGES_PER_ROUND", "4"))
 
+# Parallel round mode: the Artist speaks first, then Critic/UX/Brand review the proposal
+# concurrently (still paced by the provider rate limiter) and the Orchestrator synthesizes.
+DEBATE_PARALLEL_ROUNDS = os.getenv("DEBATE_PARALLEL_ROUNDS", "0").lower() in {"1", "true", "yes"}
+
+# Execution mode for agent turns:
+# - "autogen": AutoGen GroupChat / agents run in worker threads (default)
+# - "async": asyncio-native HTTP calls with the async rate gate; no thread per debate.
+#   Uses round-robin turn order within a round.
+DEBATE_EXECUTION_MODE = os.getenv("DEBATE_EXECUTION_MODE", "autogen").strip().lower()
+if DEBATE_EXECUTION_MODE not in {"autogen", "async"}:
+    raise ValueError(f"Unsupported DEBATE_EXECUTION_MODE: {DEBATE_EXECUTION_MODE}. Use 'autogen' or 'async'.")
+
+# Round graph: path to a JSON list of rounds (see debate_graph.RoundSpec); empty = built-in
+# proposals -> refinement -> consensus. DEBATE_SETTINGS["max_rounds"] caps its length, and
+# rounds marked exit_on_consensus end the debate early once consensus_threshold of the
+# round's voters approve.
+DEBATE_ROUND_GRAPH = os.getenv("DEBATE_ROUND_GRAPH", "").strip()
+DEBATE_SETTINGS["max_rounds"] = int(os.getenv("DEBATE_MAX_ROUNDS", str(DEBATE_SETTINGS["max_rounds"])))
+DEBATE_SETTINGS["consensus_threshold"] = float(
+    os.getenv("DEBATE_CONSENSUS_THRESHOLD", str(DEBATE_SETTINGS["consensus_threshold"]))
+)
+
+# Deadlines: a round is cut off after timeout_per_round and a whole debate after
+# DEBATE_DEADLINE_SECONDS (clients may ask for less); the session then completes as
+# "partial" with whatever was said. LLM call timeouts shrink to the time left.
+DEBATE_SETTINGS["timeout_per_round"] = float(
+    os.getenv("DEBATE_ROUND_TIMEOUT_SECONDS", str(DEBATE_SETTINGS["timeout_per_round"]))
+)
+DEBATE_DEADLINE_SECONDS = float(os.getenv("DEBATE_DEADLINE_SECONDS", "600"))
+# Budget of the mandatory-SVG fallback call, which also runs after a round was cut off
+# (still within the debate's deadline)
+DEBATE_SVG_FALLBACK_TIMEOUT_SECONDS = float(
+    os.getenv("DEBATE_SVG_FALLBACK_TIMEOUT_SECONDS", "45" if GEMINI_FREE_TIER_MODE else "30")
+)
+# SSE keepalive interval; short enough that proxies and clients notice a stalled stream
+DEBATE_SSE_KEEPALIVE_SECONDS = float(os.getenv("DEBATE_SSE_KEEPALIVE_SECONDS", "15"))
+# Admission control: debates running at once, and how many more may wait in line
+# (beyond that /debate/start* answer 429 with Retry-After)
+DEBATE_MAX_CONCURRENT = int(os.getenv("DEBATE_MAX_CONCURRENT", "4"))
+DEBATE_MAX_QUEUED = int(os.getenv("DEBATE_MAX_QUEUED", "16"))
+# Cancel a debate (and its pending LLM calls) when its /debate/start stream disconnects
+DEBATE_CANCEL_ON_DISCONNECT = os.getenv("DEBATE_CANCEL_ON_DISCONNECT", "1").lower() in {"1", "true", "yes"}
+# ...unless a viewer (re)attaches within this many seconds
+DEBATE_DISCONNECT_GRACE_SECONDS = float(os.getenv("DEBATE_DISCONNECT_GRACE_SECONDS", "15"))
+# Replayable per-session event log: events kept per debate, and how long a
+# finished debate's log stays available for late viewers and resumes
+DEBATE_EVENT_LOG_SIZE = int(os.getenv("DEBATE_EVENT_LOG_SIZE", "2000"))
+DEBATE_EVENT_LOG_RETENTION_SECONDS = float(os.getenv("DEBATE_EVENT_LOG_RETENTION_SECONDS", "300"))
+# Unread events one viewer may fall behind before it is caught up by skipping
+# token deltas, then the oldest events
+DEBATE_VIEWER_MAX_LAG = int(os.getenv("DEBATE_VIEWER_MAX_LAG", "200"))
+# Per-WebSocket outbound queue; a client that overflows it (or stalls a single
+# send past the timeout) is disconnected and can resume with ?since=
+DEBATE_WS_SEND_QUEUE = int(os.getenv("DEBATE_WS_SEND_QUEUE", "256"))
+DEBATE_WS_SEND_TIMEOUT_SECONDS = float(os.getenv("DEBATE_WS_SEND_TIMEOUT_SECONDS", "10"))
+
 # Speaker selection method: 'auto' costs extra LLM calls on some backends.
 DEBATE_SPEAKER_SELECTION_METHOD = os.getenv(
     "DEBATE_SPEAKER_SELECTION_METHOD",
     "round_robin" if (GEMINI_FREE_TIER_MODE or DEBATE_COMPACT_CONTEXT) else "auto",
 )
 
+# Session storage: "memory" (LRU + idle TTL, lost on restart) or "sqlite" (durable, incremental writes)
+DEBATE_SESSION_STORE = os.getenv("DEBATE_SESSION_STORE", "memory").strip().lower()
+DEBATE_SESSION_DB = os.getenv(
+    "DEBATE_SESSION_DB", str(Path(__file__).parent / "data" / "debates.sqlite3")
+)
+DEBATE_SESSION_MAX = int(os.getenv("DEBATE_SESSION_MAX", "500"))
+DEBATE_SESSION_TTL_SECONDS = float(os.getenv("DEBATE_SESSION_TTL_SECONDS", "86400"))
+# Memory store only: budget for finished sessions held in RAM (0 = unlimited),
+# where evicted sessions are archived (empty = drop them), and how often the reaper runs.
+DEBATE_SESSION_MEMORY_BUDGET_MB = float(os.getenv("DEBATE_SESSION_MEMORY_BUDGET_MB", "256"))
+DEBATE_SESSION_ARCHIVE_DIR = os.getenv(
+    "DEBATE_SESSION_ARCHIVE_DIR", str(Path(__file__).parent / "data" / "archive")
+)
+DEBATE_REAPER_INTERVAL_SECONDS = float(os.getenv("DEBATE_REAPER_INTERVAL_SECONDS", "60"))
+
+# Opt-in cache of completed debates keyed on the normalized brief + debate setup;
+# a repeated brief is replayed instead of re-running every round.
+DEBATE_RESPONSE_CACHE = os.getenv("DEBATE_RESPONSE_CACHE", "0").lower() in {"1", "true", "yes"}
+DEBATE_RESPONSE_CACHE_SIZE = int(os.getenv("DEBATE_RESPONSE_CACHE_SIZE", "128"))
+DEBATE_RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("DEBATE_RESPONSE_CACHE_TTL_SECONDS", "3600"))
+
 # Server settings (override via env for easier local testing)
 # Examples:
 #   - set AGENTS_PORT=8001
@@ -0,0 +1,231 @@
+"""
+Context Budget - token-aware prompt and history budgeting
+Replaces character truncation: text is measured in (estimated) tokens and a
+request's token budget is shared out across its parts, trimming the
+lowest-value parts first.
+"""
+from typing import Callable, Dict, List, Optional
+from dataclasses import dataclass
+import math
+import re
+
+
+# --- Token counting ---------------------------------------------------------
+
+_SEGMENT = re.compile(
+    r"(?P<cjk>[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff])"
+    r"|(?P<ascii>[A-Za-z]+)"
+    r"|(?P<digits>\d+)"
+    r"|(?P<word>[^\W\d_]+)"
+    r"|(?P<space>\s+)"
+    r"|(?P<symbol>.)",
+    re.DOTALL,
+)
+
+
+def heuristic_token_count(text: str) -> int:
+    """Offline token estimate tuned to BPE tokenizers (cl100k/o200k-like).
+
+    Unlike len/4 it charges CJK characters ~1 token each, other non-Latin
+    words ~1 token per 2 characters, and markup symbols (SVG, JSON) 1 token
+    each, which is where the character proxy went most wrong.
+    """
+    if not text:
+        return 0
+    tokens = 0
+    for m in _SEGMENT.finditer(text):
+        kind = m.lastgroup
+        size = m.end() - m.start()
+        if kind == "cjk" or kind == "symbol":
+            tokens += 1
+        elif kind == "ascii":
+            tokens += math.ceil(size / 4)
+        elif kind == "digits":
+            tokens += math.ceil(size / 3)
+        elif kind == "word":
+            tokens += math.ceil(size / 2)
+        # whitespace is mostly merged into the following token
+    return tokens
+
+
+def _tiktoken_counter() -> Optional[Callable[[str], int]]:
+    try:
+        import tiktoken  # type: ignore
+    except ImportError:
+        return None
+    encoding = tiktoken.get_encoding("o200k_base")
+    return lambda text: len(encoding.encode(text or "", disallowed_special=()))
+
+
+_counter: Callable[[str], int] = heuristic_token_count
+
+
+def set_tokenizer(name: str) -> str:
+    """Select the token counter: "heuristic" (default) or "tiktoken" (if installed).
+
+    Returns the name actually in use.
+    """
+    global _counter
+    if name == "tiktoken":
+        counter = _tiktoken_counter()
+        if counter is not None:
+            _counter = counter
+            return "tiktoken"
+        print("⚠️ tiktoken is not installed; using the heuristic token estimate")
+    _counter = heuristic_token_count
+    return "heuristic"
+
+
+def count_tokens(text: str) -> int:
+    return _counter(text or "")
+
+
+# Chat formats add a few tokens of framing per message.
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def count_message_tokens(messages: List[Dict]) -> int:
+    total = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, list):
+            content = " ".join(str(part.get("text", "")) for part in content if isinstance(part, dict))
+        total += count_tokens(content or "") + MESSAGE_OVERHEAD_TOKENS
+    return total
+
+
+# --- Trimming ----------------------------------------------------------------
+
+TRUNCATION_MARKER = "\n\n[TRUNCATED]"
+_SVG_BLOCK = re.compile(r"<svg\b[\s\S]*?</svg>", re.IGNORECASE)
+
+
+def compact_svg(text: str) -> str:
+    """Replace inline SVG markup with a short placeholder (it is token-heavy and rarely needs re-reading)."""
+    return _SVG_BLOCK.sub(lambda m: f"[SVG prototype, {len(m.group(0))} chars, omitted]", text or "")
+
+
+def truncate_to_tokens(text: str, max_tokens: int, keep: str = "head") -> str:
+    """Cut `text` to at most `max_tokens` tokens, keeping its start ("head") or end ("tail")."""
+    if not text or count_tokens(text) <= max_tokens:
+        return text or ""
+    if max_tokens <= count_tokens(TRUNCATION_MARKER):
+        return ""
+    budget = max_tokens - count_tokens(TRUNCATION_MARKER)
+    # Binary search on the character cut; token counts are monotone in length.
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        piece = text[:mid] if keep == "head" else text[-mid:]
+        if count_tokens(piece) <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    if keep == "head":
+        return text[:lo].rstrip() + TRUNCATION_MARKER
+    if not lo:
+        return ""
+    return "[TRUNCATED]\n\n" + text[-lo:].lstrip()
+
+
+# --- Budgeting ---------------------------------------------------------------
+
+@dataclass
+class BudgetPart:
+    """One piece of a prompt competing for the budget.
+
+    Parts with a lower `priority` are compacted/trimmed first; a part is never
+    cut below `min_tokens` (unless its own text is shorter).
+    """
+    name: str
+    text: str
+    priority: int = 0
+    min_tokens: int = 0
+    keep: str = "head"
+
+
+def fit_parts(parts: List[BudgetPart], max_tokens: int) -> Dict[str, str]:
+    """Shrink `parts` until their total fits in `max_tokens`; return name -> text."""
+    texts = {p.name: p.text or "" for p in parts}
+    counts = {name: count_tokens(text) for name, text in texts.items()}
+
+    def over() -> int:
+        return sum(counts.values()) - max_tokens
+
+    if over() <= 0:
+        return texts
+
+    ordered = sorted(parts, key=lambda p: p.priority)
+    # Cheapest loss first: drop inline SVG markup from the lowest-value parts.
+    for part in ordered:
+        if over() <= 0:
+            return texts
+        compacted = compact_svg(texts[part.name])
+        if compacted != texts[part.name]:
+            texts[part.name] = compacted
+            counts[part.name] = count_tokens(compacted)
+
+    # Then trim each part down towards its floor, lowest value first.
+    for part in ordered:
+        excess = over()
+        if excess <= 0:
+            break
+        target = max(part.min_tokens, counts[part.name] - excess)
+        if target < counts[part.name]:
+            texts[part.name] = truncate_to_tokens(texts[part.name], target, keep=part.keep)
+            counts[part.name] = count_tokens(texts[part.name])
+    return texts
+
+
+def fit_messages(messages: List[Dict], max_tokens: int, keep_first: bool = True) -> List[Dict]:
+    """Fit a chat history into `max_tokens`, oldest/least useful content first.
+
+    Order of sacrifice: SVG markup in older messages, then whole older
+    messages (the first one, usually the task brief, is kept when
+    `keep_first`), then the remaining long messages are truncated. The most
+    recent message is always kept.
+    """
+    if not messages or count_message_tokens(messages) <= max_tokens:
+        return messages
+
+    out = [dict(m) for m in messages]
+    protected = {len(out) - 1} | ({0} if keep_first else set())
+
+    for i in range(len(out) - 1):
+        if count_message_tokens(out) <= max_tokens:
+            return out
+        if isinstance(out[i].get("content"), str):
+            out[i]["content"] = compact_svg(out[i]["content"])
+
+    droppable = [i for i in range(len(out)) if i not in protected]
+    dropped = set()
+    for i in droppable:
+        if count_message_tokens([m for j, m in enumerate(out) if j not in dropped]) <= max_tokens:
+            break
+        dropped.add(i)
+    out = [m for j, m in enumerate(out) if j not in dropped]
+
+    excess = count_message_tokens(out) - max_tokens
+    if excess > 0:
+        # Trim the largest remaining text messages; the latest keeps its tail (the actual ask).
+        # Multimodal (list) contents are counted above but never truncated.
+        trimmable = [i for i in range(len(out)) if isinstance(out[i].get("content"), str)]
+        for i in sorted(trimmable, key=lambda j: -count_message_tokens([out[j]])):
+            if excess <= 0:
+                break
+            content = out[i]["content"]
+            size = count_tokens(content)
+            target = max(16, size - excess)
+            out[i]["content"] = truncate_to_tokens(content, target, keep="tail" if i == len(out) - 1 else "head")
+            excess -= size - count_tokens(out[i]["content"])
+    return out
+
+
+def make_history_hook(max_input_tokens: int, system_message: str = "", reserve_tokens: int = 0):
+    """AutoGen `process_all_messages_before_reply` hook that keeps an agent's history in budget."""
+    fixed = count_tokens(system_message) + MESSAGE_OVERHEAD_TOKENS + reserve_tokens
+
+    def _hook(messages: List[Dict]) -> List[Dict]:
+        return fit_messages(messages, max(256, max_input_tokens - fixed))
+
+    return _hook
@@ -0,0 +1,70 @@
+"""
+Debate Response Cache - replay finished debates for identical briefs
+Content-addressed LRU+TTL cache of completed sessions, keyed on everything
+that shapes a debate's output
+"""
+from typing import Any, Dict, Optional
+from collections import OrderedDict
+import hashlib
+import json
+import threading
+import time
+import unicodedata
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Canonical form of a design brief: NFC, trimmed, whitespace collapsed."""
+    return " ".join(unicodedata.normalize("NFC", prompt or "").split())
+
+
+def cache_key(design_prompt: str, fingerprint: Dict[str, Any]) -> str:
+    """Content address of a debate: the normalized brief plus the debate setup fingerprint."""
+    payload = json.dumps(
+        {"prompt": normalize_prompt(design_prompt), "setup": fingerprint},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DebateResponseCache:
+    """
+    In-process LRU cache of completed sessions with a time-to-live.
+
+    Entries are `DebateSession.to_dict()` snapshots, so later changes to the
+    original session never leak into replays.
+    """
+
+    def __init__(self, max_entries: int = 128, ttl_seconds: float = 3600):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, snapshot = entry
+                if self.ttl_seconds > 0 and time.monotonic() - stored_at > self.ttl_seconds:
+                    self._entries.pop(key, None)
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return snapshot
+
+    def put(self, key: str, snapshot: Dict) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,151 @@
+"""
+Debate Graph - declarative round plan and early-stop evaluation
+A debate is a sequence of rounds, each declaring its theme, prompt,
+participants and exit conditions. The default graph reproduces the classic
+proposals -> refinement -> consensus flow; a JSON file can replace it.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+from dataclasses import asdict, dataclass
+import json
+
+
+# Crew keys (see design_crew.create_design_crew) and the agent names they map to
+CREW_AGENTS = {
+    "orchestrator": "Orchestrator",
+    "artist": "DesignArtist",
+    "critic": "DesignCritic",
+    "ux": "UXResearcher",
+    "brand": "BrandStrategist",
+}
+ALL_PARTICIPANTS = tuple(CREW_AGENTS)
+
+VOTE_INSTRUCTION = (
+    "Every agent except the Orchestrator ends their reply with one line "
+    "'Vote: Approve', 'Vote: Adjust' or 'Vote: Rethink'."
+)
+
+
+@dataclass(frozen=True)
+class RoundSpec:
+    """One node of the round graph."""
+    theme: str
+    title: str
+    instructions: str
+    participants: Tuple[str, ...] = ALL_PARTICIPANTS
+    include_brief: bool = False      # put the design challenge in the prompt
+    include_state: bool = True       # put the structured debate state in the prompt
+    require_svg: bool = False        # ask the Artist for a fallback SVG if none was produced
+    exit_on_consensus: bool = False  # skip the remaining rounds when the votes agree
+    final: bool = False              # always kept when the graph is cut to max_rounds
+
+    @property
+    def voters(self) -> List[str]:
+        return [CREW_AGENTS[key] for key in self.participants if key != "orchestrator"]
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["participants"] = list(self.participants)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RoundSpec":
+        unknown = set(data) - set(cls.__dataclass_fields__)
+        if unknown:
+            raise ValueError(f"Unknown round graph field(s): {', '.join(sorted(unknown))}")
+        participants = tuple(data.get("participants") or ALL_PARTICIPANTS)
+        bad = [p for p in participants if p not in CREW_AGENTS]
+        if bad:
+            raise ValueError(f"Unknown participant(s): {', '.join(bad)}. Use {', '.join(CREW_AGENTS)}.")
+        if "orchestrator" not in participants:
+            # The Orchestrator moderates every round
+            participants = ("orchestrator",) + participants
+        return cls(**{**data, "participants": participants})
+
+
+DEFAULT_ROUND_GRAPH: Tuple[RoundSpec, ...] = (
+    RoundSpec(
+        theme="Initial Analysis & Proposals",
+        title="Design Challenge",
+        instructions=(
+            "Orchestrator: introduce challenge; ask Artist for 2-3 concepts; "
+            "ask Critic/UX/Brand for fast feedback.\n\n"
+            "IMPORTANT: DesignArtist MUST include at least one minimal valid <svg>...</svg> prototype "
+            "for the best concept (raw SVG, no markdown fences)."
+        ),
+        include_brief=True,
+        include_state=False,
+        require_svg=True,
+        exit_on_consensus=True,
+    ),
+    RoundSpec(
+        theme="Critique & Refinement Debate",
+        title="Round {n}: Refinement",
+        instructions=(
+            "Orchestrator: ask Artist to revise; ask others to confirm/adjust; "
+            "end with a 'Decisions:' list of 3-5 bullets and an 'Open issues:' list (if any)."
+        ),
+        exit_on_consensus=True,
+    ),
+    RoundSpec(
+        theme="Final Consensus",
+        title="Round {n}: Consensus",
+        instructions=(
+            "Orchestrator: request final votes (Approve/Adjust/Rethink) + 1 sentence reason each; "
+            "then output final recommendation, score (1-10), and next steps."
+        ),
+        final=True,
+    ),
+)
+
+
+def load_round_graph(path: Optional[str] = None) -> Tuple[RoundSpec, ...]:
+    """The round graph from a JSON file (a list of RoundSpec fields), or the default one."""
+    if not path:
+        return DEFAULT_ROUND_GRAPH
+    with open(path, "r", encoding="utf-8") as fh:
+        data = json.load(fh)
+    if not isinstance(data, list) or not data:
+        raise ValueError(f"Round graph {path} must be a non-empty JSON list of rounds")
+    return tuple(RoundSpec.from_dict(item) for item in data)
+
+
+def build_round_graph(specs: Iterable[RoundSpec], max_rounds: int) -> Tuple[RoundSpec, ...]:
+    """Cut the graph to `max_rounds`, dropping middle rounds before the first or final ones."""
+    specs = list(specs)
+    max_rounds = max(1, max_rounds)
+    if len(specs) <= max_rounds:
+        return tuple(specs)
+    keep = [i for i, spec in enumerate(specs) if spec.final][-1:] or [len(specs) - 1]
+    keep = [0] + [i for i in keep if i != 0]
+    for i in range(1, len(specs)):
+        if len(keep) >= max_rounds:
+            break
+        if i not in keep:
+            keep.append(i)
+    return tuple(specs[i] for i in sorted(keep[:max_rounds]))
+
+
+def round_prompt(spec: RoundSpec, round_number: int, brief: str, state: str, rules: str) -> str:
+    """Assemble the opening message of a round."""
+    parts = [f"## {spec.title.format(n=round_number)}"]
+    if spec.include_brief:
+        parts.append(brief)
+    if spec.include_state:
+        parts.append(f"Debate state so far:\n{state}")
+    parts.append(rules)
+    parts.append(spec.instructions)
+    if spec.exit_on_consensus:
+        parts.append(VOTE_INSTRUCTION)
+    return "\n\n".join(parts)
+
+
+def consensus_reached(votes: Dict[str, str], voters: List[str], threshold: float) -> bool:
+    """True when at least `threshold` of the round's expected voters approved.
+
+    Voters who did not vote count against consensus, so a round where only
+    one agent happened to speak cannot end the debate on its own.
+    """
+    if not voters:
+        return False
+    approvals = sum(1 for name in voters if votes.get(name) == "approve")
+    return approvals / len(voters) >= threshold
@@ -2,115 +2,166 @@
 Debate Manager - Orchestrates Multi-Agent Design Debates
 Manages debate sessions, rounds, and consensus building
 """
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Any, Optional, Callable, Awaitable
 from datetime import datetime
-from enum import Enum
+import copy
 import json
 import uuid
 import asyncio
 import re
+import threading
+import time
 
 from autogen import GroupChat, GroupChatManager
 try:
-    from design_crew import create_design_crew
+    from design_crew import CrewPool, AGENT_LLM_CONFIGS, AGENT_SYSTEM_PROMPTS
+    from models import DebateStatus, AgentVote, AgentMessage, DebateRound, DebateSession
+    from session_store import SessionStore, create_session_store
+    from debate_cache import DebateResponseCache, cache_key
+    from llm_streaming import call_with_deltas
+    from completion_cache import force_completion_cache
+    from llm_scheduler import DEFAULT_PRIORITY, DeadlineExceededError, llm_call_context
+    from context_budget import (
+        BudgetPart, count_message_tokens, fit_messages, fit_parts, truncate_to_tokens
+    )
+    from debate_state import DebateState
+    from debate_graph import (
+        CREW_AGENTS, RoundSpec, build_round_graph, consensus_reached, load_round_graph, round_prompt
+    )
+    from async_llm import chat_completion
     from config import (
         DEBATE_SETTINGS,
+        DEBATE_ROUND_GRAPH,
         ORCHESTRATOR_CONFIG,
         DEBATE_SPEAKER_SELECTION_METHOD,
         DEBATE_COMPACT_CONTEXT,
-        DEBATE_MAX_USER_PROMPT_CHARS,
-        DEBATE_MAX_SUMMARY_CHARS,
+        DEBATE_MAX_USER_PROMPT_TOKENS,
+        DEBATE_MAX_SUMMARY_TOKENS,
+        DEBATE_MAX_INPUT_TOKENS,
         DEBATE_MAX_AGENT_MESSAGE_CHARS,
+        DEBATE_PARALLEL_ROUNDS,
+        DEBATE_EXECUTION_MODE,
+        DEBATE_LLM_HEDGE,
+        DEBATE_LLM_HEDGE_DELAY_SECONDS,
+        DEBATE_SESSION_STORE,
+        DEBATE_SESSION_DB,
+        DEBATE_SESSION_MAX,
+        DEBATE_SESSION_TTL_SECONDS,
+        DEBATE_SESSION_MEMORY_BUDGET_MB,
+        DEBATE_SESSION_ARCHIVE_DIR,
+        DEBATE_REAPER_INTERVAL_SECONDS,
+        DEBATE_RESPONSE_CACHE,
+        DEBATE_RESPONSE_CACHE_SIZE,
+        DEBATE_RESPONSE_CACHE_TTL_SECONDS,
+        DEBATE_DEADLINE_SECONDS,
+        DEBATE_SVG_FALLBACK_TIMEOUT_SECONDS,
     )
 except ModuleNotFoundError:
-    from agents.design_crew import create_design_crew
+    from agents.design_crew import CrewPool, AGENT_LLM_CONFIGS, AGENT_SYSTEM_PROMPTS
+    from agents.models import DebateStatus, AgentVote, AgentMessage, DebateRound, DebateSession
+    from agents.session_store import SessionStore, create_session_store
+    from agents.debate_cache import DebateResponseCache, cache_key
+    from agents.llm_streaming import call_with_deltas
+    from agents.completion_cache import force_completion_cache
+    from agents.llm_scheduler import DEFAULT_PRIORITY, DeadlineExceededError, llm_call_context
+    from agents.context_budget import (
+        BudgetPart, count_message_tokens, fit_messages, fit_parts, truncate_to_tokens
+    )
+    from agents.debate_state import DebateState
+    from agents.debate_graph import (
+        CREW_AGENTS, RoundSpec, build_round_graph, consensus_reached, load_round_graph, round_prompt
+    )
+    from agents.async_llm import chat_completion
     from agents.config import (
         DEBATE_SETTINGS,
+        DEBATE_ROUND_GRAPH,
         ORCHESTRATOR_CONFIG,
         DEBATE_SPEAKER_SELECTION_METHOD,
         DEBATE_COMPACT_CONTEXT,
-        DEBATE_MAX_USER_PROMPT_CHARS,
-        DEBATE_MAX_SUMMARY_CHARS,
+        DEBATE_MAX_USER_PROMPT_TOKENS,
+        DEBATE_MAX_SUMMARY_TOKENS,
+        DEBATE_MAX_INPUT_TOKENS,
         DEBATE_MAX_AGENT_MESSAGE_CHARS,
+        DEBATE_PARALLEL_ROUNDS,
+        DEBATE_EXECUTION_MODE,
+        DEBATE_LLM_HEDGE,
+        DEBATE_LLM_HEDGE_DELAY_SECONDS,
+        DEBATE_SESSION_STORE,
+        DEBATE_SESSION_DB,
+        DEBATE_SESSION_MAX,
+        DEBATE_SESSION_TTL_SECONDS,
+        DEBATE_SESSION_MEMORY_BUDGET_MB,
+        DEBATE_SESSION_ARCHIVE_DIR,
+        DEBATE_REAPER_INTERVAL_SECONDS,
+        DEBATE_RESPONSE_CACHE,
+        DEBATE_RESPONSE_CACHE_SIZE,
+        DEBATE_RESPONSE_CACHE_TTL_SECONDS,
+        DEBATE_DEADLINE_SECONDS,
+        DEBATE_SVG_FALLBACK_TIMEOUT_SECONDS,
     )
 
 
-class DebateStatus(str, Enum):
-    PENDING = "pending"
-    IN_PROGRESS = "in_progress"
-    ROUND_COMPLETE = "round_complete"
-    CONSENSUS_REACHED = "consensus_reached"
-    FAILED = "failed"
-    COMPLETED = "completed"
+class _RoundCutOff(Exception):
+    """Ends an AutoGen chat whose round was cut off by its deadline."""
 
 
-class AgentVote(str, Enum):
-    APPROVE = "approve"
-    ADJUST = "adjust"
-    RETHINK = "rethink"
+class _StreamingGroupChat(GroupChat):
+    """GroupChat that reports every message the moment it joins the transcript.
 
+    AutoGen calls ``append`` from the worker thread for the initial prompt and
+    for each speaker's reply, so the hook fires once per turn instead of after
+    the whole round has finished.
+    """
 
-@dataclass
-class AgentMessage:
-    """A single message from an agent in the debate."""
-    agent_name: str
-    agent_role: str
-    content: str
-    timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
-    round_number: int = 0
-    message_type: str = "discussion"  # discussion, vote, consensus
-    
-    def to_dict(self) -> Dict:
-        return asdict(self)
-
-
-@dataclass
-class DebateRound:
-    """A single round in the debate."""
-    round_number: int
-    theme: str  # e.g., "Initial Critique", "Refinement", "Consensus"
-    messages: List[AgentMessage] = field(default_factory=list)
-    votes: Dict[str, str] = field(default_factory=dict)
-    status: str = "pending"
-    summary: str = ""
-    
-    def to_dict(self) -> Dict:
-        return {
-            "round_number": self.round_number,
-            "theme": self.theme,
-            "messages": [m.to_dict() for m in self.messages],
-            "votes": self.votes,
-            "status": self.status,
-            "summary": self.summary
-        }
+    def __init__(self, *args, on_message: Callable[[Dict], None], **kwargs):
+        super().__init__(*args, **kwargs)
+        self._on_message = on_message
+        # Name of the agent whose reply is being generated (None while selecting).
+        self.current_speaker: Optional[str] = None
+        # Set when the round is cut off; the chat ends before the next turn.
+        self.stop = threading.Event()
 
+    def append(self, message: Dict, speaker):
+        super().append(message, speaker)
+        self._on_message(self.messages[-1])
 
-@dataclass
-class DebateSession:
-    """Complete debate session with all rounds and metadata."""
-    session_id: str
-    design_prompt: str
-    project_id: Optional[str] = None
-    status: DebateStatus = DebateStatus.PENDING
-    rounds: List[DebateRound] = field(default_factory=list)
-    consensus: Optional[Dict] = None
-    final_score: float = 0.0
-    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
-    completed_at: Optional[str] = None
-    
-    def to_dict(self) -> Dict:
-        return {
-            "session_id": self.session_id,
-            "design_prompt": self.design_prompt,
-            "project_id": self.project_id,
-            "status": self.status.value,
-            "rounds": [r.to_dict() for r in self.rounds],
-            "consensus": self.consensus,
-            "final_score": self.final_score,
-            "created_at": self.created_at,
-            "completed_at": self.completed_at
-        }
+    def select_speaker(self, last_speaker, selector):
+        if self.stop.is_set():
+            raise _RoundCutOff("round deadline passed")
+        self.current_speaker = None
+        speaker = super().select_speaker(last_speaker, selector)
+        self.current_speaker = getattr(speaker, "name", None)
+        return speaker
+
+
+class _ThreadBridge:
+    """Carries items emitted by an AutoGen worker thread back to the event loop, in order."""
+
+    def __init__(self):
+        self._loop = asyncio.get_running_loop()
+        self._inbox: asyncio.Queue = asyncio.Queue()
+
+    def emit(self, *item):
+        """Thread-safe: queue an item for the handler on the event loop."""
+        self._loop.call_soon_threadsafe(self._inbox.put_nowait, item)
+
+    async def run(self, handle: Callable[..., Awaitable], fn: Callable, *args, **kwargs):
+        """Run `fn` in a worker thread, awaiting `handle(*item)` for each emitted item."""
+        work = asyncio.ensure_future(asyncio.to_thread(fn, *args, **kwargs))
+        work.add_done_callback(lambda _: self._inbox.put_nowait(None))
+        try:
+            while True:
+                item = await self._inbox.get()
+                if item is None:
+                    break
+                await handle(*item)
+        except BaseException:
+            # Cancelled (or the handler failed) while the thread runs on: nobody awaits `work`,
+            # so retrieve its outcome (e.g. _RoundCutOff) instead of leaving it to be logged.
+            work.add_done_callback(lambda done: done.cancelled() or done.exception())
+            raise
+        # Surface any error raised inside the worker thread
+        return await work
 
 
 class DebateManager:
@@ -128,15 +179,45 @@ class DebateManager:
         "BrandStrategist": {"emoji": "💡", "color": "#F59E0B", "role": "Brand Strategist"}
     }
     
-    ROUND_THEMES = [
-        "Initial Analysis & Proposals",
-        "Critique & Refinement Debate",
-        "Final Consensus"
-    ]
+    # Declarative round plan (see debate_graph), capped at max_rounds
+    ROUND_GRAPH = build_round_graph(load_round_graph(DEBATE_ROUND_GRAPH), DEBATE_SETTINGS["max_rounds"])
+    ROUND_THEMES = [spec.theme for spec in ROUND_GRAPH]
     
-    def __init__(self):
-        self.sessions: Dict[str, DebateSession] = {}
+    def __init__(self, store: Optional[SessionStore] = None):
+        self.store = store or create_session_store(
+            DEBATE_SESSION_STORE,
+            path=DEBATE_SESSION_DB,
+            max_sessions=DEBATE_SESSION_MAX,
+            ttl_seconds=DEBATE_SESSION_TTL_SECONDS,
+            memory_budget_bytes=int(DEBATE_SESSION_MEMORY_BUDGET_MB * 1024 * 1024),
+            archive_dir=DEBATE_SESSION_ARCHIVE_DIR
+        )
         self.active_debates: Dict[str, asyncio.Task] = {}
+        # Structured running summary per debate in progress (see debate_state)
+        self._states: Dict[str, DebateState] = {}
+        self.crew_pool = CrewPool()
+        self.response_cache: Optional[DebateResponseCache] = None
+        if DEBATE_RESPONSE_CACHE:
+            self.response_cache = DebateResponseCache(
+                max_entries=DEBATE_RESPONSE_CACHE_SIZE,
+                ttl_seconds=DEBATE_RESPONSE_CACHE_TTL_SECONDS
+            )
+
+    def _setup_fingerprint(self) -> Dict:
+        """Everything besides the brief that changes what a debate produces."""
+        return {
+            "round_graph": [spec.to_dict() for spec in self.ROUND_GRAPH],
+            "max_messages_per_round": DEBATE_SETTINGS["max_messages_per_round"],
+            "parallel_rounds": DEBATE_PARALLEL_ROUNDS,
+            "agents": {
+                name: {
+                    "models": [entry.get("model") for entry in config["config_list"]],
+                    "temperature": config.get("temperature"),
+                    "system_prompt": AGENT_SYSTEM_PROMPTS.get(name),
+                }
+                for name, config in AGENT_LLM_CONFIGS.items()
+            },
+        }
 
     def _extract_svg_strings(self, texts: List[str]) -> List[str]:
         """Extract SVG blocks from a list of texts."""
@@ -186,17 +267,63 @@ class DebateManager:
                 theme=theme
             ))
         
-        self.sessions[session.session_id] = session
+        self.store.add(session)
         return session
     
     def get_session(self, session_id: str) -> Optional[DebateSession]:
         """Get a debate session by ID."""
-        return self.sessions.get(session_id)
+        return self.store.get(session_id)
+
+    def get_status(self, session_id: str) -> Optional[Dict]:
+        """Get a session's status summary without loading its transcript."""
+        return self.store.get_status(session_id)
+
+    def track(self, session_id: str, task: asyncio.Task) -> asyncio.Task:
+        """Register the task running a debate so it can be cancelled by session id."""
+        self.active_debates[session_id] = task
+
+        def _forget(done: asyncio.Task):
+            if self.active_debates.get(session_id) is done:
+                del self.active_debates[session_id]
+
+        task.add_done_callback(_forget)
+        return task
+
+    def abandon_pending(self, session_id: str) -> None:
+        """Mark a session cancelled if its debate never started (e.g. cancelled while queued)."""
+        session = self.store.get(session_id)
+        if session is not None and session.status == DebateStatus.PENDING:
+            session.status = DebateStatus.CANCELLED
+            session.completed_at = datetime.now().isoformat()
+            self.store.save_session(session)
+
+    def cancel_debate(self, session_id: str) -> bool:
+        """Cancel a running debate; False if it is not running in this process."""
+        task = self.active_debates.get(session_id)
+        if task is None or task.done():
+            return False
+        print(f"🛑 Cancelling debate {session_id}")
+        task.cancel()
+        return True
+
+    async def run_reaper(self, interval: float = DEBATE_REAPER_INTERVAL_SECONDS):
+        """Periodically evict (and archive) finished sessions; run as a background task."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                evicted = await asyncio.to_thread(self.store.reap)
+                if evicted:
+                    print(f"🧹 Evicted {evicted} finished debate session(s)")
+            except Exception as e:
+                print(f"⚠️ Session reaper error: {e}")
     
     async def run_debate(
         self, 
         session_id: str, 
-        message_callback: Optional[callable] = None
+        message_callback: Optional[callable] = None,
+        delta_callback: Optional[callable] = None,
+        priority: str = DEFAULT_PRIORITY,
+        deadline: Optional[float] = None
     ) -> DebateSession:
         """
         Run a complete debate session with all rounds.
@@ -205,160 +332,214 @@ class DebateManager:
             session_id: The debate session ID
             message_callback: Optional async callback for real-time messages
                              Called with (agent_name, message, round_number)
+            delta_callback: Optional async callback for token deltas (opt-in streaming)
+                           Called with (agent_name, delta, round_number); the full
+                           message is still delivered through message_callback
+            priority: Scheduling class for this debate's LLM calls
+                      ("interactive", "batch"; see llm_scheduler)
+            deadline: Wall-clock time (time.time()) by which the debate must end;
+                      defaults to DEBATE_DEADLINE_SECONDS from now. Rounds that do
+                      not fit are cut off or skipped and the session ends "partial".
         """
-        session = self.sessions.get(session_id)
+        session = self.store.get(session_id)
         if not session:
             raise ValueError(f"Session {session_id} not found")
         
+        if deadline is None:
+            deadline = time.time() + DEBATE_DEADLINE_SECONDS
         session.status = DebateStatus.IN_PROGRESS
+        self.store.save_session(session)
+        self._states[session_id] = DebateState.from_messages(
+            self.AGENT_INFO, (m for r in session.rounds for m in r.messages)
+        )
         
-        try:
-            # Create the design crew
-            crew = create_design_crew()
+        # Every LLM call made for this debate is scheduled under its session and priority.
+        # cancel_event lets calls already handed to worker threads see a cancellation.
+        cancel_event = threading.Event()
+        with llm_call_context(session_id=session_id, priority=priority, cancel_event=cancel_event):
+            crew = None
+            key = None
+            partial = False
+            # A cut-off AutoGen chat may still be finishing a call in its worker thread
+            crew_in_use = False
+            try:
+                if self.response_cache is not None:
+                    key = cache_key(session.design_prompt, self._setup_fingerprint())
+                    cached = self.response_cache.get(key)
+                    if cached is not None:
+                        await self._replay_debate(session, cached, message_callback)
+                        return session
+
+                # Lease a (possibly pre-warmed) design crew for this session
+                crew = self.crew_pool.acquire()
             
-            # Agent list for GroupChat (orchestrator moderates)
-            agents = [
-                crew["orchestrator"],
-                crew["artist"],
-                crew["critic"],
-                crew["ux"],
-                crew["brand"]
-            ]
+                # Agent list for GroupChat (orchestrator moderates)
+                agents = [
+                    crew["orchestrator"],
+                    crew["artist"],
+                    crew["critic"],
+                    crew["ux"],
+                    crew["brand"]
+                ]
             
-            # Run each debate round
-            for round_obj in session.rounds:
-                await self._run_round(
-                    session=session,
-                    round_obj=round_obj,
-                    agents=agents,
-                    crew=crew,
-                    callback=message_callback
-                )
-                round_obj.status = "complete"
+                # Run each debate round, stopping early once a round reaches consensus
+                for index, round_obj in enumerate(session.rounds):
+                    if time.time() >= deadline:
+                        print(f"⏱️ Debate {session_id} hit its deadline; "
+                              f"skipping {len(session.rounds) - index} round(s)")
+                        self._skip_rounds(session, session.rounds[index:])
+                        partial = True
+                        break
+                    spec = self._round_spec(round_obj)
+                    completed = await self._run_round(
+                        session=session,
+                        round_obj=round_obj,
+                        agents=agents,
+                        crew=crew,
+                        callback=message_callback,
+                        delta_callback=delta_callback,
+                        deadline=deadline
+                    )
+                    round_obj.status = "complete" if completed else "partial"
+                    self.store.save_round(session, round_obj)
+                    if not completed:
+                        partial = True
+                        crew_in_use = crew_in_use or DEBATE_EXECUTION_MODE != "async"
+                    if spec.exit_on_consensus and consensus_reached(
+                        round_obj.votes, spec.voters, DEBATE_SETTINGS["consensus_threshold"]
+                    ):
+                        print(f"🤝 Consensus after round {round_obj.round_number}; "
+                              f"skipping {len(session.rounds) - index - 1} round(s)")
+                        self._skip_rounds(session, session.rounds[index + 1:])
+                        break
             
-            # Calculate final consensus
-            session.consensus = self._calculate_consensus(session)
-            session.final_score = session.consensus.get("score", 0)
-            session.status = DebateStatus.COMPLETED
-            session.completed_at = datetime.now().isoformat()
+                # Calculate final consensus (from whatever was said, if the debate was cut short)
+                session.consensus = self._calculate_consensus(session)
+                session.final_score = session.consensus.get("score", 0)
+                session.status = DebateStatus.PARTIAL if partial else DebateStatus.COMPLETED
+                session.completed_at = datetime.now().isoformat()
+                self.store.save_session(session)
+                if key is not None and not partial:
+                    self.response_cache.put(key, session.to_dict())
             
-        except Exception as e:
-            session.status = DebateStatus.FAILED
-            if message_callback:
-                await message_callback("System", f"Debate failed: {str(e)}", 0)
-            raise
+            except asyncio.CancelledError:
+                cancel_event.set()
+                # A worker thread may still be inside an AutoGen call on this crew
+                crew_in_use = DEBATE_EXECUTION_MODE != "async"
+                session.status = DebateStatus.CANCELLED
+                session.completed_at = datetime.now().isoformat()
+                self.store.save_session(session)
+                raise
+            except Exception as e:
+                session.status = DebateStatus.FAILED
+                self.store.save_session(session)
+                if message_callback:
+                    await message_callback("System", f"Debate failed: {str(e)}", 0)
+                raise
+            finally:
+                self._states.pop(session_id, None)
+                # A crew still in use by an abandoned worker thread is dropped, not pooled.
+                if crew is not None and not crew_in_use:
+                    self.crew_pool.release(crew)
         
-        return session
+            return session
     
+    async def _replay_debate(
+        self,
+        session: DebateSession,
+        cached: Dict,
+        callback: Optional[callable]
+    ):
+        """Complete `session` from a cached debate, replaying its messages through the callback."""
+        session.rounds = [
+            DebateRound(round_number=r["round_number"], theme=r["theme"]) for r in cached["rounds"]
+        ]
+        for round_obj, round_data in zip(session.rounds, cached["rounds"]):
+            round_obj.status = "in_progress"
+            self.store.save_round(session, round_obj)
+            for message in round_data["messages"]:
+                await self._record_message(
+                    session, round_obj, message["agent_name"], message["content"], callback
+                )
+            round_obj.votes = dict(round_data.get("votes") or {})
+            round_obj.summary = round_data.get("summary", "")
+            round_obj.status = round_data.get("status", "complete")
+            self.store.save_round(session, round_obj)
+
+        session.consensus = copy.deepcopy(cached.get("consensus"))
+        session.final_score = cached.get("final_score", 0)
+        session.status = DebateStatus.COMPLETED
+        session.completed_at = datetime.now().isoformat()
+        self.store.save_session(session)
+
     async def _run_round(
         self,
         session: DebateSession,
         round_obj: DebateRound,
         agents: List,
         crew: Dict,
-        callback: Optional[callable]
-    ):
-        """Run a single debate round."""
+        callback: Optional[callable],
+        delta_callback: Optional[callable] = None,
+        deadline: Optional[float] = None
+    ) -> bool:
+        """Run a single debate round; False when it was cut off by its deadline."""
         round_obj.status = "in_progress"
-
-        def _truncate(text: str, max_chars: int) -> str:
-            if not text:
-                return ""
-            if len(text) <= max_chars:
-                return text
-            return text[:max_chars].rstrip() + "\n\n[TRUNCATED]"
+        self.store.save_round(session, round_obj)
 
         brevity_rules = (
             f"Rules (important): keep each reply <= {DEBATE_MAX_AGENT_MESSAGE_CHARS} chars; "
             "no long preambles; do not repeat earlier messages verbatim."
         )
 
-        design_prompt = _truncate(session.design_prompt, DEBATE_MAX_USER_PROMPT_CHARS)
-        
-        # Prepare the prompt based on round
-        if round_obj.round_number == 1:
-            # Initial proposals
-            prompt = (
-                "## Design Challenge\n\n"
-                f"{design_prompt}\n\n"
-                f"{brevity_rules}\n\n"
-                "Orchestrator: introduce challenge; ask Artist for 2-3 concepts; "
-                "ask Critic/UX/Brand for fast feedback.\n\n"
-                "IMPORTANT: DesignArtist MUST include at least one minimal valid <svg>...</svg> prototype "
-                "for the best concept (raw SVG, no markdown fences)."
-            )
-            
-        elif round_obj.round_number == 2:
-            # Refinement debate
-            prev_summary = session.rounds[0].summary if session.rounds[0].summary else "See previous round"
-            prev_summary = _truncate(prev_summary, DEBATE_MAX_SUMMARY_CHARS)
-            prompt = (
-                "## Round 2: Refinement\n\n"
-                f"Summary so far:\n{prev_summary}\n\n"
-                f"{brevity_rules}\n\n"
-                "Orchestrator: ask Artist to revise; ask others to confirm/adjust; "
-                "end with 3-5 bullet decisions."
-            )
-            
-        else:
-            # Final consensus
-            prompt = (
-                "## Round 3: Consensus\n\n"
-                f"{brevity_rules}\n\n"
-                "Orchestrator: request final votes (Approve/Adjust/Rethink) + 1 sentence reason each; "
-                "then output final recommendation, score (1-10), and next steps."
-            )
+        design_prompt = truncate_to_tokens(session.design_prompt, DEBATE_MAX_USER_PROMPT_TOKENS)
         
-        # Create GroupChat for this round
-        groupchat = GroupChat(
-            agents=agents,
-            messages=[],
-            max_round=DEBATE_SETTINGS["max_messages_per_round"],
-                        speaker_selection_method=DEBATE_SPEAKER_SELECTION_METHOD,
-        )
-        
-        manager = GroupChatManager(
-            groupchat=groupchat,
-            llm_config=ORCHESTRATOR_CONFIG
-        )
-        
-        # Create a temporary UserProxy to initiate the chat (required for Gemini API role strictness)
-        from autogen import UserProxyAgent
-        admin = UserProxyAgent(
-            name="Admin",
-            system_message="A human admin.",
-            code_execution_config=False,
-            human_input_mode="NEVER"
-        )
-        
-        # Initiate the conversation
-        result = await asyncio.to_thread(
-            admin.initiate_chat,
-            manager,
-            message=prompt,
-            clear_history=True
+        # Each round gets timeout_per_round, within what is left of the debate's deadline.
+        # Its LLM calls carry the deadline too: the scheduler promotes interactive calls
+        # as it nears, and HTTP timeouts shrink to the time left.
+        round_deadline = time.time() + DEBATE_SETTINGS["timeout_per_round"]
+        if deadline is not None:
+            round_deadline = min(round_deadline, deadline)
+
+        spec = self._round_spec(round_obj)
+        prompt = round_prompt(
+            spec,
+            round_obj.round_number,
+            brief=design_prompt,
+            state=self._state_digest(session) if spec.include_state else "",
+            rules=brevity_rules,
         )
+        # Only this round's participants take part (the Orchestrator always moderates)
+        names = {CREW_AGENTS[key] for key in spec.participants}
+        agents = [agent for agent in agents if agent.name in names]
         
-        # Extract messages from the groupchat
-        for msg in groupchat.messages:
-            if msg.get("content"):
-                agent_name = msg.get("name", "Unknown")
-                agent_info = self.AGENT_INFO.get(agent_name, {})
-                
-                agent_msg = AgentMessage(
-                    agent_name=agent_name,
-                    agent_role=agent_info.get("role", "Agent"),
-                    content=msg["content"],
-                    round_number=round_obj.round_number
-                )
-                round_obj.messages.append(agent_msg)
-                
-                # Real-time callback
-                if callback:
-                    await callback(agent_name, msg["content"], round_obj.round_number)
-
-        # Enforce mandatory SVG prototype after Round 1 (HITL requirement)
-        if round_obj.round_number == 1:
+        if DEBATE_PARALLEL_ROUNDS:
+            dispatch = self._run_parallel_round(session, round_obj, prompt, crew, callback, delta_callback, spec)
+        elif DEBATE_EXECUTION_MODE == "async":
+            dispatch = self._run_async_chat(session, round_obj, prompt, agents, callback, delta_callback)
+        else:
+            dispatch = self._run_group_chat(session, round_obj, prompt, agents, callback, delta_callback)
+
+        completed = True
+        with llm_call_context(deadline=round_deadline):
+            try:
+                await asyncio.wait_for(dispatch, timeout=max(0.0, round_deadline - time.time()))
+            except (asyncio.TimeoutError, DeadlineExceededError):
+                completed = False
+            except Exception:
+                # A call timing out at the deadline surfaces as a provider error; anything earlier is real.
+                if time.time() < round_deadline:
+                    raise
+                completed = False
+        if not completed:
+            print(f"⏱️ Round {round_obj.round_number} of {session.session_id} cut off at its deadline "
+                  f"with {len(round_obj.messages)} message(s)")
+
+        # Votes cast in this round decide early termination
+        round_obj.votes = DebateState.from_messages(self.AGENT_INFO, round_obj.messages).votes
+
+        # Enforce mandatory SVG prototype (HITL requirement) in rounds that ask for one.
+        # A cut-off round still gets it, with its own budget, while the debate has time left.
+        if spec.require_svg and (deadline is None or time.time() < deadline):
             texts = [m.content for m in round_obj.messages if m.content]
             existing_svgs = self._extract_svg_strings(texts)
             if not existing_svgs:
@@ -372,51 +553,316 @@ class DebateManager:
                 try:
                     artist_agent = crew.get("artist")
                     if artist_agent is not None:
-                        svg_result = await asyncio.to_thread(
-                            admin.initiate_chat,
-                            artist_agent,
-                            message=svg_only_prompt,
-                            clear_history=True
-                        )
-
-                        svg_text = None
-                        # Try best-effort extraction from different AutoGen result shapes
-                        for attr in ("chat_history", "messages", "history"):
-                            if hasattr(svg_result, attr):
-                                hist = getattr(svg_result, attr)
-                                if isinstance(hist, list):
-                                    for m in reversed(hist):
-                                        if isinstance(m, dict) and m.get("content"):
-                                            svg_text = m.get("content")
-                                            break
-                            if svg_text:
-                                break
-                        if not svg_text and isinstance(svg_result, dict):
-                            svg_text = svg_result.get("content") or svg_result.get("response")
-
-                        svg_text = (svg_text or "").strip()
+                        svg_deadline = time.time() + DEBATE_SVG_FALLBACK_TIMEOUT_SECONDS
+                        if deadline is not None:
+                            svg_deadline = min(svg_deadline, deadline)
+                        # Same challenge => same fallback request; let the completion cache serve repeats
+                        with force_completion_cache(), llm_call_context(priority="fallback_svg", deadline=svg_deadline):
+                            svg_text = await asyncio.wait_for(
+                                self._agent_reply(artist_agent, svg_only_prompt),
+                                timeout=svg_deadline - time.time()
+                            )
                         # Ensure we actually have an SVG block
                         extracted = self._extract_svg_strings([svg_text])
                         if extracted:
                             svg_text = extracted[0]
 
                         if svg_text:
-                            agent_info = self.AGENT_INFO.get("DesignArtist", {})
-                            agent_msg = AgentMessage(
-                                agent_name="DesignArtist",
-                                agent_role=agent_info.get("role", "Design Artist"),
-                                content=svg_text,
-                                round_number=round_obj.round_number
-                            )
-                            round_obj.messages.append(agent_msg)
-                            if callback:
-                                await callback("DesignArtist", svg_text, round_obj.round_number)
+                            await self._record_message(session, round_obj, "DesignArtist", svg_text, callback)
                 except Exception:
                     # If this fails, we still let the debate continue.
                     pass
         
         # Generate round summary
         round_obj.summary = self._summarize_round(round_obj)
+        state = self._states.get(session.session_id)
+        if state is not None:
+            state.observe_round(round_obj.round_number, round_obj.summary)
+        self.store.save_round(session, round_obj)
+        return completed
+
+    def _skip_rounds(self, session: DebateSession, rounds: List[DebateRound]) -> None:
+        for round_obj in rounds:
+            round_obj.status = "skipped"
+            self.store.save_round(session, round_obj)
+
+    def _round_spec(self, round_obj: DebateRound) -> RoundSpec:
+        """The graph node a session round was created from."""
+        index = min(round_obj.round_number, len(self.ROUND_GRAPH)) - 1
+        return self.ROUND_GRAPH[index]
+
+    def _state_digest(self, session: DebateSession) -> str:
+        """The debate's structured state, within the summary token budget."""
+        state = self._states.get(session.session_id)
+        digest = state.render(DEBATE_MAX_SUMMARY_TOKENS) if state is not None else ""
+        return digest or "No decisions recorded yet; see the design challenge."
+    
+    async def _run_group_chat(
+        self,
+        session: DebateSession,
+        round_obj: DebateRound,
+        prompt: str,
+        agents: List,
+        callback: Optional[callable],
+        delta_callback: Optional[callable] = None
+    ):
+        """Run the round as one AutoGen GroupChat driven by the Orchestrator.
+
+        The chat runs in a worker thread; each message is handed back to the
+        event loop as soon as AutoGen appends it, so callbacks fire per turn.
+        """
+        bridge = _ThreadBridge()
+        groupchat = _StreamingGroupChat(
+            agents=agents,
+            messages=[],
+            max_round=DEBATE_SETTINGS["max_messages_per_round"],
+            speaker_selection_method=DEBATE_SPEAKER_SELECTION_METHOD,
+            on_message=lambda msg: bridge.emit("message", dict(msg)),
+        )
+        
+        manager = GroupChatManager(
+            groupchat=groupchat,
+            llm_config=ORCHESTRATOR_CONFIG
+        )
+        
+        # Create a temporary UserProxy to initiate the chat (required for Gemini API role strictness)
+        from autogen import UserProxyAgent
+        admin = UserProxyAgent(
+            name="Admin",
+            system_message="A human admin.",
+            code_execution_config=False,
+            human_input_mode="NEVER"
+        )
+
+        sink = None
+        if delta_callback:
+            # Deltas from speaker-selection calls (current_speaker is None) are dropped.
+            sink = lambda text: bridge.emit("delta", groupchat.current_speaker, text)
+
+        async def _handle(kind: str, *payload):
+            if kind == "delta":
+                agent_name, text = payload
+                if agent_name:
+                    await delta_callback(agent_name, text, round_obj.round_number)
+                return
+            msg = payload[0]
+            if msg.get("content"):
+                await self._record_message(
+                    session, round_obj, msg.get("name", "Unknown"), msg["content"], callback
+                )
+
+        # Initiate the conversation; messages are forwarded while later turns are still generating
+        try:
+            await bridge.run(
+                _handle,
+                call_with_deltas,
+                sink,
+                admin.initiate_chat,
+                manager,
+                message=prompt,
+                clear_history=True
+            )
+        except asyncio.CancelledError:
+            # Cut off or cancelled: the worker thread cannot be interrupted, but it stops
+            # before the next turn (and its pending LLM call sees the debate's cancel_event).
+            groupchat.stop.set()
+            raise
+
+    async def _run_async_chat(
+        self,
+        session: DebateSession,
+        round_obj: DebateRound,
+        prompt: str,
+        agents: List,
+        callback: Optional[callable],
+        delta_callback: Optional[callable] = None
+    ):
+        """Run the round as a round-robin chat on the event loop (no worker thread).
+
+        Mirrors the GroupChat transcript: the prompt counts as the first of
+        max_messages_per_round messages, each agent sees its own turns as
+        assistant messages and everyone else's as user messages.
+        """
+        on_delta = None
+        if delta_callback:
+            async def on_delta(agent_name: str, text: str):
+                await delta_callback(agent_name, text, round_obj.round_number)
+
+        transcript = [{"name": "Admin", "content": prompt}]
+        await self._record_message(session, round_obj, "Admin", prompt, callback)
+
+        for turn in range(DEBATE_SETTINGS["max_messages_per_round"] - 1):
+            speaker = agents[turn % len(agents)]
+            history = [
+                {
+                    "role": "assistant" if m["name"] == speaker.name else "user",
+                    "content": m["content"],
+                    "name": m["name"],
+                }
+                for m in transcript
+            ]
+            reply = await self._async_reply(speaker, history, on_delta)
+            transcript.append({"name": speaker.name, "content": reply})
+            await self._record_message(session, round_obj, speaker.name, reply, callback)
+
+    async def _run_parallel_round(
+        self,
+        session: DebateSession,
+        round_obj: DebateRound,
+        prompt: str,
+        crew: Dict,
+        callback: Optional[callable],
+        delta_callback: Optional[callable] = None,
+        spec: Optional[RoundSpec] = None
+    ):
+        """Run the round as Artist -> concurrent reviews -> Orchestrator synthesis.
+
+        Critic, UX and Brand only react to the Artist's proposal, so their turns
+        do not depend on each other and can be issued together. Pacing is still
+        enforced per call by the provider rate limiter.
+        """
+        on_delta = None
+        if delta_callback:
+            async def on_delta(agent_name: str, text: str):
+                await delta_callback(agent_name, text, round_obj.round_number)
+
+        proposal = await self._agent_reply(
+            crew["artist"],
+            f"{prompt}\n\nYou are the DesignArtist: present your proposal for this round.",
+            on_delta=on_delta
+        )
+        await self._record_message(session, round_obj, "DesignArtist", proposal, callback)
+
+        review_prompt = (
+            f"{prompt}\n\n"
+            f"## DesignArtist proposal\n{proposal}\n\n"
+            "Review the proposal from your own role's perspective."
+        )
+
+        async def _review(agent) -> tuple:
+            return agent.name, await self._agent_reply(agent, review_prompt, on_delta=on_delta)
+
+        reviews: List[tuple] = []
+        reviewers = [key for key in ("critic", "ux", "brand") if spec is None or key in spec.participants]
+        pending = [asyncio.create_task(_review(crew[key])) for key in reviewers]
+        try:
+            # Record reviews as they land so callbacks are not held back by the slowest reviewer.
+            for next_review in asyncio.as_completed(pending):
+                agent_name, text = await next_review
+                reviews.append((agent_name, text))
+                await self._record_message(session, round_obj, agent_name, text, callback)
+        finally:
+            # Cut off, cancelled or a reviewer failed: stop the other reviews spending quota.
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        feedback = "\n\n".join(f"### {name}\n{text}" for name, text in reviews if text)
+        # The synthesis prompt carries everything said this round; share the budget so the
+        # round brief survives and the proposal/feedback are compacted (SVG first) before it.
+        orchestrator = crew["orchestrator"]
+        fitted = fit_parts(
+            [
+                BudgetPart("prompt", prompt, priority=2, min_tokens=512),
+                BudgetPart("proposal", proposal, priority=1, min_tokens=256),
+                BudgetPart("feedback", feedback, priority=0, min_tokens=256),
+            ],
+            self._input_budget(orchestrator) - 64,
+        )
+        synthesis = await self._agent_reply(
+            orchestrator,
+            f"{fitted['prompt']}\n\n"
+            f"## DesignArtist proposal\n{fitted['proposal']}\n\n"
+            f"## Team feedback\n{fitted['feedback']}\n\n"
+            "You are the Orchestrator: synthesize the proposal and feedback for this round.",
+            on_delta=on_delta
+        )
+        await self._record_message(session, round_obj, "Orchestrator", synthesis, callback)
+
+    async def _agent_reply(
+        self,
+        agent,
+        content: str,
+        on_delta: Optional[Callable[[str, str], Awaitable]] = None
+    ) -> str:
+        """Ask a single agent for one reply to a standalone user message.
+
+        When `on_delta` is given, it is awaited with (agent_name, delta) for each
+        streamed token chunk before the full reply is returned.
+        """
+        if DEBATE_EXECUTION_MODE == "async":
+            messages = [{"role": "user", "content": content, "name": "Admin"}]
+            return (await self._async_reply(agent, messages, on_delta)).strip()
+
+        bridge = _ThreadBridge()
+        sink = (lambda text: bridge.emit(agent.name, text)) if on_delta else None
+        reply = await bridge.run(
+            on_delta,
+            call_with_deltas,
+            sink,
+            agent.generate_reply,
+            messages=[{"role": "user", "content": content, "name": "Admin"}]
+        )
+        # Standalone replies count against sender=None; reset so repeated calls never hit the auto-reply cap.
+        agent.reset_consecutive_auto_reply_counter()
+        if isinstance(reply, dict):
+            reply = reply.get("content")
+        return (reply or "").strip()
+
+    async def _async_reply(
+        self,
+        agent,
+        messages: List[Dict],
+        on_delta: Optional[Callable[[str, str], Awaitable]] = None
+    ) -> str:
+        """Get one reply from an agent's prompt and config without going through AutoGen."""
+        deltas = None
+        if on_delta:
+            async def deltas(text: str):
+                await on_delta(agent.name, text)
+
+        messages = fit_messages(messages, self._input_budget(agent))
+        return await chat_completion(
+            AGENT_LLM_CONFIGS.get(agent.name, ORCHESTRATOR_CONFIG),
+            [{"role": "system", "content": agent.system_message}, *messages],
+            on_delta=deltas,
+            hedge=DEBATE_LLM_HEDGE,
+            hedge_delay=DEBATE_LLM_HEDGE_DELAY_SECONDS
+        )
+
+    @staticmethod
+    def _input_budget(agent) -> int:
+        """Tokens left for the conversation once the agent's system prompt is sent."""
+        system = count_message_tokens([{"role": "system", "content": agent.system_message}])
+        return max(256, DEBATE_MAX_INPUT_TOKENS - system)
+
+    async def _record_message(
+        self,
+        session: DebateSession,
+        round_obj: DebateRound,
+        agent_name: str,
+        content: str,
+        callback: Optional[callable]
+    ):
+        """Append an agent message to the round and forward it to the callback."""
+        if not content:
+            return
+        agent_info = self.AGENT_INFO.get(agent_name, {})
+        message = AgentMessage(
+            agent_name=agent_name,
+            agent_role=agent_info.get("role", "Agent"),
+            content=content,
+            round_number=round_obj.round_number
+        )
+        round_obj.messages.append(message)
+        self.store.save_message(session, round_obj, message)
+        state = self._states.get(session.session_id)
+        if state is not None:
+            state.observe(agent_name, content, round_obj.round_number)
+        
+        # Real-time callback
+        if callback:
+            await callback(agent_name, content, round_obj.round_number)
     
     def _summarize_round(self, round_obj: DebateRound) -> str:
         """Create a summary of the round's key points."""
@@ -433,8 +879,9 @@ class DebateManager:
     
     def _calculate_consensus(self, session: DebateSession) -> Dict:
         """Calculate the final consensus from all rounds."""
-        # Get the final round
-        final_round = session.rounds[-1] if session.rounds else None
+        # Get the final round that actually ran (later ones may be skipped on early consensus)
+        played = [r for r in session.rounds if r.status != "skipped" and r.messages]
+        final_round = played[-1] if played else None
         
         if not final_round or not final_round.messages:
             return {
@@ -460,6 +907,8 @@ class DebateManager:
             },
             "summary": last_message[:1000] if last_message else "Debate concluded"
         }
+        if final_round.votes:
+            consensus["votes"] = dict(final_round.votes)
         
         # Try to extract score from message
         import re
@@ -0,0 +1,185 @@
+"""
+Debate State - incremental structured summary of a running debate
+Every recorded message is folded into a compact state (decisions, open
+issues, votes, scores, SVG references). Round prompts carry this state
+instead of raw transcripts, so their size stays flat as a debate grows.
+"""
+from typing import Dict, Iterable, List, Optional
+from dataclasses import dataclass, field
+import hashlib
+import re
+
+try:
+    from context_budget import compact_svg, count_tokens, truncate_to_tokens
+except ModuleNotFoundError:
+    from agents.context_budget import compact_svg, count_tokens, truncate_to_tokens
+
+
+MAX_ITEMS = 8          # per list; the oldest entries are forgotten first
+MAX_ITEM_CHARS = 200
+MAX_SVG_REFS = 3
+
+_SVG_BLOCK = re.compile(r"<svg\b[\s\S]*?</svg>", re.IGNORECASE)
+_BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+(?P<text>.+?)\s*$")
+_HEADING = re.compile(r"^\s*(?:#{1,6}\s*)?\**\s*(?P<title>[^:*#\n]{3,60}?)\s*\**\s*:?\s*\**\s*$")
+_LABELED = re.compile(
+    r"^\s*(?:[-*•]\s*)?\**(?P<label>decision|decided|agreed|issue|concern|risk|question|open question)s?\**"
+    r"\s*[:\-–]\s*\**\s*(?P<text>.+?)\s*$",
+    re.IGNORECASE,
+)
+_SCORE = re.compile(r"\bscore\b\W{0,3}(?P<value>\d+(?:\.\d+)?)\s*(?:/\s*10)?", re.IGNORECASE)
+_VOTE_WORD = r"(?P<vote>approve|adjust|rethink)"
+_OWN_VOTE = re.compile(r"\b(?:vote|verdict)\b\W{0,4}" + _VOTE_WORD, re.IGNORECASE)
+_NAMED_VOTE = re.compile(r"(?P<name>[A-Z][A-Za-z]+)\**\s*[:\-–]\s*\**\s*" + _VOTE_WORD, re.IGNORECASE)
+
+_DECISION_WORDS = ("decision", "decided", "agreed", "recommendation", "final direction")
+_ISSUE_WORDS = ("issue", "concern", "risk", "question", "problem", "open", "to fix", "next step")
+
+
+def _section_kind(title: str) -> Optional[str]:
+    lowered = title.lower()
+    if any(word in lowered for word in _DECISION_WORDS):
+        return "decision"
+    if any(word in lowered for word in _ISSUE_WORDS):
+        return "issue"
+    return None
+
+
+def _clean(text: str) -> str:
+    text = re.sub(r"\s+", " ", compact_svg(text)).strip(" *_`")
+    if len(text) > MAX_ITEM_CHARS:
+        text = text[:MAX_ITEM_CHARS].rstrip() + "…"
+    return text
+
+
+def _remember(items: List[str], text: str) -> None:
+    """Append `text` unless already known; a repeated item moves to the end (most recent)."""
+    text = _clean(text)
+    if len(text) < 3:
+        return
+    key = text.lower()
+    for i, existing in enumerate(items):
+        if existing.lower() == key:
+            del items[i]
+            break
+    items.append(text)
+    del items[:-MAX_ITEMS]
+
+
+@dataclass
+class DebateState:
+    """Structured running summary of one debate, updated message by message."""
+    agent_names: List[str] = field(default_factory=list)
+    decisions: List[str] = field(default_factory=list)
+    open_issues: List[str] = field(default_factory=list)
+    votes: Dict[str, str] = field(default_factory=dict)
+    scores: Dict[str, float] = field(default_factory=dict)
+    svg_refs: List[Dict] = field(default_factory=list)
+    round_notes: Dict[int, str] = field(default_factory=dict)
+    messages_seen: int = 0
+
+    def observe(self, agent_name: str, content: str, round_number: int) -> None:
+        """Fold one agent message into the state."""
+        if not content:
+            return
+        self.messages_seen += 1
+        for svg in _SVG_BLOCK.findall(content):
+            self._add_svg(svg, agent_name, round_number)
+
+        section = None
+        for line in compact_svg(content).splitlines():
+            if not line.strip():
+                continue
+            labeled = _LABELED.match(line)
+            if labeled:
+                kind = _section_kind(labeled.group("label"))
+                self._add(kind, labeled.group("text"))
+                continue
+            bullet = _BULLET.match(line)
+            if bullet:
+                if section:
+                    self._add(section, bullet.group("text"))
+                continue
+            heading = _HEADING.match(line)
+            if heading and (line.rstrip().endswith(":") or line.lstrip().startswith(("#", "**"))):
+                section = _section_kind(heading.group("title"))
+            elif not line[:1].isspace():
+                section = None
+        self._read_votes(agent_name, content)
+
+    def observe_round(self, round_number: int, summary: str) -> None:
+        """Keep a one-line gist of a finished round for the rounds that follow."""
+        gist = truncate_to_tokens(_clean(summary), 60)
+        if gist:
+            self.round_notes[round_number] = gist
+
+    def _add(self, kind: Optional[str], text: str) -> None:
+        if kind == "decision":
+            _remember(self.decisions, text)
+        elif kind == "issue":
+            _remember(self.open_issues, text)
+
+    def _read_votes(self, agent_name: str, content: str) -> None:
+        known = {name.lower(): name for name in self.agent_names}
+        for match in _NAMED_VOTE.finditer(content):
+            name = known.get(match.group("name").lower())
+            if name:
+                self.votes[name] = match.group("vote").lower()
+        own = _OWN_VOTE.search(content)
+        if own:
+            self.votes[agent_name] = own.group("vote").lower()
+        score = _SCORE.search(content)
+        if score:
+            self.scores[agent_name] = min(10.0, float(score.group("value")))
+
+    def _add_svg(self, svg: str, agent_name: str, round_number: int) -> None:
+        ref = "svg:" + hashlib.sha1(svg.encode("utf-8")).hexdigest()[:10]
+        self.svg_refs = [r for r in self.svg_refs if r["ref"] != ref]
+        self.svg_refs.append({"ref": ref, "agent": agent_name, "round": round_number, "chars": len(svg)})
+        del self.svg_refs[:-MAX_SVG_REFS]
+
+    def render(self, max_tokens: int) -> str:
+        """Markdown digest of the state, cut to `max_tokens`."""
+        lines: List[str] = []
+        if self.decisions:
+            lines.append("Decisions:")
+            lines.extend(f"- {item}" for item in self.decisions)
+        if self.open_issues:
+            lines.append("Open issues:")
+            lines.extend(f"- {item}" for item in self.open_issues)
+        if self.votes:
+            lines.append("Votes: " + ", ".join(f"{name} {vote}" for name, vote in self.votes.items()))
+        if self.scores:
+            lines.append("Scores: " + ", ".join(f"{name} {score:g}/10" for name, score in self.scores.items()))
+        if self.svg_refs:
+            lines.append("SVG prototypes: " + ", ".join(
+                f"{r['ref']} ({r['agent']}, round {r['round']})" for r in self.svg_refs
+            ))
+        if self.round_notes:
+            lines.append("Round notes:")
+            lines.extend(f"- Round {n}: {note}" for n, note in sorted(self.round_notes.items()))
+        text = "\n".join(lines)
+        # Keep the most recent items when over budget: drop whole oldest bullets before cutting text.
+        while count_tokens(text) > max_tokens and self._drop_oldest(lines):
+            text = "\n".join(lines)
+        return truncate_to_tokens(text, max_tokens)
+
+    @staticmethod
+    def _drop_oldest(lines: List[str]) -> bool:
+        for header in ("Round notes:", "Open issues:", "Decisions:"):
+            if header in lines:
+                i = lines.index(header)
+                if i + 1 < len(lines) and lines[i + 1].startswith("- "):
+                    del lines[i + 1]
+                    if i + 1 >= len(lines) or not lines[i + 1].startswith("- "):
+                        del lines[i]
+                    return True
+        return False
+
+    @classmethod
+    def from_messages(cls, agent_names: Iterable[str], messages: Iterable) -> "DebateState":
+        """Rebuild the state from recorded AgentMessages (e.g. a reloaded session)."""
+        state = cls(agent_names=list(agent_names))
+        for message in messages:
+            state.observe(message.agent_name, message.content, message.round_number)
+        return state
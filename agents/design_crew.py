@@ -5,21 +5,26 @@ Using Microsoft AutoGen Framework
 Each agent has a unique personality and expertise area for creative design iteration.
 """
 from autogen import ConversableAgent, AssistantAgent
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import json
+import threading
 
 try:
     from config import (
         CRITIC_CONFIG, ARTIST_CONFIG, UX_CONFIG,
         BRAND_CONFIG, ORCHESTRATOR_CONFIG
     )
-    from config import DEBATE_COMPACT_CONTEXT, DEBATE_MAX_AGENT_MESSAGE_CHARS
+    from config import DEBATE_COMPACT_CONTEXT, DEBATE_MAX_AGENT_MESSAGE_CHARS, DEBATE_MAX_INPUT_TOKENS
+    from config import DEBATE_CREW_POOL_SIZE
+    from context_budget import make_history_hook
 except ModuleNotFoundError:
     from agents.config import (
         CRITIC_CONFIG, ARTIST_CONFIG, UX_CONFIG,
         BRAND_CONFIG, ORCHESTRATOR_CONFIG
     )
-    from agents.config import DEBATE_COMPACT_CONTEXT, DEBATE_MAX_AGENT_MESSAGE_CHARS
+    from agents.config import DEBATE_COMPACT_CONTEXT, DEBATE_MAX_AGENT_MESSAGE_CHARS, DEBATE_MAX_INPUT_TOKENS
+    from agents.config import DEBATE_CREW_POOL_SIZE
+    from agents.context_budget import make_history_hook
 
 
 class DesignCriticAgent:
@@ -421,12 +426,81 @@ Constraint: keep your reply <= {DEBATE_MAX_AGENT_MESSAGE_CHARS} characters."""
         return self.agent
 
 
+# Plain llm_config dicts by agent name, for code paths that call the provider without AutoGen
+AGENT_LLM_CONFIGS: Dict[str, Dict[str, Any]] = {
+    "Orchestrator": ORCHESTRATOR_CONFIG,
+    "DesignCritic": CRITIC_CONFIG,
+    "DesignArtist": ARTIST_CONFIG,
+    "UXResearcher": UX_CONFIG,
+    "BrandStrategist": BRAND_CONFIG,
+}
+
+# System prompts by agent name (part of the debate-cache fingerprint)
+AGENT_SYSTEM_PROMPTS: Dict[str, str] = {
+    "Orchestrator": OrchestratorAgent.SYSTEM_PROMPT,
+    "DesignCritic": DesignCriticAgent.SYSTEM_PROMPT,
+    "DesignArtist": DesignArtistAgent.SYSTEM_PROMPT,
+    "UXResearcher": UXResearcherAgent.SYSTEM_PROMPT,
+    "BrandStrategist": BrandStrategistAgent.SYSTEM_PROMPT,
+}
+
+
 def create_design_crew() -> Dict[str, AssistantAgent]:
     """Create all design crew agents and return them as a dictionary."""
-    return {
+    crew = {
         "orchestrator": OrchestratorAgent().get_agent(),
         "critic": DesignCriticAgent().get_agent(),
         "artist": DesignArtistAgent().get_agent(),
         "ux": UXResearcherAgent().get_agent(),
         "brand": BrandStrategistAgent().get_agent()
     }
+    for agent in crew.values():
+        # Keep every request (system prompt + history) inside the token budget
+        agent.register_hook(
+            "process_all_messages_before_reply",
+            make_history_hook(DEBATE_MAX_INPUT_TOKENS, agent.system_message)
+        )
+    return crew
+
+
+class CrewPool:
+    """
+    Pool of pre-built design crews, each leased to one debate at a time.
+
+    Building a crew creates five agents and their OpenAI clients; reusing idle
+    crews skips that work. A crew's conversation state is reset when it is
+    returned, so nothing leaks from one session into the next.
+    """
+
+    def __init__(self, size: int = DEBATE_CREW_POOL_SIZE):
+        self.size = max(0, size)
+        self._idle: List[Dict[str, AssistantAgent]] = []
+        self._lock = threading.Lock()
+
+    def prewarm(self) -> None:
+        """Fill the pool up to its size."""
+        while True:
+            with self._lock:
+                if len(self._idle) >= self.size:
+                    return
+            crew = create_design_crew()
+            with self._lock:
+                if len(self._idle) >= self.size:
+                    return
+                self._idle.append(crew)
+
+    def acquire(self) -> Dict[str, AssistantAgent]:
+        """Lease an idle crew, or build a new one if none is available."""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return create_design_crew()
+
+    def release(self, crew: Dict[str, AssistantAgent]) -> None:
+        """Return a crew after its debate; extra crews beyond the pool size are dropped."""
+        for agent in crew.values():
+            # Clears chat history, auto-reply counters and usage for every sender.
+            agent.reset()
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(crew)
@@ -0,0 +1,170 @@
+"""
+Event Log - replayable per-session debate event streams
+Every event a debate emits is appended once, with a sequence number, to an
+in-memory ring buffer for its session. Viewers (SSE or WebSocket) read from
+the log at their own cursor, so any number of them can attach to one debate,
+and a reconnecting client resumes from the last sequence number it saw
+instead of re-fetching the whole session.
+"""
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+from collections import deque
+import asyncio
+import time
+
+# Shed first when a viewer falls behind: each turn's agent_message carries the full text anyway
+LOSSY_EVENTS = frozenset({"agent_delta", "keepalive"})
+
+
+class SessionEventLog:
+    """Append-only ring buffer of one session's events (event-loop only)."""
+
+    def __init__(self, session_id: str, capacity: int = 2000):
+        self.session_id = session_id
+        self._events: Deque[Tuple[int, Dict[str, Any]]] = deque(maxlen=max(1, capacity))
+        self._last_seq = 0
+        self._wakeup = asyncio.Event()
+        self.closed = False
+        self.closed_at: Optional[float] = None
+        self.subscribers = 0
+        self.shed_events = 0
+        # Wire form of recent events, so N viewers serialize each event once
+        self._encoded: Dict[int, str] = {}
+
+    @property
+    def last_seq(self) -> int:
+        return self._last_seq
+
+    def append(self, event: Dict[str, Any]) -> int:
+        """Add an event and wake every follower; returns its sequence number."""
+        if self.closed:
+            raise RuntimeError(f"Event log for {self.session_id} is closed")
+        self._last_seq += 1
+        self._events.append((self._last_seq, event))
+        self._notify()
+        return self._last_seq
+
+    def encoded(self, seq: int, event: Dict[str, Any], encode: Callable[[int, Dict[str, Any]], str]) -> str:
+        """`encode(seq, event)`, computed once per event for all followers."""
+        text = self._encoded.get(seq)
+        if text is None:
+            text = self._encoded[seq] = encode(seq, event)
+            if len(self._encoded) > self._events.maxlen:
+                del self._encoded[next(iter(self._encoded))]
+        return text
+
+    def close(self) -> None:
+        """No more events; followers end once they have read everything."""
+        if not self.closed:
+            self.closed = True
+            self.closed_at = time.monotonic()
+            self._notify()
+
+    def since(self, seq: int) -> List[Tuple[int, Dict[str, Any]]]:
+        """Events after `seq`. If some were already evicted, a `events_dropped` marker comes first."""
+        if not self._events or seq >= self._last_seq:
+            return []
+        oldest = self._events[0][0]
+        out: List[Tuple[int, Dict[str, Any]]] = []
+        if seq < oldest - 1:
+            out.append((oldest - 1, {"type": "events_dropped", "missed_from": seq + 1, "missed_to": oldest - 1}))
+            seq = oldest - 1
+        # Sequence numbers are contiguous, so the position in the buffer is known.
+        start = seq - oldest + 1
+        out.extend(self._events[i] for i in range(start, len(self._events)))
+        return out
+
+    async def follow(
+        self, since: int = 0, keepalive: Optional[float] = None, max_lag: Optional[int] = None
+    ) -> AsyncIterator[Optional[Tuple[int, Dict[str, Any]]]]:
+        """Yield (seq, event) after `since`, then live ones until the log closes.
+
+        Yields None after `keepalive` seconds without events, so the caller can
+        ping its client. A follower more than `max_lag` events behind is caught
+        up by shedding (see `_shed`); it never holds back the writer or the
+        other followers.
+        """
+        cursor = since
+        self.subscribers += 1
+        try:
+            while True:
+                # No await between reading and taking the wakeup: nothing can slip in between.
+                events = self.since(cursor)
+                wakeup = self._wakeup
+                if max_lag is not None and len(events) > max_lag:
+                    events = self._shed(events, max_lag)
+                if events:
+                    for seq, event in events:
+                        cursor = seq
+                        yield seq, event
+                    continue
+                if self.closed:
+                    return
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            self.subscribers -= 1
+
+    def _shed(self, events: List[Tuple[int, Dict[str, Any]]], max_lag: int) -> List[Tuple[int, Dict[str, Any]]]:
+        """Slow-follower policy: drop token deltas, then the oldest events behind an `events_dropped` marker."""
+        kept = [item for item in events if item[1]["type"] not in LOSSY_EVENTS]
+        if len(kept) > max_lag:
+            skipped = kept[:len(kept) - max_lag]
+            kept = kept[len(kept) - max_lag:]
+            first = skipped[0][0] if skipped[0][1]["type"] != "events_dropped" else skipped[0][1]["missed_from"]
+            last = skipped[-1][0]
+            kept.insert(0, (last, {"type": "events_dropped", "missed_from": first, "missed_to": last}))
+        self.shed_events += len(events) - len(kept)
+        return kept
+
+    def _notify(self) -> None:
+        self._wakeup.set()
+        self._wakeup = asyncio.Event()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "last_seq": self._last_seq,
+            "buffered": len(self._events),
+            "subscribers": self.subscribers,
+            "shed_events": self.shed_events,
+            "closed": self.closed,
+        }
+
+
+class EventLogRegistry:
+    """Event logs by session id; closed logs stay around for `retention_seconds` for late resumes."""
+
+    def __init__(self, capacity: int = 2000, retention_seconds: float = 300.0):
+        self.capacity = capacity
+        self.retention_seconds = retention_seconds
+        self._logs: Dict[str, SessionEventLog] = {}
+
+    def create(self, session_id: str) -> SessionEventLog:
+        self.prune()
+        log = SessionEventLog(session_id, self.capacity)
+        self._logs[session_id] = log
+        return log
+
+    def get(self, session_id: str) -> Optional[SessionEventLog]:
+        return self._logs.get(session_id)
+
+    def prune(self) -> int:
+        """Forget closed logs past their retention; returns how many were dropped."""
+        cutoff = time.monotonic() - self.retention_seconds
+        expired = [
+            sid for sid, log in self._logs.items()
+            if log.closed and log.closed_at < cutoff and not log.subscribers
+        ]
+        for sid in expired:
+            del self._logs[sid]
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._logs),
+            "open": sum(1 for log in self._logs.values() if not log.closed),
+            "buffered_events": sum(len(log._events) for log in self._logs.values()),
+            "subscribers": sum(log.subscribers for log in self._logs.values()),
+            "shed_events": sum(log.shed_events for log in self._logs.values()),
+        }
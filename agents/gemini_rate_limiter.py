@@ -1,12 +1,43 @@
+import asyncio
 import os
 import random
 import re
-import threading
 import time
-from typing import Any, Callable, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, TypeVar
+
+try:
+    from rate_limiter import RateLimiter, Reservation, estimate_tokens, usage_tokens
+    from rate_limit_backends import RateLimitBackend
+    from llm_scheduler import CallAbandonedError, LLMScheduler, abandoned_error, call_time_left, current_call_context
+    from provider_health import (
+        AIMDController,
+        CircuitBreaker,
+        CircuitOpenError,
+        breaker_for,
+        configure_circuit_breakers,
+        is_provider_failure,
+    )
+except ModuleNotFoundError:
+    from agents.rate_limiter import RateLimiter, Reservation, estimate_tokens, usage_tokens
+    from agents.rate_limit_backends import RateLimitBackend
+    from agents.llm_scheduler import CallAbandonedError, LLMScheduler, abandoned_error, call_time_left, current_call_context
+    from agents.provider_health import (
+        AIMDController,
+        CircuitBreaker,
+        CircuitOpenError,
+        breaker_for,
+        configure_circuit_breakers,
+        is_provider_failure,
+    )
 
 
 _PATCHED = False
+# Set once rate limiting is configured for this process; the async path honours it too.
+_ENABLED = False
+# Configured providers in failover order, keyed by name.
+_PROVIDERS: Dict[str, "_ProviderLimits"] = {}
+
+T = TypeVar("T")
 
 
 def _env_float(name: str, default: float) -> float:
@@ -29,29 +60,133 @@ def _env_int(name: str, default: int) -> int:
         return default
 
 
-class _GlobalRateGate:
-    def __init__(self, min_interval_seconds: float):
-        self._min_interval = max(0.0, float(min_interval_seconds))
-        self._lock = threading.Lock()
-        self._next_allowed = 0.0
+def _debug_enabled() -> bool:
+    raw = os.getenv("RATE_LIMIT_DEBUG", os.getenv("GEMINI_RATE_LIMIT_DEBUG", "0"))
+    return raw.lower() in {"1", "true", "yes"}
 
-    def wait_turn(self) -> None:
-        if self._min_interval <= 0:
-            return
 
-        sleep_seconds = 0.0
-        with self._lock:
-            now = time.monotonic()
-            if now < self._next_allowed:
-                sleep_seconds = self._next_allowed - now
-                self._next_allowed = self._next_allowed + self._min_interval
-            else:
-                self._next_allowed = now + self._min_interval
+def _max_retries() -> int:
+    return _env_int("RATE_LIMIT_MAX_RETRIES", _env_int("GEMINI_MAX_RETRIES", 3))
+
+
+def _max_retry_wait() -> float:
+    # Longer provider back-offs (e.g. daily quota exhausted) fail fast instead of parking threads.
+    return _env_float("RATE_LIMIT_MAX_RETRY_WAIT_SECONDS", 60.0)
+
+
+def _completion_tokens() -> int:
+    # Expected completion size used in the TPM estimate until the real usage is known.
+    return _env_int("RATE_LIMIT_COMPLETION_TOKENS", 512)
+
+
+def _normalize_url(base_url: Optional[str]) -> str:
+    return str(base_url or "").rstrip("/")
+
+
+class _ProviderLimits:
+    """Limiter, scheduler, adaptive controller and circuit breaker of one provider endpoint."""
+
+    def __init__(self, name: str, base_url: Optional[str], limiter: RateLimiter):
+        self.name = name
+        self.base_url = _normalize_url(base_url)
+        self.limiter = limiter
+        self.scheduler = LLMScheduler(limiter, urgent_seconds=_env_int("LLM_SCHEDULER_URGENT_SECONDS", 15))
+        self.controller = AIMDController(
+            min_scale=_env_float("RATE_LIMIT_MIN_SCALE", 0.1),
+            slow_call_seconds=_env_float("RATE_LIMIT_SLOW_CALL_SECONDS", 30.0),
+        )
+        self.breaker = breaker_for(base_url)
+
+    @property
+    def has_fallback(self) -> bool:
+        """True when a later provider in the failover order can take this provider's calls."""
+        names = list(_PROVIDERS)
+        return self.name in names and names.index(self.name) < len(names) - 1
+
+    def min_interval_seconds(self) -> float:
+        return 60.0 / max(1.0, self.limiter.requests_per_minute)
+
+
+def _provider_for(base_url: Optional[str]) -> Optional[_ProviderLimits]:
+    """The provider configured for `base_url`, else the primary one."""
+    url = _normalize_url(base_url)
+    for provider in _PROVIDERS.values():
+        if url and provider.base_url == url:
+            return provider
+    return next(iter(_PROVIDERS.values()), None)
+
+
+def configure_rate_limiter(
+    api_keys: Sequence[str],
+    requests_per_minute: float,
+    tokens_per_minute: float = 0,
+    backend: Optional[RateLimitBackend] = None,
+    name: str = "default",
+    base_url: Optional[str] = None,
+) -> RateLimiter:
+    """Install the limiter (per-key RPM/TPM buckets) for one provider and enable rate limiting.
+
+    Providers are tried for failover in the order they are configured. Pass a
+    shared `backend` (e.g. `FileLockBackend`) so several worker processes draw
+    from one provider quota instead of each assuming it owns all of it.
+    """
+    global _ENABLED
+    configure_circuit_breakers(
+        failure_threshold=_env_int("LLM_CIRCUIT_FAILURE_THRESHOLD", 5),
+        reset_seconds=_env_float("LLM_CIRCUIT_RESET_SECONDS", 30.0),
+    )
+    limiter = RateLimiter(api_keys, requests_per_minute, tokens_per_minute, backend=backend)
+    _PROVIDERS[name] = _ProviderLimits(name, base_url, limiter)
+    _ENABLED = True
+    return limiter
+
+
+def get_rate_limiter(base_url: Optional[str] = None) -> Optional[RateLimiter]:
+    """Return the limiter for `base_url` (default: primary provider)."""
+    provider = _provider_for(base_url)
+    return provider.limiter if provider else None
+
+
+def get_scheduler(base_url: Optional[str] = None) -> Optional[LLMScheduler]:
+    """Return the scheduler that hands out the provider's limiter slots by priority."""
+    provider = _provider_for(base_url)
+    return provider.scheduler if provider else None
+
+
+def get_rate_controller(base_url: Optional[str] = None) -> Optional[AIMDController]:
+    provider = _provider_for(base_url)
+    return provider.controller if provider else None
+
+
+def provider_names() -> List[str]:
+    """Configured providers in failover order."""
+    return list(_PROVIDERS)
 
-        if sleep_seconds > 0:
-            if os.getenv("GEMINI_RATE_LIMIT_DEBUG", "0").lower() in {"1", "true", "yes"}:
-                print(f"[gemini-rate-limit] sleeping {sleep_seconds:.2f}s to respect RPM")
-            time.sleep(sleep_seconds)
+
+def rate_limit_stats() -> Dict[str, Dict[str, Any]]:
+    """Limiter and scheduler counters per provider (for /metrics)."""
+    return {
+        name: {"limiter": provider.limiter.stats(), "scheduler": provider.scheduler.stats()}
+        for name, provider in _PROVIDERS.items()
+    }
+
+
+def _log_reservation(reservation: Reservation) -> Reservation:
+    if reservation.wait_seconds > 0 and _debug_enabled():
+        print(
+            f"[rate-limit] sleeping {reservation.wait_seconds:.2f}s "
+            f"(key ...{reservation.api_key[-4:]}, ~{reservation.tokens} tokens)"
+        )
+    return reservation
+
+
+def _reserve(provider: _ProviderLimits, params: Dict[str, Any]) -> Reservation:
+    return _log_reservation(provider.scheduler.acquire(estimate_tokens(params, _completion_tokens())))
+
+
+async def _reserve_async(provider: _ProviderLimits, params: Dict[str, Any]) -> Reservation:
+    tokens = estimate_tokens(params, _completion_tokens())
+    return _log_reservation(await provider.scheduler.acquire_async(tokens))
 
 
 def _is_rate_limit_error(err: BaseException) -> bool:
@@ -83,28 +218,125 @@ def _retry_after_seconds(err: BaseException) -> Optional[float]:
     return None
 
 
-def patch_autogen_for_gemini_free_tier() -> None:
-    """Patch AutoGen's OpenAI client to respect Gemini free-tier rate limits.
+def _retry_delay(err: BaseException, attempt: int, max_retries: int, provider: _ProviderLimits) -> float:
+    delay = _retry_after_seconds(err)
+    if delay is None:
+        delay = provider.min_interval_seconds()
+    if _debug_enabled():
+        print(
+            f"[rate-limit] 429/rate-limit detected; retrying in {delay:.2f}s (attempt {attempt}/{max_retries})"
+        )
+    return max(0.0, delay) + random.uniform(0.0, 0.25)
+
+
+def is_failover_error(err: BaseException) -> bool:
+    """Errors after which a call should move on to the next provider."""
+    if isinstance(err, CallAbandonedError) or abandoned_error() is not None:
+        return False
+    return isinstance(err, CircuitOpenError) or _is_rate_limit_error(err) or is_provider_failure(err)
+
+
+def _after_success(provider: _ProviderLimits, reservation: Reservation, result: Any, started: float) -> None:
+    provider.limiter.settle(reservation, usage_tokens(result))
+    provider.limiter.scale = provider.controller.on_success(time.monotonic() - started)
+    provider.breaker.record_success()
+
+
+def _after_error(
+    provider: _ProviderLimits,
+    reservation: Reservation,
+    err: BaseException,
+    is_rate_limited: bool,
+    attempt: int,
+    max_retries: int,
+) -> bool:
+    """Feed a failed call to the controller/breaker; True when it should be retried."""
+    if isinstance(err, CallAbandonedError) or abandoned_error() is not None:
+        # Cut off by our own deadline or a cancellation: says nothing about the provider; no retry.
+        return False
+    if not is_rate_limited:
+        if is_provider_failure(err):
+            provider.breaker.record_failure()
+        else:
+            # The provider answered (e.g. 400): it is up, whatever was wrong with the request.
+            provider.breaker.record_success()
+        return False
+
+    limiter = provider.limiter
+    provider.breaker.record_success()
+    new_scale = provider.controller.on_throttle()
+    if new_scale != limiter.scale and _debug_enabled():
+        print(f"[rate-limit] {provider.name} throttled; rate scaled to {new_scale:.2f}x")
+    limiter.scale = new_scale
+    delay = _retry_delay(err, attempt, max_retries, provider)
+    # Park this key; the next reservation may land on another one.
+    limiter.penalize(reservation.api_key, delay)
+    # With a failover provider configured, hand the call over instead of waiting here.
+    return not provider.has_fallback and attempt <= max_retries and delay <= _max_retry_wait()
+
+
+async def run_with_rate_limit_async(
+    call: Callable[[Optional[str]], Awaitable[T]],
+    params: Dict[str, Any],
+    base_url: Optional[str] = None,
+) -> T:
+    """Async counterpart of the patched `OpenAIClient.create` loop.
+
+    `call` receives the API key picked by the limiter (None when rate limiting
+    is off, meaning "use the configured key"). Waits and retries with
+    `asyncio.sleep`, so no thread is held while waiting. Raises
+    `CircuitOpenError` without calling out when `base_url`'s circuit is open.
+    """
+    provider = _provider_for(base_url)
+    if not _ENABLED or provider is None:
+        return await call(None)
+
+    max_retries = _max_retries()
+    attempt = 0
+    while True:
+        provider.breaker.check()
+        reservation = await _reserve_async(provider, params)
+        if reservation.wait_seconds > 0:
+            await asyncio.sleep(reservation.wait_seconds)
+        # Claim a half-open probe only now, so waiting for a slot can't strand it.
+        probe = provider.breaker.before_call()
+        started = time.monotonic()
+        try:
+            result = await call(reservation.api_key)
+        except Exception as e:
+            attempt += 1
+            if _after_error(provider, reservation, e, _is_rate_limit_error(e), attempt, max_retries):
+                continue
+            raise
+        else:
+            _after_success(provider, reservation, result, started)
+            return result
+        finally:
+            if probe:
+                # Also on cancellation and abandoned calls, which record no verdict.
+                provider.breaker.release_probe()
+
+
+def patch_autogen_for_rate_limits() -> None:
+    """Patch AutoGen's OpenAI client to respect the configured provider rate limits.
 
     AutoGen uses an OpenAI-compatible client for the configured `base_url`.
-    This patch inserts a global wait before each LLM call and retries 429s.
+    This patch waits for an RPM/TPM slot on the least-loaded API key before
+    each LLM call (sending that key when it differs from the client's own),
+    settles the token charge with the reported usage and retries 429s.
+    429s and call latency drive the adaptive rate; provider failures drive
+    the endpoint's circuit breaker. When a later provider is configured,
+    throttled or unavailable calls raise at once so AutoGen's config_list
+    failover moves on to it. Call `configure_rate_limiter` first.
     """
 
     global _PATCHED
     if _PATCHED:
         return
 
-    # Default Gemini free tier: 5 requests/minute => 12s interval.
-    debug = os.getenv("GEMINI_RATE_LIMIT_DEBUG", "0").lower() in {"1", "true", "yes"}
-
-    rpm = _env_int("GEMINI_REQUESTS_PER_MINUTE", 5)
-    min_interval = _env_float("GEMINI_MIN_INTERVAL_SECONDS", 60.0 / max(1, rpm))
-    max_retries = _env_int("GEMINI_MAX_RETRIES", 3)
-
-    gate = _GlobalRateGate(min_interval_seconds=min_interval)
-
     try:
         from autogen.oai.client import OpenAIClient  # type: ignore
+        import httpx  # type: ignore
         import openai  # type: ignore
     except Exception:
         # If autogen/openai are not available, nothing to patch.
@@ -113,25 +345,62 @@ def patch_autogen_for_gemini_free_tier() -> None:
     original_create: Callable[..., Any] = OpenAIClient.create
 
     def patched_create(self: Any, params: dict[str, Any]):
+        oai_client = getattr(self, "_oai_client", None)
+        base_url = str(getattr(oai_client, "base_url", "") or "")
+        provider = _provider_for(base_url)
+        if not _ENABLED or provider is None:
+            return original_create(self, params)
+
+        max_retries = _max_retries()
+        client_key = getattr(oai_client, "api_key", None)
         attempt = 0
         while True:
-            gate.wait_turn()
             try:
-                return original_create(self, params)
-            except BaseException as e:
+                provider.breaker.check()
+                reservation = _reserve(provider, params)
+                if reservation.wait_seconds > 0:
+                    cancel_event = current_call_context().cancel_event
+                    if cancel_event is not None:
+                        # Wake up early if the debate is cancelled meanwhile
+                        cancel_event.wait(reservation.wait_seconds)
+                    else:
+                        time.sleep(reservation.wait_seconds)
+                error = abandoned_error()
+                if error is not None:
+                    raise error
+                # Claim a half-open probe only now, so waiting for a slot can't strand it.
+                probe = provider.breaker.before_call()
+            except CircuitOpenError as e:
+                if not provider.has_fallback:
+                    raise
+                # AutoGen only fails over on OpenAI API errors.
+                raise openai.APIConnectionError(
+                    message=str(e), request=httpx.Request("POST", base_url or provider.base_url)
+                ) from e
+            call_params = params
+            if reservation.api_key != client_key:
+                headers = {**(params.get("extra_headers") or {}), "Authorization": f"Bearer {reservation.api_key}"}
+                call_params = {**params, "extra_headers": headers}
+            time_left = call_time_left()
+            if time_left is not None:
+                # Never let one call outlive the round/debate deadline it was made under.
+                call_params = {**call_params, "timeout": min(float(params.get("timeout") or time_left), time_left)}
+            started = time.monotonic()
+            try:
+                response = original_create(self, call_params)
+            except Exception as e:
                 attempt += 1
                 is_rl = isinstance(e, getattr(openai, "RateLimitError", ())) or _is_rate_limit_error(e)
-                if is_rl and attempt <= max_retries:
-                    delay = _retry_after_seconds(e)
-                    if delay is None:
-                        delay = min_interval
-                    if debug:
-                        print(
-                            f"[gemini-rate-limit] 429/rate-limit detected; retrying in {delay:.2f}s (attempt {attempt}/{max_retries})"
-                        )
-                    time.sleep(max(0.0, delay) + random.uniform(0.0, 0.25))
+                if _after_error(provider, reservation, e, is_rl, attempt, max_retries):
                     continue
                 raise
+            else:
+                _after_success(provider, reservation, response, started)
+                return response
+            finally:
+                if probe:
+                    # Also on abandoned calls, which record no verdict.
+                    provider.breaker.release_probe()
 
     OpenAIClient.create = patched_create  # type: ignore[assignment]
     _PATCHED = True
@@ -0,0 +1,75 @@
+"""Shared keep-alive HTTP clients, one per provider base_url.
+
+AutoGen builds a fresh OpenAI client (and connection pool) for every agent it
+creates; handing all of them the same httpx client keeps TLS connections to
+the provider warm across agents, rounds and debates. The async execution path
+draws from the matching async pool.
+"""
+import os
+import threading
+from typing import Dict
+
+import httpx
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=_env_int("DEBATE_HTTP_MAX_CONNECTIONS", 100),
+        max_keepalive_connections=_env_int("DEBATE_HTTP_MAX_KEEPALIVE", 20),
+        keepalive_expiry=float(_env_int("DEBATE_HTTP_KEEPALIVE_SECONDS", 120)),
+    )
+
+
+class SharedHTTPClient(httpx.Client):
+    """Sync client that is shared rather than copied.
+
+    Agent configs may be deep-copied by AutoGen; returning ``self`` keeps every
+    copy pointing at the same connection pool.
+    """
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+_lock = threading.Lock()
+_SYNC_CLIENTS: Dict[str, SharedHTTPClient] = {}
+_ASYNC_CLIENTS: Dict[str, httpx.AsyncClient] = {}
+
+
+def get_sync_client(base_url: str) -> SharedHTTPClient:
+    """Return the shared sync client for `base_url` (used by AutoGen's OpenAI clients)."""
+    with _lock:
+        client = _SYNC_CLIENTS.get(base_url)
+        if client is None or client.is_closed:
+            client = SharedHTTPClient(limits=_limits())
+            _SYNC_CLIENTS[base_url] = client
+        return client
+
+
+def get_async_client(base_url: str) -> httpx.AsyncClient:
+    """Return the shared async client for `base_url`; requests use paths relative to it."""
+    client = _ASYNC_CLIENTS.get(base_url)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(base_url=base_url.rstrip("/") + "/", limits=_limits())
+        _ASYNC_CLIENTS[base_url] = client
+    return client
+
+
+async def close_all() -> None:
+    """Close every pooled connection (call on application shutdown)."""
+    with _lock:
+        sync_clients = list(_SYNC_CLIENTS.values())
+        _SYNC_CLIENTS.clear()
+    async_clients = list(_ASYNC_CLIENTS.values())
+    _ASYNC_CLIENTS.clear()
+    for client in sync_clients:
+        client.close()
+    for client in async_clients:
+        await client.aclose()
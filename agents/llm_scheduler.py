@@ -0,0 +1,280 @@
+"""Priority-aware admission of LLM calls to the rate limiter.
+
+Without a scheduler every caller reserves the next free slot on arrival, so
+an interactive debate queues behind whatever batch work got there first.
+Here callers wait in a shared queue and a dispatcher hands out each slot only
+when the limiter can actually serve it, to the best waiter at that moment:
+
+1. priority class (interactive < fallback_svg < batch), with calls whose
+   deadline is close promoted ahead of every class;
+2. fair share: within a class, the session served least recently goes first;
+3. earliest deadline, then arrival order.
+
+The class, session and deadline of a call come from `llm_call_context`,
+which is a ContextVar and so follows the debate into worker threads. The
+deadline is also a hard limit: a call still queued when it passes fails with
+`DeadlineExceededError`, and `call_time_left` caps the call's HTTP timeout.
+Likewise a call whose debate was cancelled (its `cancel_event` is set) leaves
+the queue with `CallCancelledError` instead of spending a slot.
+"""
+import asyncio
+import contextvars
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    from rate_limiter import RateLimiter, Reservation
+except ModuleNotFoundError:
+    from agents.rate_limiter import RateLimiter, Reservation
+
+
+PRIORITY_CLASSES = {"interactive": 0, "fallback_svg": 1, "batch": 2}
+DEFAULT_PRIORITY = "interactive"
+# What API clients may ask for; fallback_svg is internal to the debate manager
+CLIENT_PRIORITIES = ("interactive", "batch")
+
+
+class CallAbandonedError(RuntimeError):
+    """The caller no longer wants this call's answer (not a provider failure)."""
+
+
+class DeadlineExceededError(CallAbandonedError):
+    """The call's deadline passed before it could be made."""
+
+
+class CallCancelledError(CallAbandonedError):
+    """The debate the call belongs to was cancelled."""
+
+
+@dataclass(frozen=True)
+class CallContext:
+    session_id: Optional[str] = None
+    priority: str = DEFAULT_PRIORITY
+    deadline: Optional[float] = None  # wall-clock time.time()
+    cancel_event: Optional[threading.Event] = field(default=None, compare=False)
+
+
+_call_context: contextvars.ContextVar[CallContext] = contextvars.ContextVar(
+    "llm_call_context", default=CallContext()
+)
+
+
+@contextmanager
+def llm_call_context(
+    session_id: Optional[str] = None,
+    priority: Optional[str] = None,
+    deadline: Optional[float] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> Iterator[CallContext]:
+    """Tag LLM calls made in this block; unspecified fields are inherited from the enclosing context."""
+    current = _call_context.get()
+    if priority is not None and priority not in PRIORITY_CLASSES:
+        raise ValueError(f"Unknown priority: {priority}. Use one of {', '.join(PRIORITY_CLASSES)}.")
+    ctx = CallContext(
+        session_id=session_id if session_id is not None else current.session_id,
+        priority=priority if priority is not None else current.priority,
+        deadline=deadline if deadline is not None else current.deadline,
+        cancel_event=cancel_event if cancel_event is not None else current.cancel_event,
+    )
+    token = _call_context.set(ctx)
+    try:
+        yield ctx
+    finally:
+        _call_context.reset(token)
+
+
+def current_call_context() -> CallContext:
+    return _call_context.get()
+
+
+def call_time_left() -> Optional[float]:
+    """Seconds until the current call's deadline (may be <= 0), or None without one."""
+    deadline = _call_context.get().deadline
+    return None if deadline is None else deadline - time.time()
+
+
+def abandoned_error(ctx: Optional[CallContext] = None) -> Optional[CallAbandonedError]:
+    """The error to raise if the current call is no longer wanted, else None."""
+    ctx = ctx or _call_context.get()
+    if ctx.cancel_event is not None and ctx.cancel_event.is_set():
+        return CallCancelledError("LLM call abandoned: its debate was cancelled")
+    if ctx.deadline is not None and ctx.deadline <= time.time():
+        return DeadlineExceededError("LLM call abandoned: its deadline passed")
+    return None
+
+
+class _Waiter:
+    __slots__ = ("ctx", "tokens", "seq", "enqueued", "reservation", "error", "event", "loop", "future")
+
+    def __init__(self, ctx: CallContext, tokens: int, seq: int):
+        self.ctx = ctx
+        self.tokens = tokens
+        self.seq = seq
+        self.enqueued = time.time()
+        self.reservation: Optional[Reservation] = None
+        self.error: Optional[Exception] = None
+        self.event: Optional[threading.Event] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.future: Optional[asyncio.Future] = None
+
+
+class LLMScheduler:
+    """Dispatches rate-limiter slots to waiting calls by priority, fairness and deadline."""
+
+    def __init__(self, limiter: RateLimiter, urgent_seconds: float = 15.0):
+        self.limiter = limiter
+        self.urgent_seconds = urgent_seconds
+        self._cond = threading.Condition()
+        self._waiting: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._last_served: Dict[str, float] = {}
+        self._granted: Dict[str, int] = {name: 0 for name in PRIORITY_CLASSES}
+        self._queue_wait_total: Dict[str, float] = {name: 0.0 for name in PRIORITY_CLASSES}
+        self._thread: Optional[threading.Thread] = None
+
+    # --- callers -------------------------------------------------------
+
+    def acquire(self, tokens: int) -> Reservation:
+        """Block until this call is granted a slot; sleep out any remaining wait yourself.
+
+        Gives up its place and raises `CallAbandonedError` if the call's deadline
+        passes or its debate is cancelled while it waits.
+        """
+        ctx = current_call_context()
+        waiter = _Waiter(ctx, tokens, next(self._seq))
+        waiter.event = threading.Event()
+        self._enqueue(waiter)
+        poll = 0.5 if ctx.deadline is not None or ctx.cancel_event is not None else None
+        while not waiter.event.wait(poll):
+            error = abandoned_error(ctx)
+            if error is None:
+                continue
+            with self._cond:
+                if waiter in self._waiting:
+                    self._waiting.remove(waiter)
+                    raise error
+            # Granted just as it was abandoned
+            waiter.event.wait()
+        if waiter.error is not None:
+            raise waiter.error
+        return waiter.reservation
+
+    async def acquire_async(self, tokens: int) -> Reservation:
+        waiter = _Waiter(current_call_context(), tokens, next(self._seq))
+        waiter.loop = asyncio.get_running_loop()
+        waiter.future = waiter.loop.create_future()
+        self._enqueue(waiter)
+        try:
+            return await waiter.future
+        except asyncio.CancelledError:
+            with self._cond:
+                if waiter in self._waiting:
+                    self._waiting.remove(waiter)
+            raise
+
+    # --- dispatcher ----------------------------------------------------
+
+    def _enqueue(self, waiter: _Waiter) -> None:
+        with self._cond:
+            self._waiting.append(waiter)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._dispatch_loop, name="llm-scheduler", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _rank(self, waiter: _Waiter, now: float) -> tuple:
+        ctx = waiter.ctx
+        klass = PRIORITY_CLASSES.get(ctx.priority, PRIORITY_CLASSES[DEFAULT_PRIORITY])
+        deadline = ctx.deadline if ctx.deadline is not None else float("inf")
+        # Batch work may carry a deadline to bound its run time, but never jumps the queue for it.
+        if deadline - now <= self.urgent_seconds and ctx.priority != "batch":
+            klass = -1
+        last_served = self._last_served.get(ctx.session_id, 0.0) if ctx.session_id else 0.0
+        return (klass, last_served, deadline, waiter.seq)
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._waiting:
+                    self._cond.wait()
+                now = time.time()
+                head = min(self._waiting, key=lambda w: self._rank(w, now))
+            try:
+                # Wait for capacity outside the lock so new arrivals can still queue (and outrank the head).
+                delay = self.limiter.next_available(head.tokens)
+                if delay > 0:
+                    with self._cond:
+                        self._cond.wait(timeout=min(delay, 1.0))
+                    continue
+                with self._cond:
+                    if head not in self._waiting:
+                        continue
+                    reservation = self.limiter.reserve(head.tokens)
+                    self._waiting.remove(head)
+                    self._record_grant(head)
+            except Exception as e:
+                # A limiter failure (e.g. the shared state file) must not stop the dispatcher,
+                # or every queued call would hang: fail this call and keep serving the rest.
+                print(f"⚠️ LLM scheduler: rate limiter failed, failing one call: {e}")
+                with self._cond:
+                    if head not in self._waiting:
+                        continue
+                    self._waiting.remove(head)
+                self._wake(head, error=e)
+                continue
+            self._wake(head, reservation)
+
+    def _record_grant(self, waiter: _Waiter) -> None:
+        now = time.time()
+        ctx = waiter.ctx
+        if ctx.session_id:
+            self._last_served[ctx.session_id] = now
+            if len(self._last_served) > 1000:
+                # Forget sessions idle for 10 minutes
+                cutoff = now - 600
+                self._last_served = {k: t for k, t in self._last_served.items() if t >= cutoff}
+        if ctx.priority in self._granted:
+            self._granted[ctx.priority] += 1
+            self._queue_wait_total[ctx.priority] += now - waiter.enqueued
+
+    def _wake(
+        self, waiter: _Waiter, reservation: Optional[Reservation] = None, error: Optional[Exception] = None
+    ) -> None:
+        """Hand the waiter its reservation, or the error that stopped it from getting one."""
+        waiter.reservation = reservation
+        waiter.error = error
+        if waiter.event is not None:
+            waiter.event.set()
+            return
+
+        def _resolve():
+            if waiter.future.done():
+                return
+            if error is not None:
+                waiter.future.set_exception(error)
+            else:
+                waiter.future.set_result(reservation)
+
+        try:
+            waiter.loop.call_soon_threadsafe(_resolve)
+        except RuntimeError:
+            # Loop already closed; the slot is simply lost.
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            queued: Dict[str, int] = {name: 0 for name in PRIORITY_CLASSES}
+            for waiter in self._waiting:
+                queued[waiter.ctx.priority] = queued.get(waiter.ctx.priority, 0) + 1
+            return {
+                "queued": queued,
+                "granted": dict(self._granted),
+                "avg_queue_wait_seconds": {
+                    name: round(self._queue_wait_total[name] / count, 3) if count else 0.0
+                    for name, count in self._granted.items()
+                },
+            }
@@ -0,0 +1,120 @@
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+
+_PATCHED = False
+
+# Receives each content delta of the completion currently being generated in this context.
+# Set per worker thread by `deltas_to`, so concurrent chats never share a sink.
+_delta_sink: contextvars.ContextVar[Optional[Callable[[str], None]]] = contextvars.ContextVar(
+    "debate_delta_sink", default=None
+)
+
+
+@contextmanager
+def deltas_to(sink: Optional[Callable[[str], None]]) -> Iterator[None]:
+    """Stream completion deltas produced inside this block to `sink` (None disables)."""
+    token = _delta_sink.set(sink)
+    try:
+        yield
+    finally:
+        _delta_sink.reset(token)
+
+
+def current_delta_sink() -> Optional[Callable[[str], None]]:
+    """The delta sink active in this context, if any."""
+    return _delta_sink.get()
+
+
+def call_with_deltas(sink: Optional[Callable[[str], None]], fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run `fn` with completion deltas routed to `sink`. Meant to be the target of `asyncio.to_thread`."""
+    with deltas_to(sink):
+        return fn(*args, **kwargs)
+
+
+def stream_chat_completion(oai_client: Any, params: dict[str, Any], on_delta: Callable[[str], None]):
+    """Issue a streaming chat completion and rebuild the regular `ChatCompletion` from its chunks.
+
+    AutoGen only ever sees the assembled response, so cost accounting and message
+    extraction keep working while the caller observes tokens as they arrive.
+    """
+    from openai.types.chat import ChatCompletion  # type: ignore
+
+    kwargs = {k: v for k, v in params.items() if k not in {"stream", "stream_options"}}
+    stream = oai_client.chat.completions.create(stream=True, **kwargs)
+
+    parts: list[str] = []
+    response_id = ""
+    model = kwargs.get("model", "")
+    created = int(time.time())
+    finish_reason = "stop"
+    for chunk in stream:
+        response_id = response_id or getattr(chunk, "id", "") or ""
+        model = getattr(chunk, "model", None) or model
+        created = getattr(chunk, "created", None) or created
+        if not chunk.choices:
+            continue
+        choice = chunk.choices[0]
+        text = getattr(choice.delta, "content", None)
+        if text:
+            parts.append(text)
+            try:
+                on_delta(text)
+            except Exception:
+                # A broken listener must not abort the completion itself.
+                pass
+        if choice.finish_reason:
+            finish_reason = choice.finish_reason
+
+    return ChatCompletion.model_validate(
+        {
+            "id": response_id or f"stream-{created}",
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": finish_reason,
+                    "message": {"role": "assistant", "content": "".join(parts)},
+                }
+            ],
+        }
+    )
+
+
+def patch_autogen_for_streaming() -> None:
+    """Patch AutoGen's OpenAI client to stream deltas when a sink is active.
+
+    Calls made outside `deltas_to` (or with tools/functions) take the normal
+    non-streaming path, so this is a no-op unless a caller opts in.
+    Apply before any rate-limit patch so the limiter wraps the streaming call.
+    """
+
+    global _PATCHED
+    if _PATCHED:
+        return
+
+    try:
+        from autogen.oai.client import OpenAIClient  # type: ignore
+    except Exception:
+        # If autogen is not available, nothing to patch.
+        return
+
+    original_create: Callable[..., Any] = OpenAIClient.create
+
+    def patched_create(self: Any, params: dict[str, Any]):
+        sink = _delta_sink.get()
+        if (
+            sink is None
+            or "messages" not in params
+            or params.get("tools")
+            or params.get("functions")
+        ):
+            return original_create(self, params)
+        return stream_chat_completion(self._oai_client, params, sink)
+
+    OpenAIClient.create = patched_create  # type: ignore[assignment]
+    _PATCHED = True
@@ -2,21 +2,47 @@
 FastAPI Backend for CoCreate Design Debate System
 Exposes REST and WebSocket endpoints for frontend integration
 """
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict
 import asyncio
-import json
+import time
 import uvicorn
 
 try:
     from debate_manager import debate_manager, DebateStatus
-    from config import SERVER_HOST, SERVER_PORT, DEBATE_SETTINGS
+    from config import (
+        SERVER_HOST, SERVER_PORT, DEBATE_SETTINGS, DEBATE_DEADLINE_SECONDS, DEBATE_SSE_KEEPALIVE_SECONDS,
+        DEBATE_CANCEL_ON_DISCONNECT, DEBATE_DISCONNECT_GRACE_SECONDS, DEBATE_MAX_CONCURRENT, DEBATE_MAX_QUEUED,
+        DEBATE_EVENT_LOG_SIZE, DEBATE_EVENT_LOG_RETENTION_SECONDS, DEBATE_VIEWER_MAX_LAG,
+        DEBATE_WS_SEND_QUEUE, DEBATE_WS_SEND_TIMEOUT_SECONDS
+    )
+    from http_pool import close_all as close_http_clients
+    from completion_cache import get_completion_cache
+    from gemini_rate_limiter import rate_limit_stats
+    from llm_scheduler import CLIENT_PRIORITIES
+    from provider_health import breaker_stats
+    from admission import AdmissionController, AdmissionRejected
+    from event_log import LOSSY_EVENTS, EventLogRegistry, SessionEventLog
+    from serialization import dumps, dumps_bytes
 except ModuleNotFoundError:
     from agents.debate_manager import debate_manager, DebateStatus
-    from agents.config import SERVER_HOST, SERVER_PORT, DEBATE_SETTINGS
+    from agents.config import (
+        SERVER_HOST, SERVER_PORT, DEBATE_SETTINGS, DEBATE_DEADLINE_SECONDS, DEBATE_SSE_KEEPALIVE_SECONDS,
+        DEBATE_CANCEL_ON_DISCONNECT, DEBATE_DISCONNECT_GRACE_SECONDS, DEBATE_MAX_CONCURRENT, DEBATE_MAX_QUEUED,
+        DEBATE_EVENT_LOG_SIZE, DEBATE_EVENT_LOG_RETENTION_SECONDS, DEBATE_VIEWER_MAX_LAG,
+        DEBATE_WS_SEND_QUEUE, DEBATE_WS_SEND_TIMEOUT_SECONDS
+    )
+    from agents.http_pool import close_all as close_http_clients
+    from agents.completion_cache import get_completion_cache
+    from agents.gemini_rate_limiter import rate_limit_stats
+    from agents.llm_scheduler import CLIENT_PRIORITIES
+    from agents.provider_health import breaker_stats
+    from agents.admission import AdmissionController, AdmissionRejected
+    from agents.event_log import LOSSY_EVENTS, EventLogRegistry, SessionEventLog
+    from agents.serialization import dumps, dumps_bytes
 
 # FastAPI App
 app = FastAPI(
@@ -39,6 +65,40 @@ app.add_middleware(
 class DebateRequest(BaseModel):
     prompt: str
     project_id: Optional[str] = None
+    stream_tokens: bool = False  # opt-in: also broadcast agent_delta events
+    priority: str = "interactive"  # LLM scheduling class: interactive | batch
+    deadline_seconds: Optional[float] = None  # run-time budget once admitted (capped by the server's)
+
+
+def _check_priority(priority: str):
+    if priority not in CLIENT_PRIORITIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown priority '{priority}'. Use one of: {', '.join(CLIENT_PRIORITIES)}"
+        )
+
+
+def _debate_budget(deadline_seconds: Optional[float]) -> float:
+    """Seconds a debate may run once admitted; clients may only shorten the server budget."""
+    budget = DEBATE_DEADLINE_SECONDS
+    if deadline_seconds is not None:
+        if deadline_seconds <= 0:
+            raise HTTPException(status_code=400, detail="deadline_seconds must be positive")
+        budget = min(budget, deadline_seconds)
+    return budget
+
+
+# Debates beyond DEBATE_MAX_CONCURRENT wait in a bounded FIFO; beyond that they get a 429.
+admission = AdmissionController(DEBATE_MAX_CONCURRENT, DEBATE_MAX_QUEUED)
+
+
+def _admit():
+    """Reserve a debate slot or a place in line, or reject the request with 429 + Retry-After."""
+    try:
+        return admission.enqueue()
+    except AdmissionRejected as e:
+        print(f"🚦 Debate rejected: queue full ({admission.max_queued} waiting)")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
 
 
 class DebateResponse(BaseModel):
@@ -56,43 +116,256 @@ class SessionStatus(BaseModel):
     consensus: Optional[Dict] = None
 
 
-# WebSocket connection manager
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[str, List[WebSocket]] = {}
-    
-    async def connect(self, websocket: WebSocket, session_id: str):
-        await websocket.accept()
-        if session_id not in self.active_connections:
-            self.active_connections[session_id] = []
-        self.active_connections[session_id].append(websocket)
-    
-    def disconnect(self, websocket: WebSocket, session_id: str):
-        if session_id in self.active_connections:
-            if websocket in self.active_connections[session_id]:
-                self.active_connections[session_id].remove(websocket)
-            if not self.active_connections[session_id]:
-                self.active_connections.pop(session_id, None)
-    
-    async def broadcast(self, session_id: str, message: dict):
-        if session_id in self.active_connections:
-            for connection in list(self.active_connections[session_id]):
-                try:
-                    await connection.send_json(message)
-                except Exception:
-                    self.disconnect(connection, session_id)
-
-    async def close_session(self, session_id: str, code: int = 1000, reason: str = "session complete"):
-        connections = list(self.active_connections.get(session_id, []))
-        for ws in connections:
+# Every event of a debate goes into its session's replayable log; SSE and
+# WebSocket viewers each read it from their own cursor and can resume.
+event_logs = EventLogRegistry(DEBATE_EVENT_LOG_SIZE, DEBATE_EVENT_LOG_RETENTION_SECONDS)
+
+# WebSocket clients know the terminal events by their older names
+_WS_EVENT_TYPES = {"complete": "debate_complete", "error": "debate_error", "cancelled": "debate_cancelled"}
+
+
+def _ws_event(seq: int, event: Dict) -> Dict:
+    event = {**event, "seq": seq, "type": _WS_EVENT_TYPES.get(event["type"], event["type"])}
+    if event["type"] == "debate_error":
+        event["error"] = event.pop("message", "")
+    return event
+
+
+class WebSocketSender:
+    """
+    The only writer for one WebSocket: messages go into a bounded queue that its
+    own task drains, so the debate never waits on the client. Keepalives are
+    coalesced and lossy events are dropped while the queue is full; `put` waits
+    for room for anything else, which leaves the event log follower behind and
+    lets the log shed for it (see SessionEventLog.follow). A client that stops
+    reading for `send_timeout` is dropped (it can reconnect with ?since=).
+    """
+
+    def __init__(self, websocket: WebSocket, max_queued: int, send_timeout: float):
+        self.websocket = websocket
+        self.send_timeout = send_timeout
+        self.last_seq = 0  # last event actually written
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_queued))
+        self._keepalive_queued = False
+        self._task = asyncio.create_task(self._drain())
+
+    @property
+    def alive(self) -> bool:
+        return not self._task.done()
+
+    def send(self, message: Dict) -> bool:
+        """Queue a message without waiting (dropped if the queue is full); False once the connection is dropped."""
+        if not self.alive:
+            return False
+        if message["type"] == "keepalive":
+            # Anything already queued proves the stream is alive
+            if self._keepalive_queued or not self._queue.empty():
+                return True
+            self._keepalive_queued = True
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            pass  # the client is behind and has data queued already
+        return True
+
+    async def put(self, message: Dict) -> bool:
+        """Queue a message, waiting for room unless it is lossy; False once the connection is dropped."""
+        if message["type"] in LOSSY_EVENTS or not self._queue.full():
+            return self.send(message)
+        if not self.alive:
+            return False
+        waiter = asyncio.ensure_future(self._queue.put(message))
+        try:
+            await asyncio.wait({waiter, self._task}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiter.cancel()  # no-op once the message is queued
+        return waiter.done() and not waiter.cancelled()
+
+    async def _drain(self):
+        while True:
+            message = await self._queue.get()
+            if message is None:
+                return
+            if message["type"] == "keepalive":
+                self._keepalive_queued = False
+            # A client that stops reading would otherwise hold this send open until TCP gives up
+            await asyncio.wait_for(self.websocket.send_text(dumps(message)), timeout=self.send_timeout)
+            self.last_seq = message.get("seq", self.last_seq)
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        """Flush what is queued (within the send timeout), then close the socket.
+
+        A client that could not take it all is closed with 1013 and where to resume instead.
+        """
+        flushed = False
+        if self.alive:
+            async def flush():
+                await self._queue.put(None)
+                await self._task
             try:
-                await ws.close(code=code)
+                await asyncio.wait_for(flush(), timeout=self.send_timeout)
+                flushed = True
             except Exception:
                 pass
-            self.disconnect(ws, session_id)
+        if not flushed:
+            code, reason = 1013, f"client too slow; reconnect with ?since={self.last_seq}"
+        self.abort()
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except Exception:
+            pass
+
+    def abort(self):
+        self._task.cancel()
+        if self._task.done() and not self._task.cancelled():
+            self._task.exception()  # consumed, so it isn't logged as never retrieved
+
+
+def _sse_event(seq: int, event: Dict) -> str:
+    return f"id: {seq}\ndata: {dumps(event)}\n\n"
+
+
+_SSE_KEEPALIVE = f"data: {dumps({'type': 'keepalive'})}\n\n"
+
+
+def _json_response(data) -> Response:
+    """Serialize with the fast encoder instead of FastAPI's generic jsonable_encoder pass."""
+    return Response(content=dumps_bytes(data), media_type="application/json")
+
+
+def _launch_debate(session, ticket, budget: float, priority: str, stream_tokens: bool) -> SessionEventLog:
+    """Run the debate in the background once admitted, appending its events to the session's log."""
+    log = event_logs.create(session.session_id)
+    log.append({"type": "session_started", "session_id": session.session_id})
+    # Turns whose agent_start was already sent ahead of their token deltas
+    streaming_turns = set()
+
+    async def message_callback(agent_name: str, content: str, round_number: int):
+        # Send agent_start first time we see this agent in this round
+        turn = (agent_name, round_number)
+        if turn in streaming_turns:
+            streaming_turns.discard(turn)
+        else:
+            log.append({"type": "agent_start", "agent": agent_name, "round": round_number})
+        agent_info = debate_manager.AGENT_INFO.get(agent_name, {})
+        log.append({
+            "type": "agent_message",
+            "agent": agent_name,
+            "emoji": agent_info.get("emoji", "🤖"),
+            "color": agent_info.get("color", "#666"),
+            "role": agent_info.get("role", "Agent"),
+            "content": content,
+            "round": round_number,
+            "timestamp": time.time()
+        })
+
+    async def delta_callback(agent_name: str, delta: str, round_number: int):
+        turn = (agent_name, round_number)
+        if turn not in streaming_turns:
+            streaming_turns.add(turn)
+            log.append({"type": "agent_start", "agent": agent_name, "round": round_number})
+        log.append({
+            "type": "agent_delta",
+            "agent": agent_name,
+            "content": delta,
+            "round": round_number,
+            "timestamp": time.time()
+        })
+
+    async def on_queue_position(position: int):
+        log.append({"type": "queued", "session_id": session.session_id, "position": position})
+
+    async def run_debate():
+        try:
+            async with admission.admitted(ticket, on_queue_position):
+                await debate_manager.run_debate(
+                    session.session_id,
+                    message_callback=message_callback,
+                    delta_callback=delta_callback if stream_tokens else None,
+                    priority=priority,
+                    deadline=time.time() + budget
+                )
+            # Send completion ("partial" when the deadline cut the debate short)
+            log.append({
+                "type": "complete",
+                "session_id": session.session_id,
+                "status": session.status.value,
+                "consensus": session.consensus,
+                "svg_artifacts": getattr(session, 'svg_artifacts', []),
+                "final_score": session.final_score
+            })
+        except asyncio.CancelledError:
+            debate_manager.abandon_pending(session.session_id)
+            log.append({"type": "cancelled", "session_id": session.session_id})
+            raise
+        except Exception as e:
+            import traceback
+            print(f"❌ Debate error: {e}\n{traceback.format_exc()}")
+            log.append({"type": "error", "message": str(e)})
+        finally:
+            log.close()
+
+    # Tracked so DELETE /debate/{id} can cancel it
+    debate_manager.track(session.session_id, asyncio.create_task(run_debate()))
+    return log
+
+
+async def _cancel_if_unwatched(session_id: str, log: SessionEventLog):
+    """Cancel a debate nobody re-attached to within the grace period after its stream dropped."""
+    await asyncio.sleep(DEBATE_DISCONNECT_GRACE_SECONDS)
+    if not log.closed and not log.subscribers:
+        print(f"🔌 Nobody watching {session_id}; cancelling debate")
+        debate_manager.cancel_debate(session_id)
+
+
+def _event_stream(log: SessionEventLog, since: int, http_request: Request, cancel_when_unwatched: bool):
+    """SSE response replaying `log` after `since`, then following it live."""
+    async def event_generator():
+        try:
+            async for item in log.follow(since, keepalive=DEBATE_SSE_KEEPALIVE_SECONDS, max_lag=DEBATE_VIEWER_MAX_LAG):
+                if item is not None:
+                    yield log.encoded(*item, _sse_event)
+                    continue
+                if await http_request.is_disconnected():
+                    break
+                # Send keepalive
+                yield _SSE_KEEPALIVE
+        finally:
+            # Stream closed with the debate still running. Give the client a moment to
+            # resume (Last-Event-ID); if nobody does, stop spending quota on it.
+            if cancel_when_unwatched and not log.closed:
+                task = asyncio.create_task(_cancel_if_unwatched(log.session_id, log))
+                _background_tasks.append(task)
+                task.add_done_callback(_background_tasks.remove)
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
+_background_tasks: List[asyncio.Task] = []
+
 
+@app.on_event("startup")
+async def startup():
+    # Build the pooled design crews up front so the first debate doesn't pay for it
+    await asyncio.to_thread(debate_manager.crew_pool.prewarm)
+    # Evict finished sessions so long-running servers don't grow without bound
+    _background_tasks.append(asyncio.create_task(debate_manager.run_reaper()))
 
-manager = ConnectionManager()
+
+@app.on_event("shutdown")
+async def shutdown():
+    for task in _background_tasks:
+        task.cancel()
+    # Release pooled keep-alive connections to the LLM providers
+    await close_http_clients()
 
 
 # REST Endpoints
@@ -106,6 +379,7 @@ async def root():
             "start_debate": "POST /debate/start",
             "get_status": "GET /debate/status/{session_id}",
             "get_result": "GET /debate/result/{session_id}",
+            "stream": "GET /debate/stream/{session_id}",
             "websocket": "WS /debate/ws/{session_id}"
         }
     }
@@ -125,117 +399,84 @@ async def get_agents():
     }
 
 
+@app.get("/metrics")
+async def get_metrics():
+    """Runtime counters for caches and limiters."""
+    completion_cache = get_completion_cache()
+    response_cache = debate_manager.response_cache
+    return {
+        "admission": admission.stats(),
+        "event_logs": event_logs.stats(),
+        "providers": rate_limit_stats(),
+        "circuit_breakers": breaker_stats(),
+        "completion_cache": completion_cache.stats() if completion_cache else None,
+        "response_cache": response_cache.stats() if response_cache else None
+    }
+
+
 # SSE Endpoint for streaming debate (used by frontend)
 class DebateSSERequest(BaseModel):
     prompt: str
     project_id: Optional[str] = None
     chat_context: Optional[List[Dict]] = None
     image_analyses: Optional[List[Dict]] = None
+    stream_tokens: bool = False  # opt-in: also emit agent_delta events
+    priority: str = "interactive"  # LLM scheduling class: interactive | batch
+    deadline_seconds: Optional[float] = None  # run-time budget once admitted (capped by the server's)
 
 
 @app.post("/debate/start")
-async def start_debate_sse(request: DebateSSERequest):
+async def start_debate_sse(request: DebateSSERequest, http_request: Request):
     """
     Start a new design debate session with SSE streaming.
-    Returns Server-Sent Events for real-time updates.
+    Returns Server-Sent Events for real-time updates; each carries an `id:` so
+    a dropped client can resume from GET /debate/stream/{session_id}.
+    The debate is cancelled if nobody is watching it DEBATE_DISCONNECT_GRACE_SECONDS
+    after the client disconnects (DEBATE_CANCEL_ON_DISCONNECT).
+    When all debate slots are busy it waits in line ("queued" events carry the
+    position); when the line is full the request is rejected with 429.
     """
-    
-    async def event_generator():
-        message_queue = asyncio.Queue()
-        
-        try:
-            print(f"🎬 [SSE] Starting debate for prompt: {request.prompt[:100]}...")
-            
-            # Create the session
-            session = debate_manager.create_session(
-                design_prompt=request.prompt,
-                project_id=request.project_id
-            )
-            
-            yield f"data: {json.dumps({'type': 'session_started', 'session_id': session.session_id})}\n\n"
-            
-            # Define callback for real-time updates
-            async def message_callback(agent_name: str, content: str, round_number: int):
-                agent_info = debate_manager.AGENT_INFO.get(agent_name, {})
-                await message_queue.put({
-                    "type": "agent_message",
-                    "agent": agent_name,
-                    "emoji": agent_info.get("emoji", "🤖"),
-                    "color": agent_info.get("color", "#666"),
-                    "role": agent_info.get("role", "Agent"),
-                    "content": content,
-                    "round": round_number
-                })
-            
-            # Also send agent_start events
-            original_callback = message_callback
-            
-            async def enhanced_callback(agent_name: str, content: str, round_number: int):
-                # Send agent_start first time we see this agent in this round
-                await message_queue.put({
-                    "type": "agent_start",
-                    "agent": agent_name,
-                    "round": round_number
-                })
-                await original_callback(agent_name, content, round_number)
-            
-            # Run debate in background task
-            async def run_debate():
-                try:
-                    await debate_manager.run_debate(
-                        session.session_id,
-                        message_callback=enhanced_callback
-                    )
-                    # Send completion
-                    await message_queue.put({
-                        "type": "complete",
-                        "session_id": session.session_id,
-                        "consensus": session.consensus,
-                        "svg_artifacts": getattr(session, 'svg_artifacts', []),
-                        "final_score": session.final_score
-                    })
-                except Exception as e:
-                    import traceback
-                    print(f"❌ Debate error: {e}\n{traceback.format_exc()}")
-                    await message_queue.put({
-                        "type": "error",
-                        "message": str(e)
-                    })
-                finally:
-                    await message_queue.put(None)  # Signal end
-            
-            # Start debate task
-            debate_task = asyncio.create_task(run_debate())
-            
-            # Stream messages from queue
-            while True:
-                try:
-                    msg = await asyncio.wait_for(message_queue.get(), timeout=120.0)
-                    if msg is None:
-                        break
-                    yield f"data: {json.dumps(msg)}\n\n"
-                except asyncio.TimeoutError:
-                    # Send keepalive
-                    yield f"data: {json.dumps({'type': 'keepalive'})}\n\n"
-            
-            # Wait for debate to complete
-            await debate_task
-            
-        except Exception as e:
-            import traceback
-            error_msg = f"SSE Error: {str(e)}"
-            print(f"❌ {error_msg}\n{traceback.format_exc()}")
-            yield f"data: {json.dumps({'type': 'error', 'message': error_msg})}\n\n"
-    
-    return StreamingResponse(
-        event_generator(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no"
-        }
-    )
+    _check_priority(request.priority)
+    budget = _debate_budget(request.deadline_seconds)
+    # Admission is decided before the stream starts so a full queue is a plain 429
+    ticket = _admit()
+    try:
+        print(f"🎬 [SSE] Starting debate for prompt: {request.prompt[:100]}...")
+        # Create the session
+        session = debate_manager.create_session(
+            design_prompt=request.prompt,
+            project_id=request.project_id
+        )
+    except Exception as e:
+        import traceback
+        print(f"❌ Failed to create debate session: {e}\n{traceback.format_exc()}")
+        admission.release(ticket)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    log = _launch_debate(session, ticket, budget, request.priority, request.stream_tokens)
+    return _event_stream(log, 0, http_request, cancel_when_unwatched=DEBATE_CANCEL_ON_DISCONNECT)
+
+
+@app.get("/debate/stream/{session_id}")
+async def stream_debate(session_id: str, http_request: Request, since: Optional[int] = None):
+    """
+    Attach to a debate's SSE stream, e.g. to watch a collaborator's debate or to
+    resume after a dropped connection. Replays events after the `Last-Event-ID`
+    header (or `?since=`), then follows live ones. Any number of viewers may
+    attach to the same debate; each reads at its own pace, and one that falls
+    more than DEBATE_VIEWER_MAX_LAG events behind skips token deltas and then
+    the oldest events (marked by an "events_dropped" event) instead of slowing
+    the debate or the other viewers.
+    """
+    log = event_logs.get(session_id)
+    if log is None:
+        if debate_manager.get_status(session_id):
+            raise HTTPException(status_code=410, detail="Event stream expired; fetch /debate/result instead")
+        raise HTTPException(status_code=404, detail="Session not found")
+    if since is None:
+        last_event_id = http_request.headers.get("last-event-id", "")
+        since = int(last_event_id) if last_event_id.isdigit() else 0
+    return _event_stream(log, since, http_request, cancel_when_unwatched=False)
 
 
 # Keep the old endpoint for backward compatibility with WebSocket clients
@@ -245,6 +486,9 @@ async def start_debate_websocket(request: DebateRequest):
     Start a new design debate session.
     Returns immediately with session_id, debate runs in background.
     """
+    _check_priority(request.priority)
+    budget = _debate_budget(request.deadline_seconds)
+    ticket = _admit()
     try:
         print(f"🎬 Starting debate for prompt: {request.prompt}")
         # Create the session
@@ -256,48 +500,18 @@ async def start_debate_websocket(request: DebateRequest):
         import traceback
         error_msg = f"Failed to create debate session: {str(e)}\n{traceback.format_exc()}"
         print(f"❌ Error: {error_msg}")
+        admission.release(ticket)
         raise HTTPException(status_code=500, detail=str(e))
-    
-    # Define callback for real-time updates
-    async def message_callback(agent_name: str, content: str, round_number: int):
-        agent_info = debate_manager.AGENT_INFO.get(agent_name, {})
-        await manager.broadcast(session.session_id, {
-            "type": "agent_message",
-            "agent": agent_name,
-            "emoji": agent_info.get("emoji", "🤖"),
-            "color": agent_info.get("color", "#666"),
-            "role": agent_info.get("role", "Agent"),
-            "content": content,
-            "round": round_number,
-            "timestamp": asyncio.get_event_loop().time()
-        })
-    
-    # Run debate in background
-    async def run_debate_task():
-        try:
-            await debate_manager.run_debate(
-                session.session_id,
-                message_callback=message_callback
-            )
-            # Notify completion
-            await manager.broadcast(session.session_id, {
-                "type": "debate_complete",
-                "session_id": session.session_id,
-                "consensus": session.consensus,
-                "final_score": session.final_score
-            })
-            # Close WS connections after completion (helps avoid lingering open connections)
-            await manager.close_session(session.session_id, code=1000, reason="debate complete")
-        except Exception as e:
-            await manager.broadcast(session.session_id, {
-                "type": "debate_error",
-                "error": str(e)
-            })
-            await manager.close_session(session.session_id, code=1011, reason="debate error")
-    
-    # Start background task
-    asyncio.create_task(run_debate_task())
-    
+
+    _launch_debate(session, ticket, budget, request.priority, request.stream_tokens)
+
+    position = admission.position(ticket)
+    if position:
+        return DebateResponse(
+            session_id=session.session_id,
+            status="queued",
+            message=f"Debate queued at position {position}. Connect to WebSocket for real-time updates."
+        )
     return DebateResponse(
         session_id=session.session_id,
         status="started",
@@ -305,34 +519,27 @@ async def start_debate_websocket(request: DebateRequest):
     )
 
 
+@app.delete("/debate/{session_id}")
+async def cancel_debate(session_id: str):
+    """Stop a running debate; its pending LLM calls are abandoned and the session ends "cancelled"."""
+    if debate_manager.cancel_debate(session_id):
+        return {"session_id": session_id, "status": "cancelling"}
+    status = debate_manager.get_status(session_id)
+    if not status:
+        raise HTTPException(status_code=404, detail="Session not found")
+    raise HTTPException(status_code=409, detail=f"Debate is not running (status: {status['status']})")
+
+
 @app.get("/debate/status/{session_id}")
 async def get_debate_status(session_id: str):
     """Get the current status of a debate session."""
-    session = debate_manager.get_session(session_id)
+    # Served from the session store's summary; the transcript is not loaded
+    status = debate_manager.get_status(session_id)
     
-    if not session:
+    if not status:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    # Calculate current round
-    current_round = 1
-    for i, round_obj in enumerate(session.rounds):
-        if round_obj.status != "complete":
-            current_round = i + 1
-            break
-        current_round = i + 1
-    
-    # Count total messages
-    total_messages = sum(len(r.messages) for r in session.rounds)
-    
-    return {
-        "session_id": session.session_id,
-        "status": session.status.value,
-        "current_round": current_round,
-        "total_rounds": len(session.rounds),
-        "messages_count": total_messages,
-        "design_prompt": session.design_prompt,
-        "created_at": session.created_at
-    }
+    return status
 
 
 @app.get("/debate/result/{session_id}")
@@ -342,8 +549,8 @@ async def get_debate_result(session_id: str):
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
-    
-    return session.to_dict()
+
+    return _json_response(session.to_dict())
 
 
 @app.get("/debate/rounds/{session_id}")
@@ -354,45 +561,70 @@ async def get_debate_rounds(session_id: str):
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    return {
+    return _json_response({
         "session_id": session.session_id,
         "rounds": [r.to_dict() for r in session.rounds]
-    }
+    })
 
 
 # WebSocket for real-time updates
 @app.websocket("/debate/ws/{session_id}")
-async def websocket_endpoint(websocket: WebSocket, session_id: str):
+async def websocket_endpoint(websocket: WebSocket, session_id: str, since: int = 0):
     """
     WebSocket connection for real-time debate updates.
-    Connect before starting the debate to receive all messages.
+    Events are replayed from the session's log, so connecting late loses nothing;
+    pass ?since=<seq> (the last "seq" received) to resume after a reconnect.
     """
-    await manager.connect(websocket, session_id)
-    
-    try:
-        # Send initial connection confirmation
-        await websocket.send_json({
-            "type": "connected",
-            "session_id": session_id,
-            "message": "Connected to debate stream"
-        })
-        
-        # Keep connection alive and handle any incoming messages
+    await websocket.accept()
+    log = event_logs.get(session_id)
+    if log is None:
+        await websocket.send_json({"type": "debate_error", "error": "No event stream for this session"})
+        await websocket.close(code=1008)
+        return
+
+    # All writes go through one bounded queue, so a slow client only ever delays itself
+    sender = WebSocketSender(websocket, DEBATE_WS_SEND_QUEUE, DEBATE_WS_SEND_TIMEOUT_SECONDS)
+
+    # Send initial connection confirmation
+    sender.send({
+        "type": "connected",
+        "session_id": session_id,
+        "message": "Connected to debate stream"
+    })
+
+    # Handle ping/pong or other client messages
+    async def receive_loop():
         while True:
-            try:
-                data = await asyncio.wait_for(
-                    websocket.receive_text(),
-                    timeout=60.0
-                )
-                # Handle ping/pong or other client messages
-                if data == "ping":
-                    await websocket.send_json({"type": "pong"})
-            except asyncio.TimeoutError:
-                # Send keepalive
-                await websocket.send_json({"type": "keepalive"})
-                
-    except WebSocketDisconnect:
-        manager.disconnect(websocket, session_id)
+            data = await websocket.receive_text()
+            if data == "ping":
+                await sender.put({"type": "pong"})
+
+    # Copy the session's events into the send queue; returns how to close the socket
+    async def pump():
+        last_type = None
+        # Waiting on the sender holds this follower back; past DEBATE_VIEWER_MAX_LAG the log sheds for it
+        async for item in log.follow(since, keepalive=60.0, max_lag=DEBATE_VIEWER_MAX_LAG):
+            message = {"type": "keepalive"} if item is None else _ws_event(*item)
+            if not await sender.put(message):
+                break
+            last_type = message["type"]
+        if last_type == "debate_error":
+            return 1011, "debate error"
+        return 1000, "debate finished"
+
+    receiver = asyncio.create_task(receive_loop())
+    pumper = asyncio.create_task(pump())
+    try:
+        await asyncio.wait({receiver, pumper}, return_when=asyncio.FIRST_COMPLETED)
+        if pumper.done() and not pumper.cancelled() and pumper.exception() is None:
+            # Close after completion (helps avoid lingering open connections)
+            await sender.close(*pumper.result())
+    finally:
+        for task in (receiver, pumper):
+            task.cancel()
+            if task.done() and not task.cancelled():
+                task.exception()  # WebSocketDisconnect etc.; nothing left to tell the client
+        sender.abort()
 
 
 # Run the server
@@ -0,0 +1,202 @@
+"""
+Debate data model - sessions, rounds and agent messages
+Slotted dataclasses shared by the debate manager and the session stores.
+Servers keep thousands of sessions around, so messages are stored compactly:
+agent names and roles are interned, timestamps are floats (formatted only
+when serialized) and SVG-bearing contents are stored once per distinct payload.
+"""
+from typing import Dict, List, Optional
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+import hashlib
+import re
+import sys
+import time
+import weakref
+
+
+class DebateStatus(str, Enum):
+    PENDING = "pending"
+    IN_PROGRESS = "in_progress"
+    ROUND_COMPLETE = "round_complete"
+    CONSENSUS_REACHED = "consensus_reached"
+    FAILED = "failed"
+    COMPLETED = "completed"
+    PARTIAL = "partial"  # deadline hit: completed with the rounds that fit
+    CANCELLED = "cancelled"  # client went away or asked to stop
+
+
+# Round statuses after which a round no longer changes
+FINISHED_ROUND_STATUSES = frozenset({"complete", "partial", "skipped"})
+
+
+class AgentVote(str, Enum):
+    APPROVE = "approve"
+    ADJUST = "adjust"
+    RETHINK = "rethink"
+
+
+def format_timestamp(created: float) -> str:
+    """Wire form of a message timestamp (local ISO 8601, as datetime.now().isoformat())."""
+    return datetime.fromtimestamp(created).isoformat()
+
+
+def parse_timestamp(timestamp: str) -> float:
+    return datetime.fromisoformat(timestamp).timestamp()
+
+
+class _SharedText(str):
+    """A str that can be weakly referenced (plain str can't), for the SVG pool."""
+
+
+_SVG = re.compile(r"<svg\b", re.IGNORECASE)
+# Only payloads this large are worth hashing
+_SVG_SHARE_MIN_CHARS = 512
+# Content hash -> the one live copy of that SVG-bearing content
+_svg_pool: "weakref.WeakValueDictionary[bytes, _SharedText]" = weakref.WeakValueDictionary()
+
+
+def share_svg(content: str) -> str:
+    """
+    The stored copy of an SVG-bearing content: identical SVG payloads (re-sent
+    prototypes, replayed or reloaded debates) share one string. Entries go away
+    with the last message using them.
+    """
+    if len(content) < _SVG_SHARE_MIN_CHARS or isinstance(content, _SharedText) or not _SVG.search(content):
+        return content
+    key = hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+    shared = _svg_pool.get(key)
+    if shared is None:
+        shared = _SharedText(content)
+        _svg_pool[key] = shared
+    return shared
+
+
+@dataclass(slots=True)
+class AgentMessage:
+    """A single message from an agent in the debate."""
+    agent_name: str
+    agent_role: str
+    content: str
+    created: float = field(default_factory=time.time)  # epoch seconds; see `timestamp`
+    round_number: int = 0
+    message_type: str = "discussion"  # discussion, vote, consensus
+
+    def __post_init__(self):
+        # The same few names, roles and types repeat on every message: keep one copy of each
+        self.agent_name = sys.intern(self.agent_name)
+        self.agent_role = sys.intern(self.agent_role)
+        self.message_type = sys.intern(self.message_type)
+        self.content = share_svg(self.content)
+
+    @property
+    def timestamp(self) -> str:
+        return format_timestamp(self.created)
+
+    def to_dict(self) -> Dict:
+        # Field by field: asdict() deep-copies every value, long SVG contents included
+        return {
+            "agent_name": self.agent_name,
+            "agent_role": self.agent_role,
+            "content": self.content,
+            "timestamp": self.timestamp,
+            "round_number": self.round_number,
+            "message_type": self.message_type
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "AgentMessage":
+        return cls(
+            agent_name=data["agent_name"],
+            agent_role=data["agent_role"],
+            content=data["content"],
+            created=parse_timestamp(data["timestamp"]),
+            round_number=data.get("round_number", 0),
+            message_type=data.get("message_type", "discussion")
+        )
+
+
+@dataclass(slots=True)
+class DebateRound:
+    """A single round in the debate."""
+    round_number: int
+    theme: str  # e.g., "Initial Critique", "Refinement", "Consensus"
+    messages: List[AgentMessage] = field(default_factory=list)
+    votes: Dict[str, str] = field(default_factory=dict)
+    status: str = "pending"
+    summary: str = ""
+    # (fingerprint, dict) of the last serialization of a finished round
+    _serialized: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+
+    def to_dict(self) -> Dict:
+        """
+        Serialized round. A finished round no longer changes, so its dict is built
+        once and shared by later calls: treat the result as read-only.
+        """
+        fingerprint = (self.status, len(self.messages), self.summary)
+        if self._serialized is not None and self._serialized[0] == fingerprint:
+            return self._serialized[1]
+        data = {
+            "round_number": self.round_number,
+            "theme": self.theme,
+            "messages": [m.to_dict() for m in self.messages],
+            "votes": self.votes,
+            "status": self.status,
+            "summary": self.summary
+        }
+        if self.status in FINISHED_ROUND_STATUSES:
+            self._serialized = (fingerprint, data)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "DebateRound":
+        return cls(
+            round_number=data["round_number"],
+            theme=data["theme"],
+            messages=[AgentMessage.from_dict(m) for m in data.get("messages", [])],
+            votes=dict(data.get("votes") or {}),
+            status=data.get("status", "pending"),
+            summary=data.get("summary", "")
+        )
+
+
+@dataclass(slots=True)
+class DebateSession:
+    """Complete debate session with all rounds and metadata."""
+    session_id: str
+    design_prompt: str
+    project_id: Optional[str] = None
+    status: DebateStatus = DebateStatus.PENDING
+    rounds: List[DebateRound] = field(default_factory=list)
+    consensus: Optional[Dict] = None
+    final_score: float = 0.0
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    completed_at: Optional[str] = None
+    
+    def to_dict(self) -> Dict:
+        return {
+            "session_id": self.session_id,
+            "design_prompt": self.design_prompt,
+            "project_id": self.project_id,
+            "status": self.status.value,
+            "rounds": [r.to_dict() for r in self.rounds],
+            "consensus": self.consensus,
+            "final_score": self.final_score,
+            "created_at": self.created_at,
+            "completed_at": self.completed_at
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "DebateSession":
+        return cls(
+            session_id=data["session_id"],
+            design_prompt=data["design_prompt"],
+            project_id=data.get("project_id"),
+            status=DebateStatus(data.get("status", DebateStatus.PENDING.value)),
+            rounds=[DebateRound.from_dict(r) for r in data.get("rounds", [])],
+            consensus=data.get("consensus"),
+            final_score=data.get("final_score", 0.0),
+            created_at=data["created_at"],
+            completed_at=data.get("completed_at")
+        )
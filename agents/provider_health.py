@@ -0,0 +1,215 @@
+"""Adaptive rate control and circuit breaking for LLM providers.
+
+- `AIMDController` scales the limiter's configured rate: halve it when the
+  provider answers 429, add a small step back after each healthy call. The
+  configured RPM/TPM is the ceiling, so we probe up to it but never beyond.
+- `CircuitBreaker` (one per provider base_url) opens after consecutive
+  provider failures (timeouts, connection errors, 5xx) and fails calls fast
+  until a cool-down has passed; then a single probe call decides whether it
+  closes again. A probe that ends without a verdict (cancelled, cut off by a
+  deadline) or hangs for a whole cool-down hands over to the next call.
+- `LatencyTracker` keeps recent call latencies per provider; its p95 is the
+  hedging threshold for the async execution path.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose circuit is open."""
+
+
+def is_provider_failure(err: BaseException) -> bool:
+    """True for errors that say the provider is unhealthy, not that the request was bad."""
+    status = getattr(err, "status_code", None)
+    if status is None:
+        status = getattr(getattr(err, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status >= 500
+    # openai.APIConnectionError / APITimeoutError, httpx.ConnectError / ReadTimeout, builtins
+    name = type(err).__name__
+    return isinstance(err, (TimeoutError, ConnectionError)) or "Timeout" in name or "Connect" in name
+
+
+class AIMDController:
+    """Additive-increase / multiplicative-decrease of a rate fraction in [min_scale, 1]."""
+
+    def __init__(
+        self,
+        min_scale: float = 0.1,
+        decrease_factor: float = 0.5,
+        increase_step: float = 0.05,
+        decrease_cooldown_seconds: float = 5.0,
+        slow_call_seconds: float = 30.0,
+    ):
+        self.min_scale = min_scale
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self.decrease_cooldown_seconds = decrease_cooldown_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self.scale = 1.0
+        self.throttle_events = 0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def on_throttle(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            # A burst of 429s from one overload counts once.
+            if now - self._last_decrease >= self.decrease_cooldown_seconds:
+                self.scale = max(self.min_scale, self.scale * self.decrease_factor)
+                self._last_decrease = now
+            self.throttle_events += 1
+            return self.scale
+
+    def on_success(self, latency_seconds: float) -> float:
+        with self._lock:
+            # A slow answer means the provider is struggling: hold the rate rather than push it.
+            if latency_seconds < self.slow_call_seconds:
+                self.scale = min(1.0, self.scale + self.increase_step)
+            return self.scale
+
+
+class CircuitBreaker:
+    """closed -> open after `failure_threshold` consecutive failures -> half_open after `reset_seconds`."""
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _probe_due(self, now: float) -> bool:
+        # Caller holds the lock.
+        if self.state == "open" and now - self.opened_at >= self.reset_seconds:
+            self.state = "half_open"
+            self._probe_started = None
+        return self.state == "half_open" and (
+            self._probe_started is None or now - self._probe_started >= self.reset_seconds
+        )
+
+    def _reject(self, now: float) -> None:
+        self.rejected += 1
+        retry_in = max(0.0, self.reset_seconds - (now - self.opened_at))
+        raise CircuitOpenError(
+            f"LLM provider {self.name} is unavailable (circuit open, retry in {retry_in:.0f}s)"
+        )
+
+    def check(self) -> None:
+        """Fail fast when a call would be rejected now; unlike `before_call`, claims nothing."""
+        with self._lock:
+            now = time.monotonic()
+            if self.state != "closed" and not self._probe_due(now):
+                self._reject(now)
+
+    def before_call(self) -> bool:
+        """Admit a call or raise `CircuitOpenError`. True when the call is the half-open probe:
+        the caller must then `release_probe()` once it is over, whatever the outcome."""
+        with self._lock:
+            if self.state == "closed":
+                return False
+            now = time.monotonic()
+            if self._probe_due(now):
+                self._probe_started = now
+                return True
+            self._reject(now)
+
+    def release_probe(self) -> None:
+        """End a probe; without a recorded success or failure the next call probes instead."""
+        with self._lock:
+            self._probe_started = None
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probe_started = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    print(f"⚡ Circuit opened for LLM provider {self.name} after {self.failures} failure(s)")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self._probe_started = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "consecutive_failures": self.failures, "rejected": self.rejected}
+
+
+class LatencyTracker:
+    """Sliding window of recent successful call latencies for one provider."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float, min_samples: int = 20) -> Optional[float]:
+        """The q-quantile (0..1) of the window, or None until `min_samples` calls were seen."""
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def stats(self) -> Dict[str, Any]:
+        p50, p95 = self.percentile(0.5, 1), self.percentile(0.95, 1)
+        return {
+            "samples": len(self._samples),
+            "p50_seconds": round(p50, 3) if p50 is not None else None,
+            "p95_seconds": round(p95, 3) if p95 is not None else None,
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_latencies: Dict[str, LatencyTracker] = {}
+_breakers_lock = threading.Lock()
+_breaker_options: Dict[str, Any] = {}
+
+
+def configure_circuit_breakers(failure_threshold: int, reset_seconds: float) -> None:
+    """Set the thresholds used by breakers created from now on."""
+    _breaker_options.update(failure_threshold=failure_threshold, reset_seconds=reset_seconds)
+
+
+def breaker_for(base_url: Optional[str]) -> CircuitBreaker:
+    """The circuit breaker for a provider endpoint (created on first use)."""
+    name = (base_url or "default").rstrip("/")
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name, **_breaker_options)
+            _breakers[name] = breaker
+        return breaker
+
+
+def latency_tracker(base_url: Optional[str]) -> LatencyTracker:
+    """The latency window for a provider endpoint (created on first use)."""
+    name = (base_url or "default").rstrip("/")
+    with _breakers_lock:
+        tracker = _latencies.get(name)
+        if tracker is None:
+            tracker = LatencyTracker()
+            _latencies[name] = tracker
+        return tracker
+
+
+def breaker_stats() -> Dict[str, Dict[str, Any]]:
+    with _breakers_lock:
+        return {
+            name: {**breaker.stats(), "latency": _latencies[name].stats() if name in _latencies else None}
+            for name, breaker in _breakers.items()
+        }
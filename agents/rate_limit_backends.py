@@ -0,0 +1,117 @@
+"""Storage backends for the rate limiter's bucket state.
+
+The limiter keeps all of its state in one small JSON-compatible dict and only
+touches it inside `backend.transaction()`. Where that dict lives decides who
+shares the quota:
+
+- `InProcessBackend`: a dict behind a thread lock (one process).
+- `FileLockBackend`: a JSON file guarded by an OS file lock, shared by every
+  process on the host (e.g. several uvicorn workers).
+
+A networked stand-in (Redis, etc.) only needs to implement `transaction()`
+atomically, e.g. GET + WATCH/MULTI/SET on a single key, or a lock key with
+a short expiry around a GET/SET.
+"""
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator
+
+try:
+    import fcntl  # type: ignore
+
+    def _lock_file(fh) -> None:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+
+    def _unlock_file(fh) -> None:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+except ImportError:  # Windows
+    import msvcrt  # type: ignore
+
+    def _lock_file(fh) -> None:
+        fh.seek(0)
+        # LK_LOCK retries for ~10s before raising; loop so callers simply block.
+        while True:
+            try:
+                msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+    def _unlock_file(fh) -> None:
+        fh.seek(0)
+        msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class RateLimitBackend(ABC):
+    """Holds the limiter state; `transaction()` yields it for an atomic read-modify-write."""
+
+    name = "base"
+
+    @abstractmethod
+    def transaction(self) -> ContextManager[Dict[str, Any]]:
+        """Context manager yielding the state dict; changes are saved atomically on exit."""
+
+
+class InProcessBackend(RateLimitBackend):
+    name = "memory"
+
+    def __init__(self):
+        self._state: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def transaction(self) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            yield self._state
+
+
+class FileLockBackend(RateLimitBackend):
+    """JSON state file plus a sidecar lock file; safe across processes on one host."""
+
+    name = "file"
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock_path = self.path.with_name(self.path.name + ".lock")
+        # flock is per open file description, so threads in this process still need their own lock.
+        self._thread_lock = threading.Lock()
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                return json.load(fh)
+        except (FileNotFoundError, ValueError):
+            # Missing or torn state only costs a briefly optimistic limiter.
+            return {}
+
+    def _write(self, state: Dict[str, Any]) -> None:
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(state, fh, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    @contextmanager
+    def transaction(self) -> Iterator[Dict[str, Any]]:
+        with self._thread_lock, open(self._lock_path, "a+b") as lock_fh:
+            _lock_file(lock_fh)
+            try:
+                state = self._read()
+                yield state
+                self._write(state)
+            finally:
+                _unlock_file(lock_fh)
+
+
+def create_rate_limit_backend(backend: str, **options: Any) -> RateLimitBackend:
+    """Build a backend by name ("memory" or "file")."""
+    if backend == "memory":
+        return InProcessBackend()
+    if backend == "file":
+        return FileLockBackend(options["path"])
+    raise ValueError(f"Unsupported rate limit backend: {backend}. Use 'memory' or 'file'.")
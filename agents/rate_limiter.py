@@ -0,0 +1,223 @@
+"""Token-bucket rate limiting across a pool of provider API keys.
+
+Each key gets two buckets: requests per minute and tokens per minute (prompt +
+completion, estimated up front and corrected with the provider's reported
+usage). A call is scheduled on whichever key can serve it soonest, so adding
+keys raises throughput roughly linearly.
+"""
+import hashlib
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+try:
+    from rate_limit_backends import InProcessBackend, RateLimitBackend
+    from context_budget import count_message_tokens
+except ModuleNotFoundError:
+    from agents.rate_limit_backends import InProcessBackend, RateLimitBackend
+    from agents.context_budget import count_message_tokens
+
+
+def estimate_tokens(params: Dict[str, Any], completion_tokens: int = 512) -> int:
+    """Estimate the TPM cost of a chat completion request (prompt + expected completion)."""
+    messages = [m for m in params.get("messages") or [] if isinstance(m, dict)]
+    max_tokens = params.get("max_tokens") or params.get("max_completion_tokens") or completion_tokens
+    return count_message_tokens(messages) + int(max_tokens)
+
+
+def usage_tokens(response: Any) -> Optional[int]:
+    """Total tokens reported by the provider, from a ChatCompletion or its dict form."""
+    usage = response.get("usage") if isinstance(response, dict) else getattr(response, "usage", None)
+    if usage is None:
+        return None
+    total = usage.get("total_tokens") if isinstance(usage, dict) else getattr(usage, "total_tokens", None)
+    return int(total) if total else None
+
+
+class TokenBucket:
+    """Continuously refilling bucket; the level may go negative (debt) when usage is corrected upwards.
+
+    State is a plain ``[level, updated]`` pair so it can live in a shared backend.
+    """
+
+    def __init__(self, capacity: float, per_minute: float, state: Optional[List[float]] = None):
+        self.capacity = max(1.0, float(capacity))
+        self.rate = max(0.0, float(per_minute)) / 60.0
+        if state:
+            self.level, self.updated = float(state[0]), float(state[1])
+        else:
+            # A fresh bucket is full; updated=0 keeps it from looking newer than the caller's `now`.
+            self.level, self.updated = self.capacity, 0.0
+
+    def state(self) -> List[float]:
+        return [self.level, self.updated]
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def ready_at(self, amount: float, now: float) -> float:
+        """Time at which `amount` units will be available."""
+        self._refill(now)
+        # Earlier reservations may already have charged the bucket up to a future time.
+        start = max(now, self.updated)
+        # Never ask for more than a full bucket, or an oversized call could never run.
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return start
+        if self.rate <= 0:
+            return float("inf")
+        return start + (amount - self.level) / self.rate
+
+    def take(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        """Give back (positive) or charge extra (negative) units after the fact."""
+        self.level = min(self.capacity, self.level + delta)
+
+
+def _key_id(api_key: str) -> str:
+    # Shared state may be written to disk; never store the key itself.
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+class _KeyState:
+    """View over one key's entry in the backend state dict."""
+
+    def __init__(self, api_key: str, rpm: float, tpm: float, state: Dict[str, Any]):
+        self.api_key = api_key
+        # Capacity 1 request => calls are spaced evenly instead of bursting a minute's quota.
+        self.requests = TokenBucket(1, rpm, state.get("requests"))
+        self.tokens = TokenBucket(tpm, tpm, state.get("tokens")) if tpm > 0 else None
+        self.blocked_until = float(state.get("blocked_until", 0.0))
+
+    def ready_at(self, tokens: int, now: float) -> float:
+        ready = max(now, self.blocked_until, self.requests.ready_at(1, now))
+        if self.tokens is not None:
+            ready = max(ready, self.tokens.ready_at(tokens, now))
+        return ready
+
+    def state(self) -> Dict[str, Any]:
+        state: Dict[str, Any] = {"requests": self.requests.state(), "blocked_until": self.blocked_until}
+        if self.tokens is not None:
+            state["tokens"] = self.tokens.state()
+        return state
+
+
+@dataclass
+class Reservation:
+    """A claimed slot: which key to use, how long to wait first, and the tokens charged."""
+    api_key: str
+    wait_seconds: float
+    tokens: int
+
+
+class RateLimiter:
+    """
+    RPM + TPM limiter over a pool of API keys.
+
+    `reserve()` picks the key with the earliest availability and charges its
+    buckets immediately (so concurrent callers queue behind each other);
+    `settle()` corrects the token charge once the real usage is known and
+    `penalize()` parks a key that the provider answered with a 429.
+
+    Bucket state lives in `backend` (see rate_limit_backends); with a shared
+    backend every process using the same keys draws from one quota. Times are
+    wall-clock so they mean the same thing in every process.
+    """
+
+    def __init__(
+        self,
+        api_keys: Sequence[str],
+        requests_per_minute: float,
+        tokens_per_minute: float = 0,
+        backend: Optional[RateLimitBackend] = None,
+    ):
+        keys = [k for k in dict.fromkeys(api_keys) if k]
+        if not keys:
+            raise ValueError("RateLimiter needs at least one API key")
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.backend = backend or InProcessBackend()
+        self._keys = keys
+        # Fraction of the configured rates currently allowed (lowered by adaptive backoff).
+        self.scale = 1.0
+
+    @property
+    def api_keys(self) -> List[str]:
+        return list(self._keys)
+
+    def _key_state(self, api_key: str, shared: Dict[str, Any]) -> _KeyState:
+        return _KeyState(
+            api_key,
+            self.requests_per_minute * self.scale,
+            self.tokens_per_minute * self.scale,
+            shared.get(_key_id(api_key)) or {},
+        )
+
+    @contextmanager
+    def _states(self) -> Iterator[Dict[str, _KeyState]]:
+        with self.backend.transaction() as shared:
+            states = {k: self._key_state(k, shared) for k in self._keys}
+            yield states
+            for k, state in states.items():
+                shared[_key_id(k)] = state.state()
+
+    def next_available(self, tokens: int) -> float:
+        """Seconds until some key could serve a call of `tokens`, without charging anything."""
+        with self.backend.transaction() as shared:
+            now = time.time()
+            return max(0.0, min(self._key_state(k, shared).ready_at(tokens, now) for k in self._keys) - now)
+
+    def reserve(self, tokens: int) -> Reservation:
+        with self._states() as states:
+            now = time.time()
+            state = min(states.values(), key=lambda s: s.ready_at(tokens, now))
+            start = state.ready_at(tokens, now)
+            # Charge at the start time so the buckets reflect the queued call.
+            state.requests.take(1, start)
+            if state.tokens is not None:
+                state.tokens.take(tokens, start)
+        return Reservation(api_key=state.api_key, wait_seconds=max(0.0, start - now), tokens=tokens)
+
+    def settle(self, reservation: Reservation, actual_tokens: Optional[int]) -> None:
+        if actual_tokens is None or self.tokens_per_minute <= 0:
+            return
+        with self._states() as states:
+            state = states.get(reservation.api_key)
+            if state is not None and state.tokens is not None:
+                state.tokens.adjust(reservation.tokens - actual_tokens)
+
+    def penalize(self, api_key: str, seconds: float) -> None:
+        with self._states() as states:
+            state = states.get(api_key)
+            if state is not None:
+                state.blocked_until = max(state.blocked_until, time.time() + max(0.0, seconds))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._states() as states:
+            now = time.time()
+            next_available = min(s.ready_at(0, now) for s in states.values()) - now
+        return {
+            "backend": self.backend.name,
+            "keys": len(self._keys),
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+            "scale": round(self.scale, 3),
+            "effective_requests_per_minute": round(self.requests_per_minute * self.scale, 3),
+            "effective_tokens_per_minute": round(self.tokens_per_minute * self.scale, 1),
+            "next_available_seconds": round(next_available, 3),
+        }
+
+
+def api_key_pool(pool_var: str, single_var: str) -> List[str]:
+    """Keys from a comma-separated `pool_var`, falling back to the single-key `single_var`."""
+    keys = [k.strip() for k in os.getenv(pool_var, "").split(",") if k.strip()]
+    if not keys and os.getenv(single_var):
+        keys = [os.getenv(single_var, "").strip()]
+    return keys
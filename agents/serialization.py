@@ -0,0 +1,38 @@
+"""
+Serialization - fast JSON encoding for events and sessions
+Uses orjson when it is installed (several times faster on large SVG-bearing
+payloads) and the standard library otherwise. Both produce compact UTF-8
+JSON, so clients see the same data either way.
+"""
+from typing import Any
+import json
+
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def _fallback(value: Any) -> Any:
+    # Same leniency as the stdlib path below (e.g. datetimes, sets)
+    return str(value)
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps_bytes(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_fallback, option=_OPTIONS)
+
+    def dumps(obj: Any) -> str:
+        return orjson.dumps(obj, default=_fallback, option=_OPTIONS).decode("utf-8")
+else:
+    _encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=_fallback)
+
+    def dumps(obj: Any) -> str:
+        return _encoder.encode(obj)
+
+    def dumps_bytes(obj: Any) -> bytes:
+        return _encoder.encode(obj).encode("utf-8")
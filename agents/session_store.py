@@ -0,0 +1,491 @@
+"""
+Session Store - where debate sessions live between requests
+In-memory LRU+TTL store (default) and a SQLite store that persists rounds and
+messages incrementally while a debate runs
+"""
+from typing import Dict, List, Optional
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+import gzip
+import json
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    from models import (
+        DebateStatus, AgentMessage, DebateRound, DebateSession, FINISHED_ROUND_STATUSES, parse_timestamp
+    )
+    from serialization import dumps
+except ModuleNotFoundError:
+    from agents.models import (
+        DebateStatus, AgentMessage, DebateRound, DebateSession, FINISHED_ROUND_STATUSES, parse_timestamp
+    )
+    from agents.serialization import dumps
+
+
+# Sessions in these states are still being written by a running debate
+ACTIVE_STATUSES = {DebateStatus.PENDING, DebateStatus.IN_PROGRESS}
+
+
+def _current_round(round_statuses: List[str]) -> int:
+    """First round that is not finished (complete/partial/skipped), or the last round (1-based)."""
+    current_round = 1
+    for i, status in enumerate(round_statuses):
+        current_round = i + 1
+        if status not in FINISHED_ROUND_STATUSES:
+            break
+    return current_round
+
+
+def status_summary(session: DebateSession) -> Dict:
+    """Lightweight status view of a session (no transcript)."""
+    return {
+        "session_id": session.session_id,
+        "status": session.status.value,
+        "current_round": _current_round([r.status for r in session.rounds]),
+        "total_rounds": len(session.rounds),
+        "messages_count": sum(len(r.messages) for r in session.rounds),
+        "design_prompt": session.design_prompt,
+        "created_at": session.created_at
+    }
+
+
+class SessionStore(ABC):
+    """
+    Storage backend for debate sessions.
+
+    The manager calls `add` when a session is created and the `save_*` hooks as
+    a debate progresses; stores that persist data write incrementally from them.
+    """
+
+    @abstractmethod
+    def add(self, session: DebateSession) -> None:
+        """Register a newly created session."""
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[DebateSession]:
+        """The full session, or None if unknown."""
+
+    def get_status(self, session_id: str) -> Optional[Dict]:
+        """Status summary without materializing the transcript when avoidable."""
+        session = self.get(session_id)
+        return status_summary(session) if session else None
+
+    def save_message(self, session: DebateSession, round_obj: DebateRound, message: AgentMessage) -> None:
+        """Called after `message` was appended to `round_obj`."""
+
+    def save_round(self, session: DebateSession, round_obj: DebateRound) -> None:
+        """Called when a round's status, votes or summary changed."""
+
+    def save_session(self, session: DebateSession) -> None:
+        """Called when session-level fields (status, consensus, score) changed."""
+
+    def reap(self) -> int:
+        """Evict sessions that are due; returns how many were evicted."""
+        return 0
+
+
+def estimate_session_bytes(session: DebateSession) -> int:
+    """
+    Rough resident size of a session, dominated by message text and SVGs.
+    SVG payloads shared with other sessions are counted in full, so it errs high.
+    """
+    size = 512 + len(session.design_prompt)
+    for round_obj in session.rounds:
+        size += 256 + len(round_obj.theme) + len(round_obj.summary)
+        for message in round_obj.messages:
+            size += 112 + len(message.content)  # slotted message + float timestamp
+    return size
+
+
+class SessionArchive:
+    """
+    Compact on-disk archive of finished sessions, one gzip JSONL file each.
+
+    Lines are a session header, then each round header followed by its
+    messages, so a session can be streamed back without holding the JSON twice.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, session_id: str) -> Path:
+        # Session ids are uuids; keep the file name safe regardless.
+        safe_id = "".join(c for c in session_id if c.isalnum() or c in "-_")
+        return self.directory / f"{safe_id}.jsonl.gz"
+
+    def contains(self, session_id: str) -> bool:
+        return self._path(session_id).exists()
+
+    def write(self, session: DebateSession) -> None:
+        data = session.to_dict()
+        rounds = data.pop("rounds")
+        path = self._path(session.session_id)
+        tmp_path = path.with_suffix(".tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as fh:
+            fh.write(dumps({"kind": "session", **data}) + "\n")
+            for round_data in rounds:
+                # Round dicts may be shared (see DebateRound.to_dict); don't modify them
+                round_fields = {k: v for k, v in round_data.items() if k != "messages"}
+                fh.write(dumps({"kind": "round", **round_fields}) + "\n")
+                for message in round_data["messages"]:
+                    fh.write(dumps({"kind": "message", **message}) + "\n")
+        os.replace(tmp_path, path)
+
+    def read(self, session_id: str) -> Optional[DebateSession]:
+        path = self._path(session_id)
+        if not path.exists():
+            return None
+        data: Optional[Dict] = None
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                record = json.loads(line)
+                kind = record.pop("kind")
+                if kind == "session":
+                    data = {**record, "rounds": []}
+                elif kind == "round":
+                    data["rounds"].append({**record, "messages": []})
+                elif kind == "message":
+                    data["rounds"][-1]["messages"].append(record)
+        return DebateSession.from_dict(data) if data else None
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Process-local store with LRU, idle-TTL and memory-budget eviction.
+
+    Running sessions are never evicted. Finished ones are evicted by `reap`
+    once unused for `ttl_seconds`, beyond `max_sessions`, or while the held
+    sessions exceed `memory_budget_bytes`. With an archive, evicted sessions
+    are compacted to disk first and `get` rehydrates them on demand.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 500,
+        ttl_seconds: float = 86400,
+        memory_budget_bytes: int = 0,
+        archive: Optional[SessionArchive] = None
+    ):
+        self.max_sessions = max(1, max_sessions)
+        self.ttl_seconds = ttl_seconds
+        self.memory_budget_bytes = memory_budget_bytes
+        self.archive = archive
+        self._sessions: "OrderedDict[str, DebateSession]" = OrderedDict()
+        self._last_access: Dict[str, float] = {}
+        # Sizes of finished (no longer mutated) sessions, computed once
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, session: DebateSession) -> None:
+        with self._lock:
+            self._sessions[session.session_id] = session
+            self._last_access[session.session_id] = time.monotonic()
+
+    def get(self, session_id: str) -> Optional[DebateSession]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+                self._last_access[session_id] = time.monotonic()
+                return session
+
+        if self.archive is None:
+            return None
+        session = self.archive.read(session_id)
+        if session is not None:
+            with self._lock:
+                # Another request may have rehydrated it meanwhile
+                session = self._sessions.setdefault(session_id, session)
+                self._sessions.move_to_end(session_id)
+                self._last_access[session_id] = time.monotonic()
+        return session
+
+    def reap(self) -> int:
+        with self._lock:
+            victims = self._select_victims_locked(time.monotonic())
+            sessions = [self._sessions[sid] for sid in victims]
+
+        # Archive outside the lock; gzip writes must not block readers.
+        evicted = 0
+        for session in sessions:
+            if self.archive is not None and not self.archive.contains(session.session_id):
+                try:
+                    self.archive.write(session)
+                except OSError as e:
+                    print(f"⚠️ Could not archive session {session.session_id}: {e}")
+                    continue
+            with self._lock:
+                current = self._sessions.get(session.session_id)
+                if current is not session or current.status in ACTIVE_STATUSES:
+                    continue
+                self._sessions.pop(session.session_id, None)
+                self._last_access.pop(session.session_id, None)
+                self._sizes.pop(session.session_id, None)
+                evicted += 1
+        return evicted
+
+    def _select_victims_locked(self, now: float) -> List[str]:
+        finished = [
+            sid for sid, s in self._sessions.items()  # least recently used first
+            if s.status not in ACTIVE_STATUSES
+        ]
+        for sid in finished:
+            if sid not in self._sizes:
+                self._sizes[sid] = estimate_session_bytes(self._sessions[sid])
+
+        overflow = len(self._sessions) - self.max_sessions
+        over_budget = 0
+        if self.memory_budget_bytes > 0:
+            held = sum(
+                self._sizes.get(sid) or estimate_session_bytes(s)
+                for sid, s in self._sessions.items()
+            )
+            over_budget = held - self.memory_budget_bytes
+
+        victims: List[str] = []
+        for sid in finished:
+            expired = self.ttl_seconds > 0 and now - self._last_access[sid] > self.ttl_seconds
+            if not expired and overflow <= 0 and over_budget <= 0:
+                continue
+            victims.append(sid)
+            overflow -= 1
+            over_budget -= self._sizes[sid]
+        return victims
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Durable store backed by a SQLite file.
+
+    Messages are inserted as they are produced and round/session rows are
+    updated in place, so a restart loses at most the in-flight turn. Running
+    sessions are also kept in memory; finished ones are loaded on demand.
+    """
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sessions (
+        session_id TEXT PRIMARY KEY,
+        design_prompt TEXT NOT NULL,
+        project_id TEXT,
+        status TEXT NOT NULL,
+        consensus TEXT,
+        final_score REAL NOT NULL DEFAULT 0,
+        created_at TEXT NOT NULL,
+        completed_at TEXT
+    );
+    CREATE TABLE IF NOT EXISTS rounds (
+        session_id TEXT NOT NULL,
+        round_number INTEGER NOT NULL,
+        theme TEXT NOT NULL,
+        votes TEXT NOT NULL DEFAULT '{}',
+        status TEXT NOT NULL,
+        summary TEXT NOT NULL DEFAULT '',
+        PRIMARY KEY (session_id, round_number)
+    );
+    CREATE TABLE IF NOT EXISTS messages (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id TEXT NOT NULL,
+        round_number INTEGER NOT NULL,
+        agent_name TEXT NOT NULL,
+        agent_role TEXT NOT NULL,
+        content TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        message_type TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_messages_session ON messages (session_id, round_number, id);
+    """
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self._SCHEMA)
+        self._lock = threading.Lock()
+        self._live: Dict[str, DebateSession] = {}
+
+    def _execute(self, sql: str, params=()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def add(self, session: DebateSession) -> None:
+        self._live[session.session_id] = session
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    self._session_row(session),
+                )
+                for round_obj in session.rounds:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO rounds VALUES (?, ?, ?, ?, ?, ?)",
+                        self._round_row(session, round_obj),
+                    )
+                    for message in round_obj.messages:
+                        self._conn.execute(
+                            "INSERT INTO messages (session_id, round_number, agent_name, agent_role, "
+                            "content, timestamp, message_type) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            self._message_row(session, message),
+                        )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def save_message(self, session: DebateSession, round_obj: DebateRound, message: AgentMessage) -> None:
+        self._execute(
+            "INSERT INTO messages (session_id, round_number, agent_name, agent_role, "
+            "content, timestamp, message_type) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            self._message_row(session, message),
+        )
+
+    def save_round(self, session: DebateSession, round_obj: DebateRound) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO rounds VALUES (?, ?, ?, ?, ?, ?)",
+            self._round_row(session, round_obj),
+        )
+
+    def save_session(self, session: DebateSession) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            self._session_row(session),
+        )
+        if session.status not in ACTIVE_STATUSES:
+            self._live.pop(session.session_id, None)
+
+    def get(self, session_id: str) -> Optional[DebateSession]:
+        live = self._live.get(session_id)
+        if live is not None:
+            return live
+
+        rows = self._execute("SELECT * FROM sessions WHERE session_id = ?", (session_id,))
+        if not rows:
+            return None
+        (sid, design_prompt, project_id, status, consensus, final_score, created_at, completed_at) = rows[0]
+        session = DebateSession(
+            session_id=sid,
+            design_prompt=design_prompt,
+            project_id=project_id,
+            status=DebateStatus(status),
+            consensus=json.loads(consensus) if consensus else None,
+            final_score=final_score,
+            created_at=created_at,
+            completed_at=completed_at
+        )
+        rounds: Dict[int, DebateRound] = {}
+        for round_number, theme, votes, round_status, summary in self._execute(
+            "SELECT round_number, theme, votes, status, summary FROM rounds "
+            "WHERE session_id = ? ORDER BY round_number",
+            (session_id,),
+        ):
+            rounds[round_number] = DebateRound(
+                round_number=round_number,
+                theme=theme,
+                votes=json.loads(votes),
+                status=round_status,
+                summary=summary
+            )
+        for round_number, agent_name, agent_role, content, timestamp, message_type in self._execute(
+            "SELECT round_number, agent_name, agent_role, content, timestamp, message_type "
+            "FROM messages WHERE session_id = ? ORDER BY id",
+            (session_id,),
+        ):
+            if round_number in rounds:
+                rounds[round_number].messages.append(AgentMessage(
+                    agent_name=agent_name,
+                    agent_role=agent_role,
+                    content=content,
+                    created=parse_timestamp(timestamp),
+                    round_number=round_number,
+                    message_type=message_type
+                ))
+        session.rounds = list(rounds.values())
+        return session
+
+    def get_status(self, session_id: str) -> Optional[Dict]:
+        live = self._live.get(session_id)
+        if live is not None:
+            return status_summary(live)
+
+        rows = self._execute(
+            "SELECT session_id, status, design_prompt, created_at FROM sessions WHERE session_id = ?",
+            (session_id,),
+        )
+        if not rows:
+            return None
+        sid, status, design_prompt, created_at = rows[0]
+        round_statuses = [r[0] for r in self._execute(
+            "SELECT status FROM rounds WHERE session_id = ? ORDER BY round_number", (session_id,)
+        )]
+        messages_count = self._execute(
+            "SELECT COUNT(*) FROM messages WHERE session_id = ?", (session_id,)
+        )[0][0]
+        return {
+            "session_id": sid,
+            "status": status,
+            "current_round": _current_round(round_statuses),
+            "total_rounds": len(round_statuses),
+            "messages_count": messages_count,
+            "design_prompt": design_prompt,
+            "created_at": created_at
+        }
+
+    @staticmethod
+    def _session_row(session: DebateSession) -> tuple:
+        return (
+            session.session_id,
+            session.design_prompt,
+            session.project_id,
+            session.status.value,
+            json.dumps(session.consensus) if session.consensus is not None else None,
+            session.final_score,
+            session.created_at,
+            session.completed_at,
+        )
+
+    @staticmethod
+    def _round_row(session: DebateSession, round_obj: DebateRound) -> tuple:
+        return (
+            session.session_id,
+            round_obj.round_number,
+            round_obj.theme,
+            json.dumps(round_obj.votes),
+            round_obj.status,
+            round_obj.summary,
+        )
+
+    @staticmethod
+    def _message_row(session: DebateSession, message: AgentMessage) -> tuple:
+        return (
+            session.session_id,
+            message.round_number,
+            message.agent_name,
+            message.agent_role,
+            message.content,
+            message.timestamp,
+            message.message_type,
+        )
+
+
+def create_session_store(backend: str, **options) -> SessionStore:
+    """Build the configured store: 'memory' or 'sqlite'."""
+    if backend == "sqlite":
+        return SQLiteSessionStore(options["path"])
+    if backend == "memory":
+        archive_dir = options.get("archive_dir")
+        return InMemorySessionStore(
+            max_sessions=options.get("max_sessions", 500),
+            ttl_seconds=options.get("ttl_seconds", 86400),
+            memory_budget_bytes=options.get("memory_budget_bytes", 0),
+            archive=SessionArchive(archive_dir) if archive_dir else None
+        )
+    raise ValueError(f"Unsupported DEBATE_SESSION_STORE: {backend}. Use 'memory' or 'sqlite'.")